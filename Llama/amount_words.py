@@ -0,0 +1,99 @@
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from functools import lru_cache
+
+import numpy as np
+
+# Rupee amounts in words with Indian numbering (crore, lakh, thousand), as
+# written on the tax declarations: "One Lakh Twenty Thousand and Five and
+# Paise Fifty".
+#
+# The words for 0-999 are built once into a table, so converting an amount
+# is three divmods and a few lookups. Amounts are rounded to paise with
+# decimal arithmetic on the number as it is written, so 12345.678 becomes
+# 12345.68 and 1e7 is One Crore, whatever its float representation.
+
+UNITS = ["", "One", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine", "Ten", "Eleven", "Twelve",
+         "Thirteen", "Fourteen", "Fifteen", "Sixteen", "Seventeen", "Eighteen", "Nineteen"]
+TENS = ["", "", "Twenty", "Thirty", "Forty", "Fifty", "Sixty", "Seventy", "Eighty", "Ninety"]
+
+PAISE = Decimal("0.01")
+WORDS_CACHE_SIZE = 65536
+# Below this a float carries far more precision than a paisa
+FLOAT_PAISE_LIMIT = 1e12
+
+def _below_hundred(n):
+    if n < 20:
+        return UNITS[n]
+    return TENS[n // 10] + (" " + UNITS[n % 10] if n % 10 else "")
+
+def _below_thousand(n):
+    hundred, rest = divmod(n, 100)
+    if not hundred:
+        return _below_hundred(rest)
+    words = UNITS[hundred] + " Hundred"
+    return words + " and " + _below_hundred(rest) if rest else words
+
+# Words for 0-999; WORDS[0] is empty so it can be skipped when composing
+WORDS = tuple(_below_thousand(n) for n in range(1000))
+
+@lru_cache(maxsize=WORDS_CACHE_SIZE)
+def rupees_to_words(rupees):
+    """Words for a whole number of rupees"""
+    if rupees == 0:
+        return "Zero"
+    crore, rest = divmod(rupees, 10000000)
+    lakh, rest = divmod(rest, 100000)
+    thousand, rest = divmod(rest, 1000)
+
+    parts = []
+    if crore:
+        parts.append(rupees_to_words(crore) + " Crore")
+    if lakh:
+        parts.append(WORDS[lakh] + " Lakh")
+    if thousand:
+        parts.append(WORDS[thousand] + " Thousand")
+    if rest:
+        parts.append("and " + WORDS[rest] if parts and rest < 100 else WORDS[rest])
+    return " ".join(parts)
+
+def split_paise(amount):
+    """(negative, rupees, paise) of an amount rounded half up to the paisa"""
+    if isinstance(amount, (int, np.integer)):
+        return amount < 0, abs(int(amount)), 0
+    if isinstance(amount, (float, np.floating)) and abs(amount) < FLOAT_PAISE_LIMIT:
+        scaled = abs(float(amount)) * 100
+        whole = int(scaled)
+        # Away from a half paisa the float is unambiguous; ties go to Decimal
+        if abs(scaled - whole - 0.5) > 1e-6:
+            paise = whole + (scaled - whole > 0.5)
+            return amount < 0 and paise > 0, *divmod(paise, 100)
+    try:
+        value = Decimal(str(amount)).quantize(PAISE, rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        value = None
+    if value is None or not value.is_finite():
+        raise ValueError(f"Cannot write {amount!r} in words")
+    rupees, paise = divmod(int(abs(value) * 100), 100)
+    return value < 0, rupees, paise
+
+@lru_cache(maxsize=WORDS_CACHE_SIZE)
+def num_to_words(num):
+    """Convert a number to words for Indian currency"""
+    negative, rupees, paise = split_paise(num)
+    words = rupees_to_words(rupees)
+    if paise:
+        words += " and Paise " + WORDS[paise]
+    return "Minus " + words if negative else words
+
+def amounts_to_words(amounts):
+    """num_to_words for a column of amounts, as an object array.
+
+    Payroll columns repeat the same amounts a lot, so each distinct amount
+    is converted once.
+    """
+    amounts = np.asarray(amounts)
+    if amounts.size == 0:
+        return np.empty(amounts.shape, dtype=object)
+    distinct, inverse = np.unique(amounts, return_inverse=True)
+    words = np.array([num_to_words(amount) for amount in distinct.tolist()], dtype=object)
+    return words[inverse].reshape(amounts.shape)
@@ -225,6 +225,10 @@
 
 
 import streamlit as st
+from db import run_migrations
+
+# Bring the database schema up to date once per process, before any page renders
+run_migrations()
 
 # Initialize session state for authentication
 if "authenticated" not in st.session_state:
@@ -0,0 +1,104 @@
+"""Amounts in words: the old recursive num_to_words against the table-driven one.
+
+Converts a column of tax amounts the way a payroll run produces them
+(rounded rupee amounts, many repeated, a share with paise) one at a time
+with each converter, and as a batch with amounts_to_words.
+
+Run from the Llama directory:
+    python benchmarks/bench_amount_words.py [amounts]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from amount_words import amounts_to_words, num_to_words, rupees_to_words
+
+UNITS = ["", "One", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine", "Ten", "Eleven", "Twelve",
+         "Thirteen", "Fourteen", "Fifteen", "Sixteen", "Seventeen", "Eighteen", "Nineteen"]
+TENS = ["", "", "Twenty", "Thirty", "Forty", "Fifty", "Sixty", "Seventy", "Eighty", "Ninety"]
+
+def recursive_num_to_words(num):
+    """The converter the Tax Filing page used before, kept here for comparison"""
+    if num == 0:
+        return "Zero"
+    num_str = str(num)
+    if '.' in num_str:
+        whole_part, decimal_part = num_str.split('.')
+        whole_num = int(whole_part)
+        decimal_num = int(decimal_part.ljust(2, '0')[:2])
+    else:
+        whole_num = int(num)
+        decimal_num = 0
+    words = ""
+    crore = int(whole_num / 10000000)
+    whole_num = whole_num % 10000000
+    if crore > 0:
+        words += recursive_num_to_words(crore) + " Crore "
+    lakh = int(whole_num / 100000)
+    whole_num = whole_num % 100000
+    if lakh > 0:
+        words += recursive_num_to_words(lakh) + " Lakh "
+    thousand = int(whole_num / 1000)
+    whole_num = whole_num % 1000
+    if thousand > 0:
+        words += recursive_num_to_words(thousand) + " Thousand "
+    hundred = int(whole_num / 100)
+    whole_num = whole_num % 100
+    if hundred > 0:
+        words += UNITS[hundred] + " Hundred "
+    if whole_num > 0:
+        if words != "" and whole_num < 100:
+            words += "and "
+        if whole_num < 20:
+            words += UNITS[whole_num]
+        else:
+            words += TENS[int(whole_num / 10)]
+            if whole_num % 10 > 0:
+                words += " " + UNITS[whole_num % 10]
+    if decimal_num > 0:
+        words += " and Paise "
+        if decimal_num < 20:
+            words += UNITS[decimal_num]
+        else:
+            words += TENS[int(decimal_num / 10)]
+            if decimal_num % 10 > 0:
+                words += " " + UNITS[decimal_num % 10]
+    return words
+
+def make_amounts(count, seed=0):
+    rng = np.random.default_rng(seed)
+    # Remaining tax of a payroll: rounded to tens of rupees, a fifth with paise
+    amounts = np.round(rng.lognormal(10.5, 1.2, count), -1)
+    with_paise = rng.random(count) < 0.2
+    amounts[with_paise] += rng.integers(1, 100, with_paise.sum()) / 100
+    return amounts
+
+def clear_caches():
+    num_to_words.cache_clear()
+    rupees_to_words.cache_clear()
+
+def timed(label, func, count):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34}{elapsed:8.2f} s  ({elapsed / count * 1e6:.2f} us/amount)")
+    return result
+
+def main(count):
+    amounts = make_amounts(count)
+    values = amounts.tolist()
+    print(f"{count} amounts, {len(np.unique(amounts))} distinct")
+    timed("recursive num_to_words", lambda: [recursive_num_to_words(value) for value in values], count)
+    clear_caches()
+    timed("table num_to_words, cold cache", lambda: [num_to_words(value) for value in values], count)
+    timed("table num_to_words, warm cache", lambda: [num_to_words(value) for value in values], count)
+    clear_caches()
+    words = timed("amounts_to_words (batch)", lambda: amounts_to_words(amounts), count)
+    assert words[0] == num_to_words(values[0])
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
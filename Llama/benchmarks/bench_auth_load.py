@@ -0,0 +1,67 @@
+"""Login storm benchmark for the pooled auth queries in db.py.
+
+Runs against DATABASE_URL if set (e.g. a local MySQL), otherwise against a
+throwaway SQLite file. Run from the Llama directory:
+    python benchmarks/bench_auth_load.py [concurrent_users] [logins_per_user]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "auth_bench.db")
+
+# This benchmark is about the connection pool; bcrypt cost is measured
+# separately by bench_password_cost.py
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("PASSWORD_VERIFY_CACHE_TTL", "0")
+
+import db
+
+def login(username, password):
+    return db.authenticate(username, password) is not None
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    logins_per_user = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    db.run_migrations()
+    for i in range(users):
+        db.add_user(f"user{i}", f"password{i}")
+
+    latencies = []
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(users)
+
+    def session(i):
+        start_barrier.wait()
+        local = []
+        for _ in range(logins_per_user):
+            start = time.perf_counter()
+            if not login(f"user{i}", f"password{i}"):
+                raise AssertionError(f"login failed for user{i}")
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        list(pool.map(session, range(users)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1000
+    print(f"{db.get_engine().dialect.name}, pool_size={db.POOL_SIZE} max_overflow={db.MAX_OVERFLOW}: "
+          f"{users} concurrent users, {len(latencies):,} logins in {elapsed:.2f} s "
+          f"({len(latencies) / elapsed:,.0f} logins/s)")
+    print(f"login latency p50 {np.percentile(latencies, 50):.2f} ms, "
+          f"p99 {np.percentile(latencies, 99):.2f} ms, max {latencies.max():.2f} ms")
+
+if __name__ == "__main__":
+    main()
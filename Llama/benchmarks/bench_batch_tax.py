@@ -0,0 +1,56 @@
+"""Benchmark the vectorized tax engine against the scalar per-employee functions.
+
+Run from the Llama directory:
+    python benchmarks/bench_batch_tax.py [rows]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tax_engine import calculate_tax_batch, calculate_tax_old_regime, calculate_tax_new_regime
+
+SCALAR_SAMPLE = 20000
+
+def make_payroll(rows, seed=42):
+    rng = np.random.default_rng(seed)
+    # Roughly log-normal salaries centred around 8L, rounded to the paisa
+    incomes = np.round(rng.lognormal(mean=13.6, sigma=0.7, size=rows), 2)
+    is_senior = rng.random(rows) < 0.05
+    return incomes, is_senior
+
+def check_parity(incomes, is_senior, regime, scalar_fn):
+    batch = calculate_tax_batch(incomes, is_senior, regime)
+    for i in range(len(incomes)):
+        expected = scalar_fn(float(incomes[i]), bool(is_senior[i]))
+        for key, value in expected.items():
+            if abs(batch[key][i] - value) >= 0.005:
+                raise AssertionError(f"{regime} row {i} {key}: batch {batch[key][i]} != scalar {value}")
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+    incomes, is_senior = make_payroll(rows)
+
+    for regime, scalar_fn in [("Old Regime", calculate_tax_old_regime), ("New Regime", calculate_tax_new_regime)]:
+        sample = slice(0, min(rows, SCALAR_SAMPLE))
+        check_parity(incomes[sample], is_senior[sample], regime, scalar_fn)
+
+        start = time.perf_counter()
+        for i in range(len(incomes[sample])):
+            scalar_fn(float(incomes[i]), bool(is_senior[i]))
+        scalar_per_row = (time.perf_counter() - start) / len(incomes[sample])
+
+        calculate_tax_batch(incomes[:1000], is_senior[:1000], regime)  # warm up
+        start = time.perf_counter()
+        calculate_tax_batch(incomes, is_senior, regime)
+        batch_total = time.perf_counter() - start
+
+        print(f"{regime}: {rows:,} rows in {batch_total * 1000:.1f} ms "
+              f"({batch_total / rows * 1e9:.1f} ns/row batch, {scalar_per_row * 1e9:.1f} ns/row scalar, "
+              f"{scalar_per_row * rows / batch_total:.0f}x speedup) - parity OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""End-to-end time for bulk filing a synthetic employee roster.
+
+Run from the Llama directory:
+    python benchmarks/bench_bulk_filing.py [employees] [workers]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk_filing import file_roster
+
+def make_roster(employees, seed=0):
+    rng = np.random.default_rng(seed)
+    basic = rng.uniform(300000, 1500000, employees).round(-2)
+    return pd.DataFrame({
+        "name": [f"EMPLOYEE {i:05d}" for i in range(employees)],
+        "pan": [f"ABCDE{i % 10000:04d}F" for i in range(employees)],
+        "designation": "ASSISTANT PROFESSOR",
+        "department": "COMPUTER SCIENCE",
+        "tax_regime": np.where(rng.random(employees) < 0.5, "Old Regime", "New Regime"),
+        "is_senior": rng.random(employees) < 0.1,
+        "basic_salary": basic,
+        "da": (basic * 0.5).round(),
+        "hra": (basic * 0.1).round(),
+        "rent_paid": rng.choice([0, 120000, 240000], employees),
+        "epf_subscription": (basic * 0.12).round(),
+        "professional_tax": 2500,
+        "ppf": rng.choice([0, 50000, 150000], employees),
+        "mediclaim": rng.choice([0, 15000, 25000], employees),
+        "savings_interest": rng.uniform(0, 20000, employees).round(),
+        "tds_already_deducted": rng.uniform(0, 100000, employees).round(),
+    })
+
+def run(employees, workers):
+    with tempfile.TemporaryDirectory() as directory:
+        roster_path = os.path.join(directory, "roster.csv")
+        make_roster(employees).to_csv(roster_path, index=False)
+        start = time.perf_counter()
+        result, timings = file_roster(roster_path, os.path.join(directory, "out"), workers=workers)
+        total = time.perf_counter() - start
+    steps = ", ".join(f"{step} {seconds:.2f}s" for step, seconds in timings.items())
+    print(f"{employees:>6} employees, {workers} workers: {total:.2f}s total ({steps}), "
+          f"{employees / total:,.0f} employees/s")
+
+if __name__ == "__main__":
+    employees = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    run(employees, workers)
@@ -0,0 +1,78 @@
+"""Deduction caps: the compiled deduction table against hand-written min() chains.
+
+Applies the Old Regime deductions to a synthetic payroll, once per filer
+with scalar code and once for everyone with array code, and checks that
+the table agrees with the hand-written caps.
+
+Run from the Llama directory:
+    python benchmarks/bench_deductions.py [filers]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deductions import SECTION_80C_CLAIMS, get_deduction_table
+from rules import get_rules
+
+CLAIMS = SECTION_80C_CLAIMS + ["epf_subscription", "additional_nps", "mediclaim", "education_loan_interest",
+                               "affordable_house_interest", "ev_loan_interest", "donations", "rent_paid_deduction",
+                               "savings_interest", "fd_interest"]
+
+def make_claims(filers, seed=0):
+    rng = np.random.default_rng(seed)
+    claims = {}
+    for claim in CLAIMS:
+        # Most filers claim only a few sections
+        amounts = rng.integers(0, 120000, filers).astype(np.float64)
+        claims[claim] = np.where(rng.random(filers) < 0.3, amounts, 0.0)
+    return claims, rng.random(filers) < 0.15, rng.random(filers) < 0.02
+
+def by_hand(claims, is_senior, disabled, limits):
+    """The caps as the pages used to write them, one filer at a time"""
+    section_80c = sum(claims[claim] for claim in SECTION_80C_CLAIMS) + claims["epf_subscription"]
+    total = min(section_80c, limits["80C"])
+    total += min(claims["additional_nps"], limits["80CCD(1B)"])
+    total += min(claims["mediclaim"], limits["80D_senior" if is_senior else "80D"])
+    total += claims["education_loan_interest"] + claims["ev_loan_interest"] + claims["donations"]
+    total += min(claims["affordable_house_interest"], limits["80EEA"]) + claims["rent_paid_deduction"]
+    if is_senior:
+        total += min(claims["savings_interest"] + claims["fd_interest"], limits["80TTB"])
+    else:
+        total += min(claims["savings_interest"], limits["80TTA"])
+    if disabled:
+        total += limits["80U"]
+    return total
+
+def main(filers):
+    claims, is_senior, disabled = make_claims(filers)
+    table = get_deduction_table()
+    limits = get_rules().limits
+    rows = [{claim: float(values[i]) for claim, values in claims.items() if values[i]} for i in range(filers)]
+    full_rows = [{claim: float(values[i]) for claim, values in claims.items()} for i in range(filers)]
+    seniors = is_senior.tolist()
+    disabilities = disabled.tolist()
+
+    start = time.perf_counter()
+    expected = [by_hand(row, seniors[i], disabilities[i], limits) for i, row in enumerate(full_rows)]
+    hand = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scalar = [table.apply(row, seniors[i], disabilities[i])["total"] for i, row in enumerate(rows)]
+    per_filer = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = table.apply_batch(claims, is_senior, disabled)["total"]
+    array = time.perf_counter() - start
+
+    assert np.allclose(scalar, expected) and np.allclose(batch, expected)
+    print(f"{filers} filers, {len(table.lines)} deduction lines")
+    print(f"  hand-written min() per filer : {hand * 1000:8.1f} ms ({hand / filers * 1e6:.2f} us/filer)")
+    print(f"  deduction table per filer    : {per_filer * 1000:8.1f} ms ({per_filer / filers * 1e6:.2f} us/filer)")
+    print(f"  deduction table, batch       : {array * 1000:8.1f} ms ({array / filers * 1e6:.3f} us/filer)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,68 @@
+"""Bytes sent to the browser per rerun for an Excel download on the page.
+
+Before: the workbook base64-encoded into a data: URI link (the old
+Tax_Filing.get_table_download_link). After: downloads.download_button,
+which sends only a button message and builds the file when clicked.
+Sizes are the serialized element protos from Streamlit's AppTest.
+
+Run from the Llama directory:
+    python benchmarks/bench_download_payload.py
+"""
+import logging
+import os
+import sys
+import time
+
+LLAMA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, LLAMA_DIR)
+
+SCRIPT = """
+import base64
+import sys
+sys.path.insert(0, {llama_dir!r})
+import numpy as np
+import pandas as pd
+import streamlit as st
+from downloads import download_button
+from excel_export import export_workbook
+
+rows = {rows}
+df = pd.DataFrame({{
+    "Field": [f"Field {{i}}" for i in range(rows)],
+    "Value": np.arange(rows) * 1234.5,
+    "Old Regime": np.arange(rows) * 1000.25,
+    "New Regime": np.arange(rows) * 990.75,
+}})
+
+def to_excel(df):
+    return export_workbook({{"Sheet1": df}}).getvalue()
+
+if {mode!r} == "data_uri":
+    b64 = base64.b64encode(to_excel(df))
+    st.markdown(f'<a href="data:application/octet-stream;base64,{{b64.decode()}}" download="tax.xlsx">Download Excel File</a>',
+                unsafe_allow_html=True)
+else:
+    download_button("Download Excel File", lambda: to_excel(df), df, file_name="tax.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+"""
+
+def payload(rows, mode):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_string(SCRIPT.format(llama_dir=LLAMA_DIR, rows=rows, mode=mode), default_timeout=60)
+    start = time.perf_counter()
+    app.run()
+    elapsed = time.perf_counter() - start
+    size = sum(element.proto.ByteSize() for element in app.main if getattr(element, "proto", None) is not None)
+    return size, elapsed
+
+def run():
+    for rows in [42, 1000, 10000]:
+        before, before_time = payload(rows, "data_uri")
+        after, after_time = payload(rows, "download_button")
+        print(f"{rows:>6} rows: data URI link {before / 1024:,.1f} KB in {before_time * 1000:.0f} ms per rerun, "
+              f"download button {after} bytes in {after_time * 1000:.0f} ms per rerun")
+
+if __name__ == "__main__":
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    run()
@@ -0,0 +1,71 @@
+"""Peak RSS and wall time for writing a multi-sheet roster workbook.
+
+Compares pandas.to_excel through openpyxl (the old Tax Filing export),
+pandas.to_excel through xlsxwriter in its default in-memory mode, and the
+constant-memory export layer in excel_export.py. Each run happens in a fresh
+process so peak RSS is not shared between them.
+
+Run from the Llama directory:
+    python benchmarks/bench_excel_export.py [rows] [sheets]
+"""
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+LLAMA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, LLAMA_DIR)
+
+def make_sheet(rows, seed):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    data = {
+        "Name": [f"EMPLOYEE {i:06d}" for i in range(rows)],
+        "PAN": [f"ABCDE{i % 10000:04d}F" for i in range(rows)],
+        "Regime": np.where(rng.random(rows) < 0.5, "Old Regime", "New Regime"),
+    }
+    for column in ["Basic Salary", "DA", "HRA", "Gross Total Income", "Total Deductions", "Taxable Income",
+                   "Tax", "Cess", "Total Tax", "TDS", "Remaining Tax"]:
+        data[column] = rng.uniform(0, 2000000, rows).round(2)
+    return pd.DataFrame(data)
+
+def _rss_mb():
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _export(method, rows, sheets, path, queue):
+    import pandas as pd
+    from excel_export import export_workbook
+
+    frames = {f"Sheet{i + 1}": make_sheet(rows, i) for i in range(sheets)}
+    baseline = _rss_mb()
+    start = time.perf_counter()
+    if method == "export_workbook":
+        export_workbook(frames, path)
+    else:
+        with pd.ExcelWriter(path, engine=method) as writer:
+            for name, df in frames.items():
+                df.to_excel(writer, sheet_name=name, index=False)
+    elapsed = time.perf_counter() - start
+    queue.put((elapsed, _rss_mb() - baseline, os.path.getsize(path)))
+
+def run(rows, sheets):
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        for method in ["openpyxl", "xlsxwriter", "export_workbook"]:
+            queue = context.Queue()
+            process = context.Process(target=_export, args=(method, rows, sheets, os.path.join(directory, f"{method}.xlsx"), queue))
+            process.start()
+            elapsed, peak_mb, size = queue.get()
+            process.join()
+            print(f"{method:>16}: {rows:,} rows x {sheets} sheets in {elapsed:.2f}s, "
+                  f"peak RSS +{peak_mb:.0f} MB over the input data, file {size / 2**20:.1f} MB")
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    sheets = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    run(rows, sheets)
@@ -0,0 +1,84 @@
+"""Pages per second and peak memory for Form 16 extraction on a bulk
+employer PDF (one two-page Form 16 per employee).
+
+Run from the Llama directory:
+    python benchmarks/bench_form16_extract.py [employees]
+"""
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from form16_extract import iter_form16_records
+
+def form16_pages(i):
+    return [
+        ["FORM NO. 16", "Certificate under section 203 of the Income-tax Act, 1961",
+         "PAN of the Deductor: AAACK1234Q",
+         f"Name and address of the Employee: EMPLOYEE {i:05d}, Kavaraipettai",
+         f"PAN of the Employee: ABCDE{i % 10000:04d}F", "Designation: ASSOCIATE PROFESSOR",
+         "Department: ARTIFICIAL INTELLIGENCE AND DATA SCIENCE",
+         f"1. Gross Salary (a) Salary as per provisions contained in section 17(1): {900000 + i:,}.00"]
+        + [f"Quarter {q} receipt number {1000 + q} amount paid {75000 + q:,}" for q in range(1, 5)],
+        [f"Basic Pay {700000 + i:,}", "Dearness Allowance 1,20,000", "House Rent Allowance 60,000",
+         "Tax on employment u/s 16(iii) 2,500", "Deduction under section 80C 1,80,000 1,50,000",
+         "80D Health insurance 25,000", "80CCD(1B) 50,000", "80GG rent 96,000",
+         f"Total tax deducted {50000 + i:,}"],
+    ]
+
+def make_pdf(pages):
+    """Minimal uncompressed PDF with one Helvetica text block per page"""
+    objects = {1: b"<< /Type /Catalog /Pages 2 0 R >>",
+               3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    page_ids = []
+    next_id = 4
+    for lines in pages:
+        text = b" ".join(b"(" + line.replace("(", "\\(").replace(")", "\\)").encode("latin-1") + b") '"
+                         for line in lines)
+        content = b"BT /F1 10 Tf 50 800 Td 14 TL " + text + b" ET"
+        objects[next_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content)
+        objects[next_id + 1] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                                b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % next_id)
+        page_ids.append(next_id + 1)
+        next_id += 2
+    objects[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % page_id for page_id in page_ids), len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(out)
+        out += b"%d 0 obj\n%s\nendobj\n" % (object_id, objects[object_id])
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % next_id
+    for object_id in range(1, next_id):
+        out += b"%010d 00000 n \n" % offsets[object_id]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (next_id, xref)
+    return bytes(out)
+
+def run(employees):
+    pdf = make_pdf([page for i in range(employees) for page in form16_pages(i)])
+    tracemalloc.start()
+    start = time.perf_counter()
+    records = 0
+    for record in iter_form16_records(io.BytesIO(pdf), "bulk_form16.pdf"):
+        records += 1
+        if records == 1 and record.get("pan") != "ABCDE0000F":
+            raise AssertionError(f"unexpected first record {record}")
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    pages = employees * 2
+    print(f"{pages:5d} pages ({len(pdf) / 1e6:.1f} MB): {records} records, {pages / elapsed:,.0f} pages/s, "
+          f"peak traced memory {peak / 1e6:.1f} MB")
+
+def main():
+    employees = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    for count in sorted({max(1, employees // 8), employees // 2, employees}):
+        run(count)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Cold import cost of each page, from `python -X importtime`.
+
+Fails (exit code 1) if a page pulls in one of the heavy feature
+dependencies at import time, or goes over its time budget, so it can run
+as a regression check. Run from the Llama directory:
+    python benchmarks/bench_import_time.py [--top N]
+"""
+import os
+import subprocess
+import sys
+
+LLAMA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry points and the cumulative import budget for each, in milliseconds
+ENTRY_POINTS = {
+    "db": 1500,
+    "login": 2500,
+    "signup": 2500,
+    "home": 2500,
+}
+
+# Must only be imported when their feature is first used
+LAZY_MODULES = ["groq", "pdfkit", "docx", "speech_recognition", "pyttsx3", "PIL", "pytesseract"]
+
+def import_times(module):
+    code = f"import sys; sys.path[:0] = [{LLAMA_DIR!r}, {os.path.join(LLAMA_DIR, 'pages')!r}]; import {module}"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, cwd=LLAMA_DIR)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split("|")
+        times.append((name.strip(), int(self_us.split(":")[1]), int(cumulative_us)))
+    return times
+
+def main():
+    top = int(sys.argv[sys.argv.index("--top") + 1]) if "--top" in sys.argv else 5
+    failed = False
+    for module, budget_ms in ENTRY_POINTS.items():
+        try:
+            times = import_times(module)
+        except RuntimeError as e:
+            print(f"{module}: skipped ({e})")
+            continue
+        total_ms = next(cumulative for name, _, cumulative in times if name == module) / 1000
+        loaded = {name.split(".")[0] for name, _, _ in times}
+        eager = sorted(loaded.intersection(LAZY_MODULES))
+        status = "OK"
+        if eager or total_ms > budget_ms:
+            status = "FAIL"
+            failed = True
+        print(f"{module}: {total_ms:.0f} ms cumulative (budget {budget_ms} ms), {len(times)} modules - {status}")
+        if eager:
+            print(f"  imported eagerly: {', '.join(eager)}")
+        top_level = {}
+        for name, _, cumulative in times:
+            root = name.split(".")[0]
+            if root != module and "." not in name:
+                top_level[root] = max(top_level.get(root, 0), cumulative)
+        for name, cumulative in sorted(top_level.items(), key=lambda item: -item[1])[:top]:
+            print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
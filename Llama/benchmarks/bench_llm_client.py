@@ -0,0 +1,55 @@
+"""Time-to-first-token, connection reuse and response cache for llm_client.
+
+Runs against the local fake completion server. Run from the Llama directory:
+    python benchmarks/bench_llm_client.py [requests]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_completion_server import CompletionHandler, start_server
+import llm_client
+
+def run(label, make_stream, count):
+    ttft, total = [], []
+    for i in range(count):
+        chat = make_stream(i)
+        for _ in chat:
+            pass
+        ttft.append(chat.time_to_first_token * 1000)
+        total.append(chat.total_time * 1000)
+    print(f"{label}: TTFT p50 {np.percentile(ttft, 50):.2f} ms, total p50 {np.percentile(total, 50):.2f} ms, "
+          f"p99 {np.percentile(total, 99):.2f} ms")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    server, base_url = start_server()
+    groq = llm_client.lazy_import("groq")
+
+    def question(i):
+        return [{"role": "user", "content": f"What is the tax on {i} lakh?"}]
+
+    CompletionHandler.connections.clear()
+    run("new client per request", lambda i: llm_client.ChatStream(
+        groq.Groq(api_key="test", base_url=base_url), question(i), cache=None), count)
+    print(f"  connections opened: {len(CompletionHandler.connections)}")
+
+    CompletionHandler.connections.clear()
+    client = llm_client.get_client("test", base_url)
+    run("shared client", lambda i: llm_client.ChatStream(client, question(i), cache=None), count)
+    print(f"  connections opened: {len(CompletionHandler.connections)}")
+
+    cache = llm_client.ResponseCache()
+    run("cache hits", lambda i: llm_client.ChatStream(
+        client, [{"role": "user", "content": "What is the tax on 12 lakh?  " if i % 2 else "what is the TAX on 12 lakh"}],
+        cache=cache), count)
+    print(f"  cache hits {cache.hits}, misses {cache.misses}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
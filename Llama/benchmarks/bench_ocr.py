@@ -0,0 +1,93 @@
+"""OCR throughput on synthetic Form 16 scans: sequential vs the worker pool,
+and the cost of re-submitting an already processed upload.
+
+Needs Pillow, pytesseract and the tesseract binary. Run from the Llama directory:
+    python benchmarks/bench_ocr.py [scans]
+"""
+import io
+import os
+import random
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFilter
+
+import ocr_worker
+
+FIELDS = [
+    "FORM NO. 16",
+    "Certificate under section 203 of the Income-tax Act, 1961",
+    "PART B - Details of Salary Paid and Tax Deducted",
+    "Name and address of the Employee: {name}",
+    "PAN of the Employee: {pan}",
+    "Assessment Year: 2025-26",
+    "1. Gross Salary (a) Salary as per section 17(1): {salary:,}",
+    "2. Less: Allowance to the extent exempt under section 10: {hra:,}",
+    "3. Standard deduction under section 16(ia): 50,000",
+    "4. Professional tax under section 16(iii): 2,500",
+    "5. Deduction under section 80C: {s80c:,}",
+    "6. Deduction under section 80D: {s80d:,}",
+    "7. Total taxable income: {taxable:,}",
+    "8. Tax on total income: {tax:,}",
+    "9. Health and education cess: {cess:,}",
+]
+
+def make_scan(i):
+    rng = random.Random(i)
+    salary = rng.randrange(400000, 3000000, 1000)
+    hra = rng.randrange(0, 200000, 1000)
+    s80c = rng.randrange(0, 150001, 500)
+    s80d = rng.randrange(0, 25001, 500)
+    taxable = max(0, salary - hra - 52500 - s80c - s80d)
+    tax = int(taxable * 0.12)
+    values = {
+        "name": f"EMPLOYEE {i:05d}",
+        "pan": "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(5)) + f"{rng.randrange(10000):04d}" + rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ"),
+        "salary": salary, "hra": hra, "s80c": s80c, "s80d": s80d, "taxable": taxable,
+        "tax": tax, "cess": int(tax * 0.04),
+    }
+    image = Image.new("L", (1240, 900), 255)
+    draw = ImageDraw.Draw(image)
+    for line_number, field in enumerate(FIELDS):
+        draw.text((60, 40 + line_number * 55), field.format(**values), fill=0)
+    # A slight rotation and blur so it looks scanned rather than rendered
+    image = image.rotate(rng.uniform(-1, 1), fillcolor=255).filter(ImageFilter.GaussianBlur(0.6))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def main():
+    if shutil.which("tesseract") is None:
+        sys.exit("tesseract binary not found; install tesseract-ocr to run this benchmark")
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    scans = [make_scan(i) for i in range(count)]
+
+    start = time.perf_counter()
+    for scan in scans:
+        ocr_worker._ocr_image_bytes(scan)
+    sequential = time.perf_counter() - start
+
+    ocr_worker.extract_text(make_scan(-1))  # start the worker processes
+    start = time.perf_counter()
+    job_ids = [ocr_worker.submit_ocr(scan) for scan in scans]
+    while any(ocr_worker.ocr_status(job_id)[0] == "pending" for job_id in job_ids):
+        time.sleep(0.01)
+    pooled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for scan in scans:
+        ocr_worker.submit_ocr(scan)
+        ocr_worker.ocr_status(ocr_worker.content_hash(scan))
+    cached = time.perf_counter() - start
+    ocr_worker.shutdown()
+
+    print(f"{count} synthetic Form 16 scans")
+    print(f"sequential: {count / sequential:.2f} scans/s")
+    print(f"pool ({ocr_worker.OCR_WORKERS} workers): {count / pooled:.2f} scans/s ({sequential / pooled:.1f}x)")
+    print(f"re-submitted uploads (cache hits): {cached / count * 1e6:.1f} us/scan")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Fixed-point (integer paise) tax against the float tax path.
+
+Runs a payroll through slab tax, 87A rebate, cess and TDS both ways, times
+them, and counts the rows where the float result rounded to the paisa
+disagrees with the exact one. First checks that the scalar and batch exact
+paths convert rupees to the same paise and agree on the tax.
+
+Run from the Llama directory:
+    python benchmarks/bench_paise_tax.py [rows]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from paise import round_288b, to_paise, to_paise_array
+from tax_engine import calculate_tax_batch, calculate_tax_batch_paise, calculate_tax_old_regime, calculate_tax_paise
+
+SCALAR_SAMPLE = 100000
+# Amounts written on a half paisa, most of them stored as floats just below it
+HALF_PAISA_AMOUNTS = [12.345, 2.675, 1.005, 0.285, 1234567.895, 1.015, -12.345, 600000.005]
+
+def make_payroll(rows, seed=42):
+    rng = np.random.default_rng(seed)
+    incomes = np.round(rng.lognormal(mean=13.6, sigma=0.7, size=rows), 2)
+    tds = np.round(rng.random(rows) * 50000, 2)
+    return incomes, rng.random(rows) < 0.05, tds
+
+def float_path(incomes, is_senior, tds, regime):
+    results = calculate_tax_batch(incomes, is_senior, regime)
+    results["remaining_tax"] = np.maximum(0, results["total_tax"] - tds)
+    return results
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def check_exact_paths(incomes):
+    """Raise if the scalar and batch exact paths disagree anywhere"""
+    amounts = np.concatenate([HALF_PAISA_AMOUNTS, incomes[:SCALAR_SAMPLE]])
+    scalar = np.array([to_paise(value) for value in amounts.tolist()])
+    mismatches = np.flatnonzero(scalar != to_paise_array(amounts))
+    if len(mismatches):
+        raise AssertionError(f"to_paise and to_paise_array disagree on {amounts[mismatches][:5].tolist()}")
+    positive = scalar[scalar >= 0]
+    batch = calculate_tax_batch_paise(positive)["total_tax"]
+    if any(calculate_tax_paise(int(income))["total_tax"] != tax for income, tax in zip(positive[:1000], batch)):
+        raise AssertionError("calculate_tax_paise and calculate_tax_batch_paise disagree")
+    print(f"exact paths agree on {len(amounts)} amounts")
+
+def main(rows):
+    incomes, is_senior, tds = make_payroll(rows)
+    check_exact_paths(incomes)
+    income_paise, tds_paise = to_paise_array(incomes), to_paise_array(tds)
+    print(f"{rows} employees")
+
+    for regime in ("Old Regime", "New Regime"):
+        floats = float_path(incomes, is_senior, tds, regime)
+        exact = calculate_tax_batch_paise(income_paise, is_senior, regime, tds=tds_paise)
+
+        # Where float arithmetic lands on the wrong paisa before any 288B rounding
+        cess_drift = int((to_paise_array(floats["cess"]) != exact["cess"]).sum())
+        float_total = round_288b(to_paise_array(floats["total_tax"]))
+        total_drift = int((float_total != exact["total_tax"]).sum())
+
+        float_time = best_of(lambda: float_path(incomes, is_senior, tds, regime))
+        paise_time = best_of(lambda: calculate_tax_batch_paise(income_paise, is_senior, regime, tds=tds_paise))
+        print(f"  {regime}: float {float_time * 1000:7.1f} ms, paise {paise_time * 1000:7.1f} ms "
+              f"({float_time / paise_time:.2f}x); cess off by a paisa in {cess_drift} rows, "
+              f"288B total differs in {total_drift} rows")
+
+    sample = min(rows, SCALAR_SAMPLE)
+    values = incomes[:sample].tolist()
+    paise_values = [to_paise(value) for value in values]
+    float_time = best_of(lambda: [calculate_tax_old_regime(value) for value in values], repeat=3)
+    paise_time = best_of(lambda: [calculate_tax_paise(value) for value in paise_values], repeat=3)
+    print(f"  scalar, {sample} rows: float {float_time / sample * 1e6:.2f} us/row, "
+          f"paise {paise_time / sample * 1e6:.2f} us/row")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
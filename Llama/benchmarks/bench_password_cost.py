@@ -0,0 +1,56 @@
+"""Login throughput per core at each bcrypt work factor.
+
+The threaded column runs logins on one thread per core, as concurrent
+sessions do on their script threads; bcrypt releases the GIL, so it scales
+with cores.
+
+Run from the Llama directory:
+    python benchmarks/bench_password_cost.py [min_rounds] [max_rounds]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bcrypt
+
+import passwords
+
+def time_verifies(hashed, seconds=1.0):
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        bcrypt.checkpw(b"correct horse battery staple", hashed)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+def main():
+    min_rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    max_rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 14
+    cores = os.cpu_count() or 1
+
+    print(f"{'rounds':>6} {'verify ms':>10} {'logins/s/core':>14} {f'logins/s ({cores} threads)':>24}")
+    for rounds in range(min_rounds, max_rounds + 1):
+        hashed = bcrypt.hashpw(b"correct horse battery staple", bcrypt.gensalt(rounds))
+        per_core = time_verifies(hashed, seconds=max(1.0, 2.0 ** (rounds - 12)))
+
+        logins = max(cores * 2, int(per_core * cores))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=cores) as pool:
+            list(pool.map(lambda _: passwords._check("correct horse battery staple", hashed.decode()), range(logins)))
+        pooled = logins / (time.perf_counter() - start)
+
+        print(f"{rounds:>6} {1000 / per_core:>10.1f} {per_core:>14.1f} {pooled:>24.1f}")
+
+    passwords.clear_verify_cache()
+    hashed = passwords.hash_password("correct horse battery staple")
+    passwords.verify_password("correct horse battery staple", hashed)
+    start = time.perf_counter()
+    for _ in range(1000):
+        passwords.verify_password("correct horse battery staple", hashed)
+    print(f"cached re-verify at {passwords.BCRYPT_ROUNDS} rounds: {(time.perf_counter() - start) * 1000:.3f} us/login")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark the precompiled old vs new regime comparison on a sweep of incomes.
+
+Run from the Llama directory:
+    python benchmarks/bench_regime_compare.py [incomes]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from regime_compare import get_regime_comparison
+from tax_engine import calculate_tax_old_regime, calculate_tax_new_regime
+
+SCALAR_SAMPLE = 2000
+
+def brute_force_break_even(gross, is_senior, step=1.0):
+    """Reference answer: bisect on the scalar calculators for one income"""
+    target = calculate_tax_new_regime(gross, is_senior)["total_tax"]
+    if calculate_tax_old_regime(gross, is_senior)["total_tax"] <= target:
+        return 0.0
+    low, high = 0.0, gross
+    while high - low > step:
+        middle = (low + high) / 2
+        if calculate_tax_old_regime(gross - middle, is_senior)["total_tax"] <= target:
+            high = middle
+        else:
+            low = middle
+    return high
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10**5
+    gross = np.linspace(0, 5000000, count)
+
+    for is_senior in (False, True):
+        comparison = get_regime_comparison(is_senior)
+
+        sample = gross[:: max(1, count // SCALAR_SAMPLE)]
+        start = time.perf_counter()
+        expected = np.array([brute_force_break_even(g, is_senior) for g in sample])
+        brute_per_income = (time.perf_counter() - start) / len(sample)
+        actual = comparison.break_even_deduction(sample)
+        worst = np.abs(actual - expected).max()
+        if worst > 1.0:
+            raise AssertionError(f"break-even mismatch of {worst:.2f}")
+
+        start = time.perf_counter()
+        comparison.break_even_deduction(gross)
+        break_even_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        comparison.savings_curve(gross, 150000)
+        curve_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for g in sample:
+            comparison.break_even_deduction(float(g))
+        single_time = (time.perf_counter() - start) / len(sample)
+
+        label = "senior" if is_senior else "below 60"
+        print(f"{label}: {count:,} incomes - break-even {break_even_time * 1000:.2f} ms, "
+              f"savings curve {curve_time * 1000:.2f} ms, single income {single_time * 1e6:.1f} us "
+              f"(bisection {brute_per_income * 1e6:.0f} us/income), max error {worst:.2f}")
+
+if __name__ == "__main__":
+    main()
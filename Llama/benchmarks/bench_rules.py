@@ -0,0 +1,43 @@
+"""Cost of filing the same roster for every financial year in the registry.
+
+Compiling the rule files happens once at import; after that each year is a
+cached lookup, so re-running past years should cost the same as the current
+one.
+
+Run from the Llama directory:
+    python benchmarks/bench_rules.py [employees]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+start = time.perf_counter()
+from rules import available_years, get_rules, load_rules
+import_time = time.perf_counter() - start
+
+from bench_bulk_filing import make_roster
+from bulk_filing import compute_roster, normalize_roster
+
+def run(employees):
+    start = time.perf_counter()
+    load_rules()
+    compile_time = time.perf_counter() - start
+    print(f"rules import {import_time * 1000:.1f} ms, recompiling all files {compile_time * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    for _ in range(100000):
+        get_rules("2024-25")
+    print(f"get_rules: {(time.perf_counter() - start) * 1e9 / 100000:.0f} ns per call")
+
+    roster = normalize_roster(make_roster(employees))
+    for fy in available_years():
+        start = time.perf_counter()
+        result = compute_roster(roster, fy)
+        elapsed = time.perf_counter() - start
+        print(f"FY {fy}: {employees:,} employees in {elapsed * 1000:.0f} ms, "
+              f"total tax {result['total_tax'].sum():,.0f}")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,58 @@
+"""Org-wide salary projection: 50k employees x 12 months.
+
+Compares salary_schedule (one broadcast over the month axis) with the old
+per-employee, per-month loop from Tac_Calculator.calculate_salary.
+
+Run from the Llama directory:
+    python benchmarks/bench_salary_schedule.py [employees]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from salary_schedule import salary_schedule, org_totals
+
+def loop_schedule(base_pay, da_percent, hra_percent, cca, epf_percent, income_tax, prof_tax):
+    net = []
+    for employee in range(len(base_pay)):
+        months = []
+        for month in range(12):
+            da = (da_percent / 100) * base_pay[employee]
+            hra = (hra_percent / 100) * base_pay[employee]
+            epf = (epf_percent / 100) * base_pay[employee]
+            gross = base_pay[employee] + da + hra + cca
+            months.append(gross - (epf + income_tax[employee] / 12 + prof_tax))
+        net.append(months)
+    return np.array(net)
+
+def run(employees):
+    rng = np.random.default_rng(0)
+    base_pay = rng.uniform(20000, 150000, employees).round()
+    income_tax = rng.uniform(0, 300000, employees).round()
+
+    start = time.perf_counter()
+    loop_net = loop_schedule(base_pay, 5, 10, 1000, 12, income_tax, 200)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    schedule = salary_schedule(base_pay, 5, 10, 1000, 12, income_tax, 200)
+    vector_time = time.perf_counter() - start
+    assert np.allclose(schedule["net"], loop_net)
+
+    increments = [("July", rng.choice([0, 3], employees))]
+    start = time.perf_counter()
+    schedule = salary_schedule(base_pay, 5, 10, 1000, 12, income_tax, 200, increments=increments,
+                               da_revisions=[("April", 7, "September"), ("January", 9)])
+    revised_time = time.perf_counter() - start
+    payroll = org_totals(schedule)["gross"].sum()
+
+    print(f"{employees:,} employees x 12 months: loop {loop_time * 1000:.0f} ms, "
+          f"vectorized {vector_time * 1000:.1f} ms ({loop_time / vector_time:.0f}x), "
+          f"with increments and DA revisions {revised_time * 1000:.1f} ms (annual gross payroll {payroll:,.0f})")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,133 @@
+"""Load test of the tax API (tax_api.py) on this machine.
+
+Starts the API with uvicorn worker processes, then keeps a number of
+keep-alive connections busy on each endpoint for a fixed time and reports
+requests/sec and latency percentiles. Taxpayers come from the benchmark
+population, so runs are comparable. The client is a bare asyncio HTTP/1.1
+loop, so it costs less CPU than the server it is measuring; it still shares
+the machine, which counts against the server on a box with few cores.
+
+Run from the Llama directory:
+    python benchmarks/bench_tax_api.py [--workers N] [--concurrency C] [--seconds S] [--batch-rows R]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+LLAMA_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, LLAMA_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from population import make_population
+from tax_api import ARROW_STREAM, _write_arrow
+
+HOST = "127.0.0.1"
+STARTUP_TIMEOUT = 30
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+def start_server(port, workers):
+    env = {**os.environ, "API_HOST": HOST, "API_PORT": str(port), "API_WORKERS": str(workers)}
+    server = subprocess.Popen([sys.executable, os.path.join(LLAMA_DIR, "tax_api.py")], cwd=LLAMA_DIR, env=env)
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((HOST, port), timeout=1) as sock:
+                sock.sendall(b"GET /health HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n\r\n")
+                if sock.recv(64).startswith(b"HTTP/1.1 200"):
+                    return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"The tax API did not start on port {port} within {STARTUP_TIMEOUT}s")
+
+def request_bytes(path, body, content_type="application/json"):
+    return (f"POST {path} HTTP/1.1\r\nHost: bench\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head[9:12])
+    length = 0
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+async def connection(port, requests, deadline, latencies, errors, offset):
+    reader, writer = await asyncio.open_connection(HOST, port)
+    i = offset
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(requests[i % len(requests)])
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+            i += 1
+    finally:
+        writer.close()
+
+async def load(port, requests, concurrency, seconds):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    await asyncio.gather(*(connection(port, requests, deadline, latencies, errors, offset)
+                           for offset in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+def scenarios(batch_rows):
+    population = make_population(max(1000, batch_rows))
+    # Amounts as plain floats and flags as plain bools, as a payroll system would send them
+    taxpayers = json.loads(population.head(1000).to_json(orient="records"))
+    batch = population.head(batch_rows)
+    return {
+        "/tax/compute": [request_bytes("/tax/compute", json.dumps(taxpayer).encode()) for taxpayer in taxpayers],
+        "/tax/compare": [request_bytes("/tax/compare", json.dumps(taxpayer).encode()) for taxpayer in taxpayers],
+        f"/tax/batch JSON x{batch_rows}": [request_bytes("/tax/batch", json.dumps(
+            {"rows": json.loads(batch.to_json(orient="records"))}).encode())],
+        f"/tax/batch Arrow x{batch_rows}": [request_bytes("/tax/batch", _write_arrow(batch), ARROW_STREAM)],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="open connections")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each endpoint's run")
+    parser.add_argument("--batch-rows", type=int, default=1000, help="taxpayers per /tax/batch request")
+    args = parser.parse_args()
+
+    requests = scenarios(args.batch_rows)
+    port = free_port()
+    server = start_server(port, args.workers)
+    try:
+        print(f"{args.workers} worker(s), {args.concurrency} connections, {args.seconds:g}s per endpoint, "
+              f"{os.cpu_count()} CPU(s)")
+        for name, payloads in requests.items():
+            # A short warm-up, so worker caches are not part of the result
+            asyncio.run(load(port, payloads, args.concurrency, min(1.0, args.seconds / 5)))
+            latencies, errors, elapsed = asyncio.run(load(port, payloads, args.concurrency, args.seconds))
+            rate = len(latencies) / elapsed
+            rows = f", {rate * args.batch_rows:,.0f} taxpayers/s" if "batch" in name else ""
+            print(f"  {name:<28} {rate:9,.1f} req/s{rows}  p50 {np.percentile(latencies, 50) * 1000:7.2f} ms  "
+                  f"p99 {np.percentile(latencies, 99) * 1000:7.2f} ms  errors {len(errors)}")
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    main()
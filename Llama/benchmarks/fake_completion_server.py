@@ -0,0 +1,66 @@
+"""Local stand-in for the Groq chat completions endpoint.
+
+Streams an OpenAI-style server-sent-events response with a fixed delay
+before the first token and between tokens. Point the app or benchmarks at it
+with GROQ_BASE_URL=http://127.0.0.1:<port>. Run standalone with:
+    python benchmarks/fake_completion_server.py [port]
+"""
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIRST_TOKEN_DELAY = 0.05
+TOKEN_DELAY = 0.005
+REPLY = ("Under the new regime for FY 2024-25 income up to 3 lakh is exempt, and the "
+         "rebate under section 87A makes income up to 7 lakh effectively tax free.").split(" ")
+
+class CompletionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+    requests = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        type(self).requests += 1
+        type(self).connections.add(self.client_address)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        time.sleep(FIRST_TOKEN_DELAY)
+        for i, word in enumerate(REPLY):
+            chunk = {
+                "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": body.get("model"),
+                "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}, "finish_reason": None}],
+            }
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+            time.sleep(TOKEN_DELAY)
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text):
+        data = text.encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+def start_server(port=0):
+    """Start the server on a background thread and return (server, base_url)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), CompletionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+if __name__ == "__main__":
+    server, base_url = start_server(int(sys.argv[1]) if len(sys.argv) > 1 else 8765)
+    print(f"Fake completion server on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
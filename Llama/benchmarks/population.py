@@ -0,0 +1,85 @@
+"""Deterministic synthetic taxpayers for the benchmark suite.
+
+make_population(size, seed) returns a roster in the bulk filing format:
+one row per taxpayer, with the Tax Filing page's fields as columns. The
+same (size, seed) always gives the same rows, so runs can be compared.
+
+The mix is meant to look like a real payroll rather than uniform noise:
+- log-normal basic pay with DA, HRA and EPF as shares of it
+- about half of the staff on the Old Regime
+- 12% senior citizens and 2% with a disability
+- 20% owning a let-out house property with a home loan
+- each 80C instrument, NPS, mediclaim and loan interest claimed by only a
+  share of the people
+"""
+import numpy as np
+import pandas as pd
+
+SENIOR_SHARE = 0.12
+DISABLED_SHARE = 0.02
+HOUSE_PROPERTY_SHARE = 0.20
+OLD_REGIME_SHARE = 0.5
+
+# (column, share of taxpayers who claim it, typical claim, spread)
+DEDUCTION_MIX = [
+    ("lic_pli", 0.35, 25000, 0.6),
+    ("nsc", 0.05, 20000, 0.5),
+    ("ppf", 0.30, 60000, 0.7),
+    ("elss", 0.20, 40000, 0.7),
+    ("home_loan_principal", 0.15, 90000, 0.5),
+    ("tuition_fee", 0.25, 50000, 0.5),
+    ("tax_saver_fd", 0.08, 50000, 0.5),
+    ("sukanya_samriddhi", 0.06, 60000, 0.5),
+    ("additional_nps", 0.15, 40000, 0.3),
+    ("mediclaim", 0.45, 20000, 0.4),
+    ("education_loan_interest", 0.05, 60000, 0.6),
+    ("affordable_house_interest", 0.03, 80000, 0.5),
+    ("ev_loan_interest", 0.02, 50000, 0.5),
+    ("donations", 0.10, 10000, 1.0),
+    ("rent_paid_deduction", 0.03, 40000, 0.5),
+]
+
+def _claims(rng, size, share, typical, spread):
+    amounts = rng.lognormal(np.log(typical), spread, size).round(-2)
+    return np.where(rng.random(size) < share, amounts, 0.0)
+
+def make_population(size, seed=0):
+    rng = np.random.default_rng(seed)
+    basic = rng.lognormal(np.log(600000), 0.5, size).clip(180000, 5000000).round(-2)
+    is_senior = rng.random(size) < SENIOR_SHARE
+    owns_house = rng.random(size) < HOUSE_PROPERTY_SHARE
+    renting = ~owns_house & (rng.random(size) < 0.6)
+
+    population = {
+        "name": [f"TAXPAYER {i:06d}" for i in range(size)],
+        "pan": [f"AAAPZ{i % 10000:04d}{chr(65 + i % 26)}" for i in range(size)],
+        "designation": rng.choice(["ASSISTANT PROFESSOR", "ASSOCIATE PROFESSOR", "PROFESSOR", "LAB ASSISTANT"], size),
+        "department": rng.choice(["COMPUTER SCIENCE", "MECHANICAL", "CIVIL", "ADMINISTRATION"], size),
+        "others_specified": "Exam Duty",
+        "tax_regime": np.where(rng.random(size) < OLD_REGIME_SHARE, "Old Regime", "New Regime"),
+        "is_senior": is_senior,
+        "disabled_person": rng.random(size) < DISABLED_SHARE,
+        "basic_salary": basic,
+        "agp_gp": rng.choice([0, 6000, 7000, 8000, 9000], size) * 12.0,
+        "da": (basic * rng.choice([0.38, 0.42, 0.46, 0.50], size)).round(),
+        "hra": (basic * rng.choice([0.08, 0.16, 0.24], size)).round(),
+        "cca": rng.choice([0, 3600, 7200], size).astype(float),
+        "other_allowances": _claims(rng, size, 0.3, 20000, 0.5),
+        "pension": np.where(is_senior, rng.lognormal(np.log(300000), 0.4, size).round(-2), 0.0),
+        "others_amount": _claims(rng, size, 0.2, 8000, 0.5),
+        "additional_income": _claims(rng, size, 0.1, 50000, 0.8),
+        "epf_subscription": (basic * 0.12).round(),
+        "professional_tax": 2500.0,
+        "rent_paid": np.where(renting, rng.lognormal(np.log(180000), 0.4, size).round(-3), 0.0),
+        "rent_received": np.where(owns_house, rng.lognormal(np.log(150000), 0.4, size).round(-3), 0.0),
+        "property_tax": np.where(owns_house, rng.uniform(2000, 15000, size).round(-2), 0.0),
+        "housing_loan_interest": np.where(owns_house & (rng.random(size) < 0.7),
+                                          rng.lognormal(np.log(150000), 0.4, size).round(-2), 0.0),
+        "savings_interest": rng.lognormal(np.log(6000), 0.8, size).round(),
+        "fd_interest": _claims(rng, size, 0.3, 40000, 0.7) + np.where(is_senior, 30000.0, 0.0),
+        "other_sources": _claims(rng, size, 0.05, 20000, 0.5),
+    }
+    for column, share, typical, spread in DEDUCTION_MIX:
+        population[column] = _claims(rng, size, share, typical, spread)
+    population["tds_already_deducted"] = (basic * rng.uniform(0, 0.1, size)).round(-2)
+    return pd.DataFrame(population)
@@ -0,0 +1,444 @@
+"""Benchmark suite over a synthetic taxpayer population, with a JSON report.
+
+Drives the Tax Calculator, Tax Filing and home page calculators one
+taxpayer at a time (scalar) and for the whole population at once (batch),
+the Excel exports, and the db.py signup/login functions against a
+throwaway SQLite database. Every case runs in its own process, so its peak
+memory is its own, and reports throughput, latency percentiles and peak
+RSS. The population comes from population.make_population, so the same
+--size and --seed give the same inputs on every run.
+
+Pass --compare with an earlier report to list the cases whose throughput,
+p99 latency or peak memory got worse by more than --threshold; the exit
+status is then 1, so the suite can gate a change.
+
+Run from the Llama directory:
+    python benchmarks/run_suite.py [--size N] [--seed S] [--only NAME] [--output report.json] [--compare previous.json]
+"""
+import argparse
+import ast
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+LLAMA_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, LLAMA_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+REPORT_VERSION = 1
+# Batch cases are timed this many times; latency is then per repeat
+BATCH_REPEATS = 5
+# Per-taxpayer workbooks and bcrypt logins are slow, so they use a sample
+EXPORT_SAMPLE = 200
+AUTH_SAMPLE = 200
+REGRESSION_THRESHOLD = 0.10
+# Latencies this short are mostly timer noise and not compared
+MIN_COMPARED_MS = 0.05
+
+CASES = {}
+
+def case(name, mode):
+    """Register a benchmark case. The function gets the population and
+    returns (taxpayers handled per call, per-call latencies in seconds)."""
+    def register(func):
+        CASES[name] = (mode, func)
+        return func
+    return register
+
+def page_functions(page, *names):
+    """Named functions of a Streamlit page, without running the page.
+
+    Pages build their UI at import time, so only the top-level imports,
+    UPPER_CASE constants and the named function definitions (nested ones
+    included) are executed.
+    """
+    path = os.path.join(LLAMA_DIR, "pages", page)
+    with open(path, encoding="utf-8") as file:
+        tree = ast.parse(file.read(), path)
+    body = [statement for statement in tree.body
+            if isinstance(statement, (ast.Import, ast.ImportFrom))
+            or (isinstance(statement, ast.Assign)
+                and all(isinstance(target, ast.Name) and target.id.isupper() for target in statement.targets))]
+    functions = {definition.name: definition for definition in ast.walk(tree)
+                 if isinstance(definition, ast.FunctionDef) and definition.name in names}
+    missing = set(names) - set(functions)
+    if missing:
+        raise KeyError(f"{page} has no function {', '.join(sorted(missing))}")
+    body += [functions[name] for name in names]
+    namespace = {"__name__": "page_" + os.path.splitext(page)[0]}
+    exec(compile(ast.Module(body=body, type_ignores=[]), path, "exec"), namespace)
+    return [namespace[name] for name in names]
+
+def time_each(calls):
+    """Run each zero-argument call once, returning the latencies"""
+    latencies = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def time_repeated(call, repeats=BATCH_REPEATS):
+    # One untimed call first, so lazy imports and first-use caches are not counted
+    call()
+    return time_each([call] * repeats)
+
+def records(population):
+    return population.to_dict("records")
+
+# Scalar: one taxpayer per call, as a page rerun computes it
+
+@case("tac_calculator.calculate_tax", "scalar")
+def tac_calculate_tax(population):
+    from tax_compute import calculator_tax
+
+    calls = []
+    for record in records(population):
+        income = record["basic_salary"] + record["da"] + record["hra"] + record["cca"]
+        deductions = min(sum(record[name] for name in ("lic_pli", "ppf", "elss", "tuition_fee")), 150000)
+        regime = "Old" if record["tax_regime"] == "Old Regime" else "New"
+        age = 65 if record["is_senior"] else 35
+        calls.append(lambda income=income, deductions=deductions, regime=regime, age=age:
+                     calculator_tax(income, deductions, regime, age))
+    return 1, time_each(calls)
+
+@case("tac_calculator.calculate_salary", "scalar")
+def tac_calculate_salary(population):
+    calculate_salary, = page_functions("Tac_Calculator.py", "calculate_salary")
+    calls = [lambda record=record: calculate_salary(record["basic_salary"] / 12, 42, 16, record["cca"] / 12, 12,
+                                                    record["tds_already_deducted"], 200)
+             for record in records(population)]
+    return 1, time_each(calls)
+
+@case("tax_filing.filing_graph", "scalar")
+def tax_filing_graph(population):
+    from filing_graph import FILING_NODES, FilingGraph
+    from tax_compute import filing_inputs
+
+    def file(inputs):
+        # A fresh session filling in the whole form
+        graph = FilingGraph()
+        graph.set(**inputs)
+        for name in FILING_NODES:
+            graph[name]
+
+    calls = [lambda inputs=filing_inputs(record): file(inputs) for record in records(population)]
+    return 1, time_each(calls)
+
+@case("tax_filing.filing_graph_edit", "scalar")
+def tax_filing_graph_edit(population):
+    from filing_graph import FILING_NODES, FilingGraph
+    from tax_compute import filing_inputs
+
+    # One long session editing the form: each rerun changes a taxpayer's worth of inputs
+    graph = FilingGraph()
+
+    def rerun(inputs):
+        graph.begin_run()
+        graph.set(**inputs)
+        for name in FILING_NODES:
+            graph[name]
+
+    calls = [lambda inputs=filing_inputs(record): rerun(inputs) for record in records(population)]
+    return 1, time_each(calls)
+
+@case("tax_filing.num_to_words", "scalar")
+def tax_filing_num_to_words(population):
+    from amount_words import num_to_words
+
+    # Distinct amounts, so the words cache does not answer every call
+    amounts = (population["basic_salary"] * 0.05 + np.arange(len(population)) + 0.37).tolist()
+    calls = [lambda amount=amount: num_to_words(amount) for amount in amounts]
+    return 1, time_each(calls)
+
+@case("home.sidebar_estimate", "scalar")
+def home_sidebar_estimate(population):
+    from deductions import apply_deductions
+    from intent_router import ASSISTANT_FY
+    from tax_compute import estimate_tax
+
+    def estimate(record):
+        claims = {"other_80c": record["ppf"] + record["elss"], "mediclaim": record["mediclaim"],
+                  "education_loan_interest": record["education_loan_interest"],
+                  "home_loan_principal": record["home_loan_principal"]}
+        income = record["basic_salary"] + record["da"] + record["hra"]
+        taxable = max(0, income - apply_deductions(claims, fy=ASSISTANT_FY)["total"])
+        regime = "old" if record["tax_regime"] == "Old Regime" else "new"
+        return estimate_tax(taxable, regime, ASSISTANT_FY)
+
+    calls = [lambda record=record: estimate(record) for record in records(population)]
+    return 1, time_each(calls)
+
+# Batch: the whole population in one call
+
+@case("bulk_filing.compute_roster", "batch")
+def bulk_compute_roster(population):
+    from bulk_filing import compute_roster, normalize_roster
+
+    roster = normalize_roster(population)
+    return len(roster), time_repeated(lambda: compute_roster(roster))
+
+@case("bulk_filing.compute_roster_exact", "batch")
+def bulk_compute_roster_exact(population):
+    from bulk_filing import compute_roster, normalize_roster
+
+    roster = normalize_roster(population)
+    return len(roster), time_repeated(lambda: compute_roster(roster, exact=True))
+
+@case("tax_engine.calculate_tax_batch", "batch")
+def engine_tax_batch(population):
+    from tax_engine import calculate_tax_batch
+
+    income = population["basic_salary"].to_numpy() + population["da"].to_numpy()
+    is_senior = population["is_senior"].to_numpy()
+    return len(income) * 2, time_repeated(lambda: (calculate_tax_batch(income, is_senior, "Old Regime"),
+                                                   calculate_tax_batch(income, is_senior, "New Regime")))
+
+@case("tax_engine.calculate_tax_batch_paise", "batch")
+def engine_tax_batch_paise(population):
+    from paise import to_paise_array
+    from tax_engine import calculate_tax_batch_paise
+
+    income = to_paise_array(population["basic_salary"].to_numpy() + population["da"].to_numpy())
+    tds = to_paise_array(population["tds_already_deducted"].to_numpy())
+    is_senior = population["is_senior"].to_numpy()
+    return len(income) * 2, time_repeated(lambda: (calculate_tax_batch_paise(income, is_senior, "Old Regime", tds=tds),
+                                                   calculate_tax_batch_paise(income, is_senior, "New Regime", tds=tds)))
+
+@case("salary_schedule.salary_schedule", "batch")
+def batch_salary_schedule(population):
+    from salary_schedule import salary_schedule
+
+    base_pay = population["basic_salary"].to_numpy() / 12
+    cca = population["cca"].to_numpy() / 12
+    income_tax = population["tds_already_deducted"].to_numpy()
+    return len(base_pay), time_repeated(lambda: salary_schedule(base_pay, 42, 16, cca, 12, income_tax, 200))
+
+@case("deductions.apply_deductions_batch", "batch")
+def batch_deductions(population):
+    from bulk_filing import DEDUCTION_COLUMNS, normalize_roster
+    from deductions import apply_deductions_batch
+
+    roster = normalize_roster(population)
+    claims = {column: roster[column].to_numpy(dtype=np.float64) for column in DEDUCTION_COLUMNS}
+    is_senior = roster["is_senior"].to_numpy()
+    disabled = roster["disabled_person"].to_numpy()
+    return len(roster), time_repeated(lambda: apply_deductions_batch(claims, is_senior, disabled))
+
+@case("amount_words.amounts_to_words", "batch")
+def batch_amounts_to_words(population):
+    from amount_words import amounts_to_words, num_to_words, rupees_to_words
+
+    amounts = population["basic_salary"].to_numpy() * 0.05 + np.arange(len(population)) + 0.37
+
+    def convert():
+        # Cold caches, or every repeat after the first would be free
+        num_to_words.cache_clear()
+        rupees_to_words.cache_clear()
+        amounts_to_words(amounts)
+
+    return len(amounts), time_repeated(convert)
+
+# Exports: the files the pages offer for download
+
+@case("tac_calculator.create_excel_with_format", "export")
+def export_salary_workbook(population):
+    calculate_salary, create_excel_with_format = page_functions("Tac_Calculator.py", "calculate_salary",
+                                                                "create_excel_with_format")
+    sample = records(population.head(EXPORT_SAMPLE))
+    frames = [calculate_salary(record["basic_salary"] / 12, 42, 16, record["cca"] / 12, 12,
+                               record["tds_already_deducted"], 200) for record in sample]
+    calls = [lambda df=df, record=record: create_excel_with_format(df, record["tds_already_deducted"], "March")
+             for df, record in zip(frames, sample)]
+    return 1, time_each(calls)
+
+@case("tax_filing.to_excel", "export")
+def export_filing_workbook(population):
+    import pandas as pd
+    from bulk_filing import compute_roster, declaration_table, normalize_roster
+
+    to_excel, = page_functions("Tax_Filing.py", "to_excel")
+    result = compute_roster(normalize_roster(population.head(EXPORT_SAMPLE)))
+    frames = []
+    for record in result.to_dict("records"):
+        rows = declaration_table(record)
+        frames.append(pd.DataFrame(rows[1:], columns=rows[0]))
+    calls = [lambda df=df: to_excel(df) for df in frames]
+    return 1, time_each(calls)
+
+@case("bulk_filing.write_summary", "export")
+def export_summary_workbook(population):
+    import io
+    from bulk_filing import compute_roster, normalize_roster, write_summary
+
+    result = compute_roster(normalize_roster(population))
+    return len(result), time_repeated(lambda: write_summary(result, io.BytesIO()))
+
+# Auth: db.py against a throwaway SQLite database, at the cheapest bcrypt work factor
+
+def auth_users(population):
+    from db import run_migrations
+
+    run_migrations()
+    return [(f"user{i:06d}", f"pass-{pan}") for i, pan in enumerate(population["pan"].head(AUTH_SAMPLE))]
+
+@case("db.add_user", "auth")
+def auth_add_user(population):
+    from db import add_user
+
+    calls = [lambda username=username, password=password: add_user(username, password)
+             for username, password in auth_users(population)]
+    return 1, time_each(calls)
+
+@case("db.authenticate", "auth")
+def auth_authenticate(population):
+    from db import add_user, authenticate
+
+    users = auth_users(population)
+    for username, password in users:
+        add_user(username, password)
+    calls = [lambda username=username, password=password: authenticate(username, password)
+             for username, password in users]
+    return 1, time_each(calls)
+
+@case("db.user_exists", "auth")
+def auth_user_exists(population):
+    from db import add_user, user_exists
+
+    users = auth_users(population)
+    for username, password in users[::2]:
+        add_user(username, password)
+    calls = [lambda username=username: user_exists(username) for username, _ in users]
+    return 1, time_each(calls)
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def percentile_ms(latencies, q):
+    return round(float(np.percentile(latencies, q)) * 1000, 4)
+
+def run_case(name, size, seed, database_path):
+    """Run one case in a fresh worker process and summarize it"""
+    # Before db.py is imported, so the engine and password settings pick them up
+    os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    os.environ.setdefault("PASSWORD_VERIFY_CACHE_TTL", "0")
+    from population import make_population
+
+    mode, func = CASES[name]
+    population = make_population(size, seed)
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    items, latencies = func(population)
+    # Includes per-case setup such as loading page functions and seeding users
+    seconds = time.perf_counter() - start
+    peak = peak_rss_mb()
+    return {
+        "mode": mode,
+        "items_per_call": items,
+        "calls": len(latencies),
+        "seconds": round(seconds, 4),
+        "throughput_per_s": round(items * len(latencies) / sum(latencies), 2),
+        "latency_ms": {"mean": round(float(np.mean(latencies)) * 1000, 4), "p50": percentile_ms(latencies, 50),
+                       "p90": percentile_ms(latencies, 90), "p99": percentile_ms(latencies, 99),
+                       "max": round(max(latencies) * 1000, 4)},
+        "peak_rss_mb": round(peak, 1),
+        "rss_growth_mb": round(peak - baseline, 1),
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=LLAMA_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(size, seed, only=None):
+    names = [name for name in CASES if not only or any(part in name for part in only)]
+    report = {
+        "version": REPORT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "size": size,
+        "seed": seed,
+        "cases": {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for index, name in enumerate(names):
+            # A new process per case: clean caches and a peak RSS of its own
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                result = pool.submit(run_case, name, size, seed, os.path.join(directory, f"{index}.db")).result()
+            report["cases"][name] = result
+            latency = result["latency_ms"]
+            print(f"{name:<42} {result['throughput_per_s']:>12,.1f}/s  p50 {latency['p50']:>9.3f} ms  "
+                  f"p99 {latency['p99']:>9.3f} ms  peak {result['peak_rss_mb']:>7.1f} MB", flush=True)
+    return report
+
+def compare(report, previous, threshold=REGRESSION_THRESHOLD):
+    """Cases that got worse than previous by more than threshold, as printable lines"""
+    regressions = []
+    if (report["size"], report["seed"]) != (previous.get("size"), previous.get("seed")):
+        print(f"warning: comparing size {report['size']} seed {report['seed']} against "
+              f"size {previous.get('size')} seed {previous.get('seed')}")
+    for name, result in report["cases"].items():
+        before = previous.get("cases", {}).get(name)
+        if before is None:
+            continue
+        # Each as the relative amount by which it got worse
+        changes = {
+            "throughput down": 1 - result["throughput_per_s"] / before["throughput_per_s"],
+            "p99 latency up": (result["latency_ms"]["p99"] / before["latency_ms"]["p99"] - 1
+                               if max(result["latency_ms"]["p99"], before["latency_ms"]["p99"]) >= MIN_COMPARED_MS
+                               else 0.0),
+            "peak memory up": result["peak_rss_mb"] / before["peak_rss_mb"] - 1,
+        }
+        for metric, change in changes.items():
+            if change > threshold:
+                regressions.append(f"{name}: {metric} {change * 100:.1f}%")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--size", type=int, default=2000, help="taxpayers in the synthetic population")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", action="append", help="run only cases whose name contains this; repeatable")
+    parser.add_argument("--output", "-o", help="write the JSON report here")
+    parser.add_argument("--compare", help="earlier JSON report to check for regressions")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="relative change counted as a regression (default 0.10)")
+    args = parser.parse_args()
+
+    report = run_suite(args.size, args.seed, args.only)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            previous = json.load(file)
+        regressions = compare(report, previous, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare} (threshold {args.threshold:.0%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+import argparse
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from amount_words import amounts_to_words
+from deductions import SECTION_80C_CLAIMS, apply_deductions_batch
+from excel_export import export_workbook
+from instrumentation import timed
+from rules import DEFAULT_FY, get_rules
+from paise import from_paise, to_paise_array
+from tax_engine import calculate_tax_batch, calculate_tax_batch_paise
+
+# Headless version of pages/Tax_Filing.py for HR teams filing for many staff
+# at once. The roster is computed column-wise with the batch tax engine and
+# the per-employee declaration workbooks are rendered on a process pool.
+#
+#   python bulk_filing.py roster.csv output_dir
+
+BULK_WORKERS = int(os.environ.get("BULK_WORKERS", os.cpu_count() or 1))
+# Employees per pool task; large enough that pickling is not the bottleneck
+BULK_CHUNK_SIZE = int(os.environ.get("BULK_CHUNK_SIZE", 250))
+
+# Roster columns and their defaults, named after the Tax Filing page widgets
+TEXT_COLUMNS = {
+    "name": "", "pan": "", "designation": "", "department": "",
+    "tax_regime": "Old Regime", "others_specified": "",
+}
+FLAG_COLUMNS = {"is_senior": False, "disabled_person": False}
+AMOUNT_COLUMNS = [
+    # Income
+    "basic_salary", "agp_gp", "da", "hra", "cca", "ir", "other_allowances", "perquisites", "pension",
+    "others_amount", "additional_income", "epf_subscription", "professional_tax", "rent_paid",
+    # House Property
+    "rent_received", "property_tax", "housing_loan_interest",
+    # Other Income
+    "savings_interest", "fd_interest", "exam_remuneration", "other_sources",
+    # Deductions
+    "lic_pli", "nsc", "ppf", "elss", "home_loan_principal", "tuition_fee", "tax_saver_fd", "sukanya_samriddhi",
+    "additional_nps", "mediclaim", "education_loan_interest", "affordable_house_interest", "ev_loan_interest",
+    "donations", "rent_paid_deduction",
+    # Tax Calculation
+    "tds_already_deducted",
+]
+# Roster columns claimed under Chapter VI-A, named as the deduction claims
+DEDUCTION_COLUMNS = SECTION_80C_CLAIMS + [
+    "epf_subscription", "additional_nps", "mediclaim", "education_loan_interest", "affordable_house_interest",
+    "ev_loan_interest", "donations", "rent_paid_deduction", "savings_interest", "fd_interest",
+]
+
+# Rows of the declaration workbook: (section, field, result column)
+DECLARATION_ROWS = [
+    ("Personal Details", "Name", "name"),
+    ("", "PAN Number", "pan"),
+    ("", "Designation", "designation"),
+    ("", "Department", "department"),
+    ("", "Senior Citizen", "senior_citizen"),
+    ("", "Tax Regime", "tax_regime"),
+    ("Income Details", "Basic Salary", "basic_salary"),
+    ("", "AGP/GP", "agp_gp"),
+    ("", "DA", "da"),
+    ("", "HRA", "hra"),
+    ("", "CCA", "cca"),
+    ("", "IR", "ir"),
+    ("", "Other Allowances", "other_allowances"),
+    ("", "Perquisites", "perquisites"),
+    ("", "Pension", "pension"),
+    ("", "Others (Specified)", "others"),
+    ("", "Additional Income", "additional_income"),
+    ("", "Income from House Property", "net_house_income"),
+    ("", "Income from Other Sources", "total_other_income"),
+    ("Deductions", "EPF Subscription", "epf_subscription"),
+    ("", "Section 80C (capped)", "capped_80c"),
+    ("", "Additional NPS (80CCD(1B))", "additional_nps"),
+    ("", "Mediclaim (80D)", "mediclaim"),
+    ("", "Education Loan Interest (80E)", "education_loan_interest"),
+    ("", "Affordable Housing Interest (80EEA)", "affordable_house_interest"),
+    ("", "Electric Vehicle Loan Interest (80EEB)", "ev_loan_interest"),
+    ("", "Donations (80G)", "donations"),
+    ("", "Rent Paid (80GG)", "rent_paid_deduction"),
+    ("", "Savings Interest (80TTA/TTB)", "interest_deduction"),
+    ("", "Disability (80U)", "disability_deduction"),
+    ("", "Total Deductions", "total_deductions"),
+    ("", "HRA Exemption", "hra_exemption"),
+    ("", "Standard Deduction", "standard_deduction"),
+    ("Tax Calculation", "Gross Total Income", "gross_total_income"),
+    ("", "Taxable Income", "taxable_income"),
+    ("", "Tax Calculated", "tax"),
+    ("", "Rebate u/s 87A", "rebate"),
+    ("", "Tax after Rebate", "tax_after_rebate"),
+    ("", "Education & Health Cess (4%)", "cess"),
+    ("", "Total Tax Liability", "total_tax"),
+    ("", "Remaining Tax to be Paid", "remaining_tax"),
+    ("", "Remaining Tax in Words", "remaining_tax_in_words"),
+]
+OLD_ONLY_ROWS = {"epf_subscription", "capped_80c", "additional_nps", "mediclaim", "education_loan_interest",
+                 "affordable_house_interest", "ev_loan_interest", "donations", "rent_paid_deduction",
+                 "interest_deduction", "disability_deduction", "total_deductions", "hra_exemption",
+                 "standard_deduction"}
+TAX_KEYS = ["gross_total_income", "taxable_income", "tax", "rebate", "tax_after_rebate", "cess", "total_tax", "remaining_tax",
+            "remaining_tax_in_words"]
+
+SUMMARY_COLUMNS = ["name", "pan", "designation", "department", "senior_citizen", "tax_regime", "salary_total",
+                   "gross_total_income", "total_deductions", "taxable_income", "total_tax", "tds_already_deducted",
+                   "remaining_tax", "old_total_tax", "new_total_tax", "recommended_regime", "workbook"]
+
+def read_roster(path):
+    """Employee roster from a CSV, Parquet or Excel file, with missing columns filled in"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        roster = pd.read_csv(path)
+    elif extension == ".parquet":
+        roster = pd.read_parquet(path)
+    elif extension in (".xlsx", ".xls"):
+        roster = pd.read_excel(path)
+    else:
+        raise ValueError(f"Unsupported roster file: {path}")
+    return normalize_roster(roster)
+
+def normalize_roster(roster):
+    roster = roster.rename(columns=lambda column: str(column).strip().lower().replace(" ", "_"))
+    for column, default in TEXT_COLUMNS.items():
+        roster[column] = roster[column].fillna(default).astype(str) if column in roster else default
+    for column, default in FLAG_COLUMNS.items():
+        if column in roster:
+            values = roster[column].astype(str).str.strip().str.lower()
+            roster[column] = values.isin(["true", "yes", "y", "1", "1.0"])
+        else:
+            roster[column] = default
+    for column in AMOUNT_COLUMNS:
+        if column in roster:
+            roster[column] = pd.to_numeric(roster[column], errors="coerce").fillna(0.0).clip(lower=0.0)
+        else:
+            roster[column] = 0.0
+    return roster.reset_index(drop=True)
+
+@timed("tax.compute_roster")
+def compute_roster(roster, fy=DEFAULT_FY, exact=False):
+    """Run the Tax Filing computation for every employee at once.
+
+    Returns a DataFrame with the roster columns plus the derived amounts and
+    both regimes' tax, one row per employee. With exact, tax is computed in
+    whole paise and the total rounded to ten rupees (Section 288B), so
+    reconciliation runs match to the paisa.
+    """
+    r = {column: roster[column].to_numpy(dtype=np.float64) for column in AMOUNT_COLUMNS}
+    is_senior = roster["is_senior"].to_numpy(dtype=bool)
+    is_old = roster["tax_regime"].str.strip().str.lower().str.startswith("old").to_numpy()
+
+    rules = get_rules(fy)
+    limits = rules.limits
+
+    # Same widget limit as the Tax Filing page
+    housing_loan_interest = np.minimum(r["housing_loan_interest"], limits["24(b)"])
+
+    salary_total = (r["basic_salary"] + r["agp_gp"] + r["da"] + r["hra"] + r["cca"] + r["ir"] + r["other_allowances"]
+                    + r["perquisites"] + r["pension"] + r["others_amount"] + r["additional_income"])
+
+    basic_for_hra = r["basic_salary"] + r["agp_gp"]
+    rent_minus_10_percent = np.maximum(0, r["rent_paid"] - basic_for_hra * rules.hra["rent_over_basic_percent"])
+    hra_exemption = np.minimum.reduce([r["hra"], rent_minus_10_percent, basic_for_hra * rules.hra["basic_percent"]])
+    standard_deduction = np.minimum(rules.standard_deduction("old"), salary_total)
+
+    net_annual_value = r["rent_received"] - r["property_tax"]
+    net_house_income = net_annual_value - net_annual_value * rules.house_property["repairs_percent"] - housing_loan_interest
+    total_other_income = r["savings_interest"] + r["fd_interest"] + r["other_sources"]
+
+    allowed = apply_deductions_batch({column: r[column] for column in DEDUCTION_COLUMNS}, is_senior,
+                                     roster["disabled_person"].to_numpy(dtype=bool), fy)
+    total_deductions = allowed["total"]
+
+    old_gross = salary_total - hra_exemption - standard_deduction - r["professional_tax"] + net_house_income + total_other_income
+    new_gross = salary_total - r["professional_tax"] + net_house_income + total_other_income
+
+    result = roster.copy()
+    result["senior_citizen"] = np.where(is_senior, "Yes", "No")
+    result["tax_regime"] = np.where(is_old, "Old Regime", "New Regime")
+    result["others"] = roster["others_specified"] + ": " + roster["others_amount"].astype(str)
+    result["housing_loan_interest"] = housing_loan_interest
+    result["additional_nps"] = allowed["80CCD(1B)"]
+    result["mediclaim"] = allowed["80D"]
+    result["affordable_house_interest"] = allowed["80EEA"]
+    result["salary_total"] = salary_total
+    result["net_house_income"] = net_house_income
+    result["total_other_income"] = total_other_income
+    result["capped_80c"] = allowed["80C"]
+    result["interest_deduction"] = allowed["80TTA"] + allowed["80TTB"]
+    result["disability_deduction"] = allowed["80U"]
+
+    tds = r["tds_already_deducted"]
+    for prefix, regime, gross, taxable_income in (
+            ("old_", "Old Regime", old_gross, np.maximum(0, old_gross - total_deductions)),
+            ("new_", "New Regime", new_gross, np.maximum(0, new_gross))):
+        if exact:
+            tax = calculate_tax_batch_paise(to_paise_array(taxable_income), is_senior, regime, fy, to_paise_array(tds))
+            tax = {key: from_paise(values) for key, values in tax.items()}
+        else:
+            tax = calculate_tax_batch(taxable_income, is_senior, regime, fy)
+            tax["remaining_tax"] = np.maximum(0, tax["total_tax"] - tds)
+        result[prefix + "gross_total_income"] = gross
+        result[prefix + "taxable_income"] = taxable_income
+        for key, values in tax.items():
+            result[prefix + key] = values
+        result[prefix + "remaining_tax_in_words"] = amounts_to_words(result[prefix + "remaining_tax"].to_numpy())
+
+    # The employee's chosen regime; deductions and exemptions only apply to the Old Regime
+    result["hra_exemption"] = np.where(is_old, hra_exemption, 0)
+    result["standard_deduction"] = np.where(is_old, standard_deduction, 0)
+    result["total_deductions"] = np.where(is_old, total_deductions, 0)
+    for key in TAX_KEYS:
+        result[key] = np.where(is_old, result["old_" + key], result["new_" + key])
+    result["recommended_regime"] = np.where(result["old_total_tax"] < result["new_total_tax"], "Old Regime",
+                                            np.where(result["new_total_tax"] < result["old_total_tax"], "New Regime", "Either"))
+    return result
+
+def _workbook_name(index, record):
+    stem = re.sub(r"[^A-Za-z0-9]+", "_", f"{record['name']}_{record['pan']}").strip("_") or "employee"
+    return f"{index + 1:05d}_{stem}.xlsx"
+
+def declaration_table(record):
+    """Rows of one employee's declaration workbook, as on the Tax Filing page"""
+    header = ["Parameter", "Field", "Value", "Old Regime", "New Regime"]
+    rows = [header]
+    for section, field, key in DECLARATION_ROWS:
+        if key in TAX_KEYS:
+            old, new = record["old_" + key], record["new_" + key]
+        else:
+            old = record[key]
+            new = "N/A" if key in OLD_ONLY_ROWS else record[key]
+        if key == "tax_regime":
+            old, new = "Old Regime", "New Regime"
+        rows.append([section, field, record[key], old, new])
+    return rows
+
+def _write_workbook(path, rows):
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path)
+    worksheet = workbook.add_worksheet("Sheet1")
+    bold = workbook.add_format({"bold": True})
+    money = workbook.add_format({"num_format": "#,##0.00"})
+    worksheet.set_column(0, 0, 18)
+    worksheet.set_column(1, 1, 38)
+    worksheet.set_column(2, 4, 22)
+    for row_number, row in enumerate(rows):
+        for column_number, value in enumerate(row):
+            if row_number == 0:
+                worksheet.write_string(row_number, column_number, value, bold)
+            elif isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+                worksheet.write_number(row_number, column_number, float(value), money)
+            else:
+                worksheet.write_string(row_number, column_number, str(value))
+    workbook.close()
+
+def _render_chunk(records, output_dir):
+    """Runs in a worker process; writes one workbook per (index, record) pair"""
+    paths = []
+    for index, record in records:
+        path = os.path.join(output_dir, _workbook_name(index, record))
+        _write_workbook(path, declaration_table(record))
+        paths.append(path)
+    return paths
+
+@timed("export.workbooks")
+def render_workbooks(result, output_dir, workers=BULK_WORKERS, chunk_size=BULK_CHUNK_SIZE):
+    """Write every employee's declaration workbook and return their paths in roster order"""
+    os.makedirs(output_dir, exist_ok=True)
+    columns = sorted({key for _, _, key in DECLARATION_ROWS} | {"old_" + key for key in TAX_KEYS}
+                     | {"new_" + key for key in TAX_KEYS})
+    records = list(enumerate(result[columns].to_dict("records")))
+    chunks = [records[start:start + chunk_size] for start in range(0, len(records), chunk_size)]
+    if workers <= 1 or len(chunks) <= 1:
+        return [path for chunk in chunks for path in _render_chunk(chunk, output_dir)]
+    # spawn, not fork, in case this is called from the multi-threaded Streamlit server
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [executor.submit(_render_chunk, chunk, output_dir) for chunk in chunks]
+        return [path for future in futures for path in future.result()]
+
+@timed("export.summary")
+def write_summary(result, path):
+    summary = result[SUMMARY_COLUMNS[:-1]].copy()
+    if "workbook" in result:
+        summary["workbook"] = result["workbook"].map(os.path.basename)
+    export_workbook({"Summary": summary}, path)
+    return path
+
+def file_roster(roster_path, output_dir, fy=DEFAULT_FY, workers=BULK_WORKERS, exact=False):
+    """Compute taxes for a roster file and write the workbooks and summary.
+
+    Returns the computed DataFrame and a dict of timings in seconds.
+    """
+    timings = {}
+    start = time.perf_counter()
+    roster = read_roster(roster_path)
+    timings["read"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = compute_roster(roster, fy, exact)
+    timings["compute"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result["workbook"] = render_workbooks(result, output_dir, workers)
+    timings["workbooks"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    write_summary(result, os.path.join(output_dir, "summary.xlsx"))
+    timings["summary"] = time.perf_counter() - start
+    return result, timings
+
+def main():
+    parser = argparse.ArgumentParser(description="File income tax declarations for a whole employee roster")
+    parser.add_argument("roster", help="CSV, Parquet or Excel file with one employee per row")
+    parser.add_argument("output_dir", help="Directory for the per-employee workbooks and summary.xlsx")
+    parser.add_argument("--fy", default=DEFAULT_FY, help=f"Financial year (default {DEFAULT_FY})")
+    parser.add_argument("--workers", type=int, default=BULK_WORKERS, help="Processes used to write workbooks")
+    parser.add_argument("--exact", action="store_true",
+                        help="Compute tax in whole paise with Section 288B rounding")
+    args = parser.parse_args()
+
+    result, timings = file_roster(args.roster, args.output_dir, args.fy, args.workers, args.exact)
+    print(f"{len(result)} employees filed to {args.output_dir}")
+    for step, seconds in timings.items():
+        print(f"  {step}: {seconds:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import os
+import re
+
+# Prompt budget for llama3-8b-8192: the context window minus room for the reply
+MAX_PROMPT_TOKENS = int(os.environ.get("LLM_MAX_PROMPT_TOKENS", 6000))
+SUMMARY_MAX_TOKENS = int(os.environ.get("LLM_SUMMARY_MAX_TOKENS", 400))
+SUMMARY_CHARS_PER_MESSAGE = 160
+
+# Per-message overhead of the chat format (role markers etc.)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_token_pattern = re.compile(r"\w+|[^\w\s]")
+
+def count_tokens(text):
+    """Approximate Llama token count: words and punctuation, with long words split"""
+    tokens = 0
+    for piece in _token_pattern.findall(text):
+        tokens += 1 + len(piece) // 8
+    return tokens + MESSAGE_OVERHEAD_TOKENS
+
+def _summarize(message):
+    """One line for a dropped turn: its first sentence, shortened"""
+    text = " ".join(message["content"].split())
+    first_sentence = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+    if len(first_sentence) > SUMMARY_CHARS_PER_MESSAGE:
+        first_sentence = first_sentence[:SUMMARY_CHARS_PER_MESSAGE].rstrip() + "..."
+    role = "User" if message["role"] == "user" else "Assistant"
+    return f"{role}: {first_sentence}"
+
+class HistoryWindow:
+    """Keeps the chat history sent to the model under a token budget.
+
+    Token counts are computed once per message and the window only moves
+    forward, so each request costs O(new messages). Turns that fall out of
+    the window are folded into a short running summary that is sent as a
+    system message instead.
+    """
+
+    def __init__(self, max_prompt_tokens=MAX_PROMPT_TOKENS, summary_max_tokens=SUMMARY_MAX_TOKENS):
+        self.max_prompt_tokens = max_prompt_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.token_counts = []
+        self.start = 0
+        self.window_tokens = 0
+        self.summary_lines = []
+        self.summary_tokens = 0
+        self.last_metrics = {}
+
+    def _add_summary(self, message):
+        line = _summarize(message)
+        self.summary_lines.append(line)
+        self.summary_tokens += count_tokens(line)
+        # Forget the oldest summary lines first
+        while self.summary_tokens > self.summary_max_tokens and len(self.summary_lines) > 1:
+            self.summary_tokens -= count_tokens(self.summary_lines.pop(0))
+
+    def summary_message(self):
+        if not self.summary_lines:
+            return None
+        return {"role": "system", "content": "Summary of earlier conversation:\n" + "\n".join(self.summary_lines)}
+
+    def build_messages(self, prefix, history):
+        """prefix (system prompt etc.) plus as much recent history as fits the budget"""
+        if len(history) < len(self.token_counts):
+            # History was reset (e.g. a new chat); start over
+            self.__init__(self.max_prompt_tokens, self.summary_max_tokens)
+
+        for message in history[len(self.token_counts):]:
+            count = count_tokens(message["content"])
+            self.token_counts.append(count)
+            self.window_tokens += count
+
+        prefix_tokens = sum(count_tokens(message["content"]) for message in prefix)
+        # Always keep the newest message, even if it alone is over budget
+        while (self.start < len(history) - 1
+               and prefix_tokens + self.summary_tokens + self.window_tokens > self.max_prompt_tokens):
+            self._add_summary(history[self.start])
+            self.window_tokens -= self.token_counts[self.start]
+            self.start += 1
+
+        summary = self.summary_message()
+        messages = [*prefix, *([summary] if summary else []), *history[self.start:]]
+        self.last_metrics = {
+            "prompt_tokens": prefix_tokens + self.summary_tokens + self.window_tokens,
+            "prefix_tokens": prefix_tokens,
+            "summary_tokens": self.summary_tokens,
+            "history_tokens": self.window_tokens,
+            "messages_sent": len(history) - self.start,
+            "messages_summarized": self.start,
+        }
+        return messages
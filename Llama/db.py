@@ -1,66 +1,184 @@
+import os
+import threading
+from functools import lru_cache
+
 import streamlit as st
-import pandas as pd
-import bcrypt
-from sqlalchemy import text 
-
-# Establish MySQL connection using Streamlit's connection API
-conn = st.connection("mysql", type="sql", autocommit=True)
-if conn:
-    print('connetion success'
+import passwords
+from instrumentation import span, timed
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL
+from sqlalchemy.exc import IntegrityError
+
+# Connection pool sizing, overridable per deployment
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 20))
+POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", 30))
+POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+
+# Statements are built once at import; SQLAlchemy caches their compiled form
+# and every value is sent as a bound parameter, never formatted into the SQL.
+SELECT_USER = text("SELECT id, username, password FROM users WHERE username = :username")
+USER_EXISTS = text("SELECT 1 FROM users WHERE username = :username LIMIT 1")
+INSERT_USER = text("INSERT INTO users (username, password) VALUES (:username, :password)")
+UPDATE_PASSWORD = text("UPDATE users SET password = :password WHERE id = :id")
+
+def get_database_url():
+    """DATABASE_URL from the environment, else the [connections.mysql] block in secrets.toml"""
+    url = os.environ.get("DATABASE_URL")
+    if url:
+        return url
+    settings = st.secrets["connections"]["mysql"]
+    if "url" in settings:
+        return settings["url"]
+    dialect = settings.get("dialect", "mysql")
+    driver = settings.get("driver")
+    return URL.create(
+        drivername=f"{dialect}+{driver}" if driver else dialect,
+        username=settings.get("username"),
+        password=settings.get("password"),
+        host=settings.get("host"),
+        port=settings.get("port"),
+        database=settings.get("database"),
+    )
+
+@lru_cache(maxsize=None)
+def get_engine():
+    """One pooled engine per process, shared by every session and rerun"""
+    return create_engine(
+        get_database_url(),
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECYCLE,
+        pool_pre_ping=True,
     )
-# Create users table if it doesn't exist
-def create_users_table():
-    query = text("""
+
+# Schema migrations, applied in order and recorded in schema_version. Add new
+# tables (filings, chat history, ...) by appending a (version, description,
+# function) entry; never edit one that has already shipped.
+def _create_users_table(connection, dialect):
+    if dialect == "sqlite":
+        id_column = "id INTEGER PRIMARY KEY AUTOINCREMENT"
+    else:
+        id_column = "id INT AUTO_INCREMENT PRIMARY KEY"
+    connection.execute(text(f"""
     CREATE TABLE IF NOT EXISTS users (
-        id INT AUTO_INCREMENT PRIMARY KEY,
+        {id_column},
         username VARCHAR(255) UNIQUE NOT NULL,
         password VARCHAR(255) NOT NULL
     );
-    """)
-    try:
-        with conn.session as session:
-            session.execute(query)
-            session.commit()  # Ensure the changes are committed
-        # st.success("Users table created successfully!")
-    except Exception as e:
-        print(e)
-        st.error(f"Error creating table: {e}")
-# Hash password securely
+    """))
+
+MIGRATIONS = [
+    (1, "create users table", _create_users_table),
+]
+
+_migration_lock = threading.Lock()
+_migrated = False
+
+def run_migrations():
+    """Bring the schema up to date. Only the first call in a process touches the database."""
+    global _migrated
+    if _migrated:
+        return
+    with _migration_lock:
+        if _migrated:
+            return
+        engine = get_engine()
+        try:
+            with span("db.migrate"), engine.begin() as connection:
+                connection.execute(text("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INT PRIMARY KEY,
+                    description VARCHAR(255) NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                """))
+                applied = {row[0] for row in connection.execute(text("SELECT version FROM schema_version"))}
+
+            for version, description, migrate in MIGRATIONS:
+                if version in applied:
+                    continue
+                try:
+                    with engine.begin() as connection:
+                        migrate(connection, engine.dialect.name)
+                        connection.execute(
+                            text("INSERT INTO schema_version (version, description) VALUES (:version, :description)"),
+                            {"version": version, "description": description},
+                        )
+                    print(f"Applied migration {version}: {description}")
+                except IntegrityError:
+                    # Another worker process applied it first
+                    pass
+            _migrated = True
+        except Exception as e:
+            print(e)
+            st.error(f"Error migrating database: {e}")
+
+# Hash password securely (bcrypt on the passwords worker pool)
 def hash_password(password):
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    return passwords.hash_password(password)
 
 # Verify password
 def verify_password(password, hashed):
-    # return bcrypt.checkpw(password.encode(), hashed.encode())
-    return password==hashed
-
-# Add new user to database - FIXED to use parameterized queries
+    return passwords.verify_password(password, hashed)
 
+# Add new user to database. The unique index on username does the existence
+# check, so signup is a single INSERT instead of a lookup followed by one.
+# Returns True when created, False when the username is taken and None on error.
+@timed("db.query", query="add_user")
 def add_user(username, password):
-    # password = hash_password(password)
-    
-    query = text("INSERT INTO users (username, password) VALUES (:username, :password)")
-    
     try:
-        with conn.session as session:
-            session.execute(query, {"username": username, "password": password})  
-            session.commit()  # Commit the transaction to save the user
-        print("Success: User added")
+        password = hash_password(password)
+        with get_engine().begin() as connection:
+            connection.execute(INSERT_USER, {"username": username, "password": password})
         return True
+    except IntegrityError:
+        return False
     except Exception as e:
         print(e)
         st.error(f"Error adding user: {e}")
-        return False
+        return None
 
-# Get user details from database - FIXED to use parameterized queries
+# Get user details from database
+@timed("db.query", query="get_user")
 def get_user(username):
-    print(username)
-    query = f"SELECT * FROM users WHERE username = '{username}'"
     try:
-        result = conn.query(query)
-        print('heee',result)
-        return result.iloc[0] if not result.empty else None
+        with get_engine().connect() as connection:
+            row = connection.execute(SELECT_USER, {"username": username}).mappings().first()
+        return dict(row) if row is not None else None
     except Exception as e:
-        print('exe login')
+        print(e)
         st.error(f"Error fetching user: {e}")
-        return None
\ No newline at end of file
+        return None
+
+# Check a login. Hashes made with an older work factor (or accounts still
+# holding a plaintext password) are transparently rehashed on success.
+def authenticate(username, password):
+    user = get_user(username)
+    if user is None or not verify_password(password, user["password"]):
+        return None
+    # A legacy plaintext password over the bcrypt limit stays as it is
+    if passwords.needs_rehash(user["password"]) and not passwords.password_too_long(password):
+        try:
+            new_hash = hash_password(password)
+            with span("db.query", query="update_password"), get_engine().begin() as connection:
+                connection.execute(UPDATE_PASSWORD, {"password": new_hash, "id": user["id"]})
+            user["password"] = new_hash
+        except Exception as e:
+            # The login itself succeeded; try again next time
+            print(e)
+    return user
+
+@timed("db.query", query="user_exists")
+def user_exists(username):
+    with get_engine().connect() as connection:
+        return connection.execute(USER_EXISTS, {"username": username}).first() is not None
+
+@timed("db.query", query="run_query")
+def run_query(query, params=None):
+    """Run a read-only query on the pooled engine and return a DataFrame"""
+    import pandas as pd
+
+    with get_engine().connect() as connection:
+        return pd.read_sql(text(query), connection, params=params)
@@ -0,0 +1,134 @@
+from functools import lru_cache
+
+import numpy as np
+
+from rules import DEFAULT_COUNTRY, DEFAULT_FY, get_rules
+
+# Chapter VI-A deductions, applied from the rules registry.
+#
+# Each FY's rules file lists its deduction sections declaratively: the
+# claims that count toward a section, its cap (with a higher one for senior
+# citizens), the shared cap it falls under (80C, 80CCC and 80CCD(1) share a
+# single limit, and EPF counts toward it) and who is eligible. The list is
+# compiled once per FY into a table of lines, so allowing a claim is one pass
+# over that table, either for one filer or for whole payroll arrays.
+
+# The itemized 80C claims, in the order the Tax Filing page and the bulk
+# filing roster list them
+SECTION_80C_CLAIMS = ["lic_pli", "nsc", "ppf", "elss", "home_loan_principal", "tuition_fee", "tax_saver_fd",
+                      "sukanya_samriddhi"]
+
+ELIGIBILITY = {
+    None: None,
+    "senior": lambda is_senior, disabled: is_senior,
+    "non_senior": lambda is_senior, disabled: ~is_senior if isinstance(is_senior, np.ndarray) else not is_senior,
+    "disabled": lambda is_senior, disabled: disabled,
+}
+
+def _limit(limits, name):
+    return None if name is None else limits[name]
+
+class DeductionTable:
+    """The deduction sections of one FY, compiled into lines.
+
+    A line is either a section on its own or all the sections under one
+    shared cap, and is reported under the section (or shared cap) name.
+    """
+
+    def __init__(self, rule_set):
+        limits = rule_set.limits
+        self.fy = rule_set.fy
+        lines = {}
+        for section in rule_set.deductions:
+            if section.get("eligible") not in ELIGIBILITY:
+                raise ValueError(f"Unknown eligibility {section['eligible']!r} for section {section['section']}")
+            part = (
+                tuple(section.get("claims", ())),
+                _limit(limits, section.get("cap")),
+                _limit(limits, section.get("senior_cap")),
+                ELIGIBILITY[section.get("eligible")],
+                _limit(limits, section.get("flat")),
+            )
+            shared = section.get("shared_cap")
+            name = shared or section["section"]
+            if name not in lines:
+                lines[name] = ([], _limit(limits, rule_set.shared_caps[shared]) if shared else None)
+            lines[name][0].append(part)
+        self.lines = tuple((name, tuple(parts), cap) for name, (parts, cap) in lines.items())
+        self.claims = frozenset(claim for _, parts, _ in self.lines for part in parts for claim in part[0])
+
+    def _check(self, claims):
+        if not self.claims.issuperset(claims):
+            unknown = set(claims) - self.claims
+            raise KeyError(f"Unknown deduction claims for FY {self.fy}: {', '.join(sorted(unknown))}")
+
+    def apply(self, claims, is_senior=False, disabled=False):
+        """Allowed amount per line for one filer, plus their "total".
+
+        claims maps claim names to amounts; anything not claimed is zero.
+        """
+        self._check(claims)
+        get = claims.get
+        allowed = {}
+        total = 0
+        for name, parts, shared_cap in self.lines:
+            amount = 0
+            for claim_names, cap, senior_cap, eligible, flat in parts:
+                if eligible is not None and not eligible(is_senior, disabled):
+                    continue
+                if flat is not None:
+                    amount += flat
+                    continue
+                claimed = 0
+                for claim in claim_names:
+                    claimed += get(claim, 0)
+                if is_senior and senior_cap is not None:
+                    cap = senior_cap
+                if cap is not None and claimed > cap:
+                    claimed = cap
+                amount += claimed
+            if shared_cap is not None and amount > shared_cap:
+                amount = shared_cap
+            allowed[name] = amount
+            total += amount
+        allowed["total"] = total
+        return allowed
+
+    def apply_batch(self, claims, is_senior=False, disabled=False):
+        """Same as apply, with arrays of claims and flags, one entry per filer"""
+        self._check(claims)
+        claims = {claim: np.asarray(values, dtype=np.float64) for claim, values in claims.items()}
+        size = max([len(values) for values in claims.values()] + [np.size(is_senior), np.size(disabled)])
+        is_senior = np.broadcast_to(np.asarray(is_senior, dtype=bool), (size,))
+        disabled = np.broadcast_to(np.asarray(disabled, dtype=bool), (size,))
+        zero = np.zeros(size)
+        allowed = {}
+        total = np.zeros(size)
+        for name, parts, shared_cap in self.lines:
+            amount = np.zeros(size)
+            for claim_names, cap, senior_cap, eligible, flat in parts:
+                if flat is not None:
+                    part = np.full(size, float(flat))
+                else:
+                    part = sum((claims.get(claim, zero) for claim in claim_names), zero)
+                    if senior_cap is not None:
+                        part = np.minimum(part, np.where(is_senior, senior_cap, np.inf if cap is None else cap))
+                    elif cap is not None:
+                        part = np.minimum(part, cap)
+                amount += part if eligible is None else np.where(eligible(is_senior, disabled), part, 0.0)
+            if shared_cap is not None:
+                amount = np.minimum(amount, shared_cap)
+            allowed[name] = amount
+            total += amount
+        allowed["total"] = total
+        return allowed
+
+@lru_cache(maxsize=None)
+def get_deduction_table(fy=DEFAULT_FY, country=DEFAULT_COUNTRY):
+    return DeductionTable(get_rules(fy, country))
+
+def apply_deductions(claims, is_senior=False, disabled=False, fy=DEFAULT_FY, country=DEFAULT_COUNTRY):
+    return get_deduction_table(fy, country).apply(claims, is_senior, disabled)
+
+def apply_deductions_batch(claims, is_senior=False, disabled=False, fy=DEFAULT_FY, country=DEFAULT_COUNTRY):
+    return get_deduction_table(fy, country).apply_batch(claims, is_senior, disabled)
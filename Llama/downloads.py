@@ -0,0 +1,248 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import streamlit as st
+
+from instrumentation import span
+
+# Generated files (Excel, Word) are served through st.download_button with a
+# deferred callable: nothing is built on page reruns, the file is generated
+# on the first click and later clicks for the same input are answered from
+# the artifact cache. The page only carries a small button message, never
+# the file itself.
+#
+# The cache is keyed by the content hash of the inputs and the user who asked
+# for the file, so concurrent sessions never share or overwrite an artifact.
+# Recent artifacts stay in memory. Setting ARTIFACT_DIR adds a disk tier they
+# spill to, so they survive memory eviction and server restarts. The files
+# hold users' salary and tax details, so the disk tier is off by default,
+# its directories are private to the app's user and files older than
+# ARTIFACT_TTL seconds are deleted. Both tiers are size-bounded LRUs.
+DOWNLOAD_CACHE_MB = int(os.environ.get("DOWNLOAD_CACHE_MB", 64))
+ARTIFACT_DISK_MB = int(os.environ.get("ARTIFACT_DISK_MB", 512))
+ARTIFACT_DIR = os.environ.get("ARTIFACT_DIR", "")
+ARTIFACT_TTL = int(os.environ.get("ARTIFACT_TTL", 24 * 3600))
+
+class DownloadCache:
+    """LRU of generated file bytes, bounded by total size"""
+
+    def __init__(self, max_bytes=DOWNLOAD_CACHE_MB * 2**20):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._files = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            data = self._files.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._files.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        with self._lock:
+            if key in self._files:
+                self.size -= len(self._files.pop(key))
+            if len(data) > self.max_bytes:
+                return
+            self._files[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._files.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._files.clear()
+            self.size = 0
+
+class DiskCache:
+    """Size-bounded LRU of files under a directory, one subdirectory per user.
+
+    Files expire ttl seconds after they were written, whether or not they
+    have been read since.
+    """
+
+    def __init__(self, directory=ARTIFACT_DIR, max_bytes=ARTIFACT_DISK_MB * 2**20, ttl=ARTIFACT_TTL):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._files = None
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        # Pick up files left by earlier runs, oldest first, and delete the expired ones
+        self._files = OrderedDict()
+        self.size = 0
+        found = []
+        expired_before = time.time() - self.ttl
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                if name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if stat.st_mtime < expired_before:
+                    self._remove(path)
+                    continue
+                found.append((stat.st_mtime, path, stat.st_size))
+        for written, path, size in sorted(found):
+            self._files[path] = (size, written)
+            self.size += size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def path(self, namespace, key):
+        return os.path.join(self.directory, namespace, key)
+
+    def get(self, namespace, key):
+        path = self.path(namespace, key)
+        with self._lock:
+            if self._files is None:
+                self._load()
+            if path not in self._files:
+                self.misses += 1
+                return None
+            size, written = self._files[path]
+            if time.time() - written > self.ttl:
+                del self._files[path]
+                self.size -= size
+                self._remove(path)
+                self.misses += 1
+                return None
+            try:
+                with open(path, "rb") as file:
+                    data = file.read()
+            except OSError:
+                del self._files[path]
+                self.size -= size
+                self.misses += 1
+                return None
+            self._files.move_to_end(path)
+            self.hits += 1
+            return data
+
+    def put(self, namespace, key, data):
+        path = self.path(namespace, key)
+        with self._lock:
+            if self._files is None:
+                self._load()
+            if len(data) > self.max_bytes:
+                return
+            try:
+                # Owner-only, so other local users cannot list whose files are cached
+                os.makedirs(self.directory, mode=0o700, exist_ok=True)
+                os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+                # Write then rename so a reader never sees a half-written file
+                with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix=".tmp", delete=False) as file:
+                    file.write(data)
+                os.replace(file.name, path)
+            except OSError as e:
+                print(e)
+                return
+            if path in self._files:
+                self.size -= self._files.pop(path)[0]
+            self._files[path] = (len(data), time.time())
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                evicted, (size, _) = self._files.popitem(last=False)
+                self.size -= size
+                self._remove(evicted)
+
+class ArtifactCache:
+    """Memory tier in front of an optional disk tier, keyed by (user, input hash)"""
+
+    def __init__(self, memory=None, disk=None):
+        self.memory = memory or DownloadCache()
+        self.disk = disk if disk is not None else (DiskCache() if ARTIFACT_DIR else None)
+
+    def get(self, namespace, key):
+        data = self.memory.get((namespace, key))
+        if data is None and self.disk is not None:
+            data = self.disk.get(namespace, key)
+            if data is not None:
+                self.memory.put((namespace, key), data)
+        return data
+
+    def put(self, namespace, key, data):
+        self.memory.put((namespace, key), data)
+        if self.disk is not None:
+            self.disk.put(namespace, key, data)
+
+    def get_or_build(self, namespace, key, build):
+        data = self.get(namespace, key)
+        if data is None:
+            with span("export.build", builder=getattr(build, "__qualname__", "build")):
+                data = build()
+            if hasattr(data, "getvalue"):
+                data = data.getvalue()
+            self.put(namespace, key, data)
+        return data
+
+artifact_cache = ArtifactCache()
+
+def _update(digest, part):
+    if hasattr(part, "columns") and hasattr(part, "index"):
+        import pandas as pd
+
+        digest.update(repr(list(part.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+    elif isinstance(part, (bytes, bytearray, memoryview)):
+        digest.update(part)
+    else:
+        digest.update(repr(part).encode())
+    # Separator so ("ab", "c") and ("a", "bc") differ
+    digest.update(b"\0")
+
+def content_key(*parts):
+    """Hash of everything a generated file depends on (DataFrames, bytes, plain values)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        _update(digest, part)
+    return digest.hexdigest()
+
+def user_namespace():
+    """Cache namespace of the current user: the logged-in username, else the browser session"""
+    user = st.session_state.get("username")
+    if not user:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        context = get_script_run_ctx()
+        user = f"session:{context.session_id}" if context else "anonymous"
+    return hashlib.sha256(str(user).encode()).hexdigest()[:16]
+
+def deferred(build, *key_parts, namespace=None):
+    """Zero-argument callable for st.download_button that builds the file once per key"""
+    key = content_key(getattr(build, "__module__", ""), getattr(build, "__qualname__", repr(build)), *key_parts)
+    # Resolved now: the callable runs on another thread without the session
+    namespace = namespace or user_namespace()
+    return lambda: artifact_cache.get_or_build(namespace, key, build)
+
+def download_button(label, build, *key_parts, file_name, mime, container=None, **kwargs):
+    """st.download_button that generates its file only when clicked.
+
+    build is a zero-argument function returning bytes (or a BytesIO) and
+    key_parts are the inputs it depends on, used as the cache key.
+    """
+    container = container or st
+    return container.download_button(label=label, data=deferred(build, *key_parts), file_name=file_name,
+                                     mime=mime, on_click="ignore", **kwargs)
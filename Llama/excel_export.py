@@ -0,0 +1,143 @@
+import io
+
+import numpy as np
+
+from instrumentation import timed
+
+# Excel export for the salary, filing and bulk roster downloads.
+#
+# Workbooks are written with xlsxwriter in constant-memory mode: each row is
+# flushed to a temporary file as soon as it is written, so a 10^5 row roster
+# never exists as an in-memory workbook. Rows go out whole with write_row
+# from NumPy arrays, and column widths are tracked while writing instead of
+# re-scanning the DataFrame as strings afterwards.
+
+WORKBOOK_OPTIONS = {"constant_memory": True, "nan_inf_to_errors": True}
+# Rows converted from NumPy to Python values at a time
+ROW_CHUNK = 4096
+MAX_COLUMN_WIDTH = 60
+
+FORMATS = {
+    "title": {"bold": True, "font_size": 14, "align": "center", "valign": "vcenter"},
+    "header": {"bold": True, "bg_color": "#D9D9D9", "border": 1, "align": "center", "valign": "vcenter",
+               "text_wrap": True},
+    "number": {"num_format": "₹#,##0.00", "border": 1},
+    "text": {"border": 1, "align": "left"},
+}
+
+def add_formats(workbook):
+    return {name: workbook.add_format(properties) for name, properties in FORMATS.items()}
+
+def _number_width(values):
+    """Width of the longest number in values as shown with two decimals and a ₹ sign"""
+    finite = values[np.isfinite(values)]
+    if not len(finite):
+        return 0
+    return max(len(f"₹{finite.max():,.2f}"), len(f"₹{finite.min():,.2f}"))
+
+def _column_runs(kinds):
+    """Group neighbouring columns of the same kind so each group is one write_row call"""
+    runs = []
+    for column, kind in enumerate(kinds):
+        if runs and runs[-1][0] == kind:
+            runs[-1][2] = column + 1
+        else:
+            runs.append([kind, column, column + 1])
+    return runs
+
+class SheetWriter:
+    """Writes DataFrames (or chunks of one) to a worksheet row by row"""
+
+    def __init__(self, workbook, name, formats=None, start_row=0):
+        self.workbook = workbook
+        self.worksheet = workbook.add_worksheet(name)
+        self.formats = formats or add_formats(workbook)
+        self.row = start_row
+        self.widths = {}
+        self.columns = None
+
+    def _track_width(self, column, width):
+        self.widths[column] = max(self.widths.get(column, 0), width)
+
+    def write_header(self, columns):
+        self.columns = [str(column) for column in columns]
+        self.worksheet.write_row(self.row, 0, self.columns, self.formats["header"])
+        for column, name in enumerate(self.columns):
+            self._track_width(column, len(name))
+        self.row += 1
+
+    def write_frame(self, df, header=True):
+        """Append the rows of df; the header is only written for the first chunk"""
+        if header and self.columns is None:
+            self.write_header(df.columns)
+
+        kinds = []
+        arrays = []
+        for column, name in enumerate(df.columns):
+            values = df[name].to_numpy()
+            if values.dtype.kind in "iuf":
+                values = values.astype(np.float64, copy=False)
+                kinds.append("number")
+                self._track_width(column, _number_width(values))
+            elif values.dtype.kind == "b":
+                kinds.append("text")
+                values = np.where(values, "Yes", "No")
+                self._track_width(column, 3)
+            else:
+                kinds.append("text" if all(isinstance(value, str) for value in values[:100]) else "mixed")
+                if len(values):
+                    self._track_width(column, max(map(len, map(str, values))))
+            arrays.append(values)
+        runs = _column_runs(kinds)
+
+        worksheet = self.worksheet
+        for start in range(0, len(df), ROW_CHUNK):
+            # One tolist() per column per chunk instead of a Python lookup per cell
+            chunk = [array[start:start + ROW_CHUNK].tolist() for array in arrays]
+            for row_values in zip(*chunk):
+                for kind, first, last in runs:
+                    if kind == "mixed":
+                        # Object columns can hold numbers and text (e.g. "N/A")
+                        for column in range(first, last):
+                            value = row_values[column]
+                            is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+                            worksheet.write(self.row, column, value,
+                                            self.formats["number" if is_number else "text"])
+                    else:
+                        worksheet.write_row(self.row, first, row_values[first:last], self.formats[kind])
+                self.row += 1
+        return self.row
+
+    def set_widths(self, padding=2):
+        for column, width in self.widths.items():
+            self.worksheet.set_column(column, column, min(width + padding, MAX_COLUMN_WIDTH))
+
+def new_workbook(output):
+    """xlsxwriter workbook in constant-memory mode, writing to a path or file object"""
+    import xlsxwriter
+
+    return xlsxwriter.Workbook(output, WORKBOOK_OPTIONS)
+
+@timed("export.workbook")
+def export_workbook(sheets, output=None):
+    """Write {sheet name: DataFrame or iterable of DataFrame chunks} to an xlsx file.
+
+    output is a path or file object; a BytesIO is created and returned when
+    it is None. Passing a generator of chunks per sheet keeps only one chunk
+    in memory at a time.
+    """
+    import pandas as pd
+
+    if output is None:
+        output = io.BytesIO()
+    workbook = new_workbook(output)
+    formats = add_formats(workbook)
+    for name, frames in sheets.items():
+        sheet = SheetWriter(workbook, name, formats)
+        for df in ([frames] if isinstance(frames, pd.DataFrame) else frames):
+            sheet.write_frame(df)
+        sheet.set_widths()
+    workbook.close()
+    if hasattr(output, "seek"):
+        output.seek(0)
+    return output
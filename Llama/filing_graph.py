@@ -0,0 +1,251 @@
+import inspect
+import time
+
+from deductions import SECTION_80C_CLAIMS, apply_deductions
+from regime_compare import get_regime_comparison
+from rules import DEFAULT_FY, get_rules
+from tax_engine import calculate_tax_old_regime, calculate_tax_new_regime
+
+# The Tax Filing computation as a dependency graph of derived quantities.
+#
+# Each node is a plain function whose parameter names are the inputs or
+# nodes it depends on. A node is recomputed only when one of its
+# dependencies changed since it last ran, and when a recomputed value comes
+# out the same as before, nothing downstream of it recomputes either. Every
+# node records how long it took, so the cost of a rerun can be inspected.
+
+# Widget inputs of the Tax Filing page and their values before the user
+# touches them
+FILING_INPUTS = {
+    "fy": DEFAULT_FY, "tax_regime": "Old Regime", "is_senior": False,
+    # Income
+    "basic_salary": 0.0, "agp_gp": 0.0, "da": 0.0, "hra": 0.0, "cca": 0.0, "ir": 0.0, "other_allowances": 0.0,
+    "perquisites": 0.0, "pension": 0.0, "others_amount": 0.0, "additional_income": 0.0,
+    "epf_subscription": 0.0, "professional_tax": 0.0, "rent_paid": 0.0,
+    # House Property
+    "has_house_property": False, "rent_received": 0.0, "property_tax": 0.0, "housing_loan_interest": 0.0,
+    # Other Income
+    "savings_interest": 0.0, "fd_interest": 0.0, "other_sources": 0.0,
+    # Deductions
+    # section_80c_items holds the page's 80C inputs in SECTION_80C_CLAIMS order
+    "section_80c_items": (), "additional_nps": 0.0, "mediclaim": 0.0, "education_loan_interest": 0.0,
+    "affordable_house_interest": 0.0, "ev_loan_interest": 0.0, "donations": 0.0, "rent_paid_deduction": 0.0,
+    "disabled_person": False,
+    # Tax Calculation
+    "tds_already_deducted": 0.0,
+}
+
+FILING_NODES = {}
+
+def node(func):
+    """Register func as a graph node named after the function"""
+    FILING_NODES[func.__name__] = (func, tuple(inspect.signature(func).parameters))
+    return func
+
+@node
+def rules(fy):
+    return get_rules(fy)
+
+@node
+def is_old(tax_regime):
+    return tax_regime == "Old Regime"
+
+@node
+def salary_total(basic_salary, agp_gp, da, hra, cca, ir, other_allowances, perquisites, pension, others_amount,
+                 additional_income):
+    return basic_salary + agp_gp + da + hra + cca + ir + other_allowances + perquisites + pension + others_amount + additional_income
+
+@node
+def hra_exemption(is_old, basic_salary, agp_gp, hra, rent_paid, rules):
+    if not is_old:
+        return 0
+    basic_for_hra = basic_salary + agp_gp  # Basis for HRA calculation
+    rent_minus_10_percent = max(0, rent_paid - basic_for_hra * rules.hra["rent_over_basic_percent"])
+    return min(hra, rent_minus_10_percent, basic_for_hra * rules.hra["basic_percent"])
+
+@node
+def standard_deduction(is_old, salary_total, rules):
+    # New regime doesn't have HRA exemption or standard deduction
+    return min(rules.standard_deduction("old"), salary_total) if is_old else 0
+
+@node
+def net_annual_value(has_house_property, rent_received, property_tax):
+    return rent_received - property_tax if has_house_property else 0
+
+@node
+def repairs_deduction(net_annual_value, rules):
+    return net_annual_value * rules.house_property["repairs_percent"]
+
+@node
+def net_house_income(has_house_property, net_annual_value, repairs_deduction, housing_loan_interest):
+    return net_annual_value - repairs_deduction - housing_loan_interest if has_house_property else 0
+
+@node
+def total_other_income(savings_interest, fd_interest, other_sources):
+    return savings_interest + fd_interest + other_sources
+
+@node
+def total_80c(section_80c_items, epf_subscription):
+    return sum(section_80c_items) + epf_subscription
+
+@node
+def deduction_claims(section_80c_items, epf_subscription, additional_nps, mediclaim, education_loan_interest,
+                     affordable_house_interest, ev_loan_interest, donations, rent_paid_deduction, savings_interest,
+                     fd_interest):
+    claims = dict(zip(SECTION_80C_CLAIMS, section_80c_items))
+    claims.update(epf_subscription=epf_subscription, additional_nps=additional_nps, mediclaim=mediclaim,
+                  education_loan_interest=education_loan_interest, affordable_house_interest=affordable_house_interest,
+                  ev_loan_interest=ev_loan_interest, donations=donations, rent_paid_deduction=rent_paid_deduction,
+                  savings_interest=savings_interest, fd_interest=fd_interest)
+    return claims
+
+@node
+def allowed_deductions(is_old, deduction_claims, is_senior, disabled_person, fy):
+    # Chapter VI-A deductions only apply to the Old Regime
+    if not is_old:
+        return {}
+    return apply_deductions(deduction_claims, is_senior, disabled_person, fy)
+
+@node
+def capped_80c(allowed_deductions):
+    return allowed_deductions.get("80C", 0)
+
+@node
+def savings_interest_deduction(allowed_deductions):
+    return allowed_deductions.get("80TTA", 0)
+
+@node
+def ttb_deduction(allowed_deductions):
+    return allowed_deductions.get("80TTB", 0)
+
+@node
+def disability_deduction(allowed_deductions):
+    return allowed_deductions.get("80U", 0)
+
+@node
+def total_deductions(allowed_deductions):
+    return allowed_deductions.get("total", 0)
+
+@node
+def net_salary(is_old, salary_total, hra_exemption, standard_deduction, professional_tax):
+    if is_old:
+        return salary_total - hra_exemption - standard_deduction - professional_tax
+    return salary_total - professional_tax
+
+@node
+def gross_total_income(net_salary, net_house_income, total_other_income):
+    return net_salary + net_house_income + total_other_income
+
+@node
+def taxable_income(is_old, gross_total_income, total_deductions):
+    # No deductions in new regime
+    return max(0, gross_total_income - total_deductions if is_old else gross_total_income)
+
+@node
+def tax_results(is_old, taxable_income, is_senior, fy):
+    if is_old:
+        return calculate_tax_old_regime(taxable_income, is_senior, fy)
+    return calculate_tax_new_regime(taxable_income, is_senior, fy)
+
+@node
+def remaining_tax(tax_results, tds_already_deducted):
+    return max(0, tax_results["total_tax"] - tds_already_deducted)
+
+@node
+def old_regime_results(gross_total_income, total_deductions, is_senior, fy):
+    return calculate_tax_old_regime(gross_total_income - total_deductions, is_senior, fy)
+
+@node
+def new_regime_results(gross_total_income, is_senior, fy):
+    return calculate_tax_new_regime(gross_total_income, is_senior, fy)
+
+@node
+def break_even_deduction(gross_total_income, is_senior, fy):
+    return get_regime_comparison(is_senior, fy).break_even_deduction(gross_total_income)
+
+class FilingGraph:
+    """Memoized evaluation of FILING_NODES over a set of inputs.
+
+    Keep one per session: set() the widget values on every rerun and read
+    derived quantities with graph[name]. Only nodes downstream of an input
+    whose value actually changed are recomputed.
+    """
+
+    def __init__(self, nodes=FILING_NODES, inputs=FILING_INPUTS):
+        self.nodes = nodes
+        self._values = {}
+        self._versions = {}
+        self._computed_with = {}
+        self._checked_at = {}
+        self._clock = 0
+        self.timings = {}
+        self.run_number = 0
+        self.set(**inputs)
+
+    def _bump(self, name):
+        self._clock += 1
+        self._versions[name] = self._clock
+
+    def set(self, **inputs):
+        for name, value in inputs.items():
+            if name in self.nodes:
+                raise KeyError(f"{name!r} is a derived quantity and cannot be set")
+            if name not in self._values or self._values[name] != value:
+                self._values[name] = value
+                self._bump(name)
+
+    def begin_run(self):
+        """Start a new rerun, so timings show what this rerun recomputed"""
+        self.run_number += 1
+
+    def _evaluate(self, name):
+        if name not in self.nodes:
+            if name not in self._values:
+                raise KeyError(f"Input {name!r} has not been set")
+            return
+        # Nothing has changed anywhere since this node was last brought up to date
+        if self._checked_at.get(name) == self._clock:
+            return
+        func, dependencies = self.nodes[name]
+        for dependency in dependencies:
+            self._evaluate(dependency)
+        versions = tuple(self._versions[dependency] for dependency in dependencies)
+        if self._computed_with.get(name) == versions:
+            self._checked_at[name] = self._clock
+            return
+
+        start = time.perf_counter()
+        value = func(*(self._values[dependency] for dependency in dependencies))
+        elapsed = time.perf_counter() - start
+
+        self._computed_with[name] = versions
+        # Early cutoff: an unchanged result does not invalidate dependents
+        if name not in self._values or self._values[name] != value:
+            self._values[name] = value
+            self._bump(name)
+        self._checked_at[name] = self._clock
+        timing = self.timings.setdefault(name, {"calls": 0, "total_ms": 0.0})
+        timing["calls"] += 1
+        timing["total_ms"] += elapsed * 1000
+        timing["last_ms"] = elapsed * 1000
+        timing["last_run"] = self.run_number
+
+    def __getitem__(self, name):
+        self._evaluate(name)
+        return self._values[name]
+
+    def run_stats(self):
+        """One row per node: whether this rerun recomputed it and what it cost"""
+        rows = []
+        for name in self.nodes:
+            timing = self.timings.get(name)
+            if timing is None:
+                continue
+            rows.append({
+                "node": name,
+                "recomputed": timing["last_run"] == self.run_number,
+                "last_ms": timing["last_ms"],
+                "calls": timing["calls"],
+                "total_ms": timing["total_ms"],
+            })
+        return rows
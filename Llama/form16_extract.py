@@ -0,0 +1,137 @@
+import io
+import os
+import re
+
+from lazy_imports import lazy_import
+
+# Form 16 field extraction for the Tax Filing page and bulk employer files.
+# Documents are streamed page by page and parsed line by line into a small
+# dict of fields, so a several-hundred-page employer PDF is never held in
+# memory as text.
+
+AMOUNT = re.compile(r"(?<![\w.])(?:rs\.?|₹|inr)?\s*(\d{1,3}(?:,\d{2,3})+(?:\.\d{1,2})?|\d+(?:\.\d{1,2})?)(?![\w)])",
+                    re.IGNORECASE)
+PAN = re.compile(r"\b([A-Z]{5}[0-9]{4}[A-Z])\b")
+RECORD_START = re.compile(r"^\s*form\s+no\.?\s*16\b", re.IGNORECASE)
+
+TEXT_FIELDS = [
+    ("name", re.compile(r"name\s+(?:and\s+address\s+)?of\s+the\s+employee\s*[:\-]?\s*(.+)", re.IGNORECASE)),
+    ("pan", re.compile(r"PAN\s+of\s+the\s+employee\s*[:\-]?\s*([A-Z]{5}[0-9]{4}[A-Z])", re.IGNORECASE)),
+    ("designation", re.compile(r"designation\s*[:\-]\s*(.+)", re.IGNORECASE)),
+    ("department", re.compile(r"department\s*[:\-]\s*(.+)", re.IGNORECASE)),
+]
+
+# Amount fields, keyed by the widget variable names in pages/Tax_Filing.py,
+# except gross_salary and section_80c: Form 16 only totals those, so the page
+# shows them beside its own totals to check against.
+# The amount is the last number on the line after the label, which is the
+# deductible amount on Form 16 lines that show gross and deductible columns.
+AMOUNT_FIELDS = [
+    ("gross_salary", re.compile(r"section\s+17\s*\(1\)", re.IGNORECASE)),
+    ("basic_salary", re.compile(r"\bbasic(?:\s+pay|\s+salary)?\b", re.IGNORECASE)),
+    ("agp_gp", re.compile(r"\b(?:academic\s+)?grade\s+pay\b|\bAGP\b", re.IGNORECASE)),
+    ("da", re.compile(r"dearness\s+allowance", re.IGNORECASE)),
+    ("hra", re.compile(r"house\s+rent\s+allowance", re.IGNORECASE)),
+    ("cca", re.compile(r"city\s+compensatory\s+allowance", re.IGNORECASE)),
+    ("perquisites", re.compile(r"value\s+of\s+perquisites|section\s+17\s*\(2\)", re.IGNORECASE)),
+    ("professional_tax", re.compile(r"professional\s+tax|tax\s+on\s+employment", re.IGNORECASE)),
+    ("epf_subscription", re.compile(r"\bE\.?P\.?F\.?\b|provident\s+fund", re.IGNORECASE)),
+    ("additional_nps", re.compile(r"\b80\s*CCD\s*\(\s*1B\s*\)", re.IGNORECASE)),
+    ("section_80c", re.compile(r"\b80\s*C\b", re.IGNORECASE)),
+    ("mediclaim", re.compile(r"\b80\s*D\b", re.IGNORECASE)),
+    ("education_loan_interest", re.compile(r"\b80\s*E\b", re.IGNORECASE)),
+    ("affordable_house_interest", re.compile(r"\b80\s*EEA\b", re.IGNORECASE)),
+    ("ev_loan_interest", re.compile(r"\b80\s*EEB\b", re.IGNORECASE)),
+    ("rent_paid_deduction", re.compile(r"\b80\s*GG\b", re.IGNORECASE)),
+    ("donations", re.compile(r"\b80\s*G\b", re.IGNORECASE)),
+    ("tds_already_deducted", re.compile(r"tax\s+deducted|total\s+tax\s+deposited|\bTDS\b", re.IGNORECASE)),
+]
+
+LINES_PER_DOCX_PAGE = 60
+PDF_CACHE_PAGES = 50
+
+def _file_type(file_name):
+    return os.path.splitext(file_name)[1].lower().lstrip(".")
+
+def iter_pages(file, file_name):
+    """Yield the text of each page of a PDF, DOCX or TXT file, one at a time"""
+    file_type = _file_type(file_name)
+    if file_type == "pdf":
+        reader = lazy_import("pypdf").PdfReader(file)
+        for number, page in enumerate(reader.pages, 1):
+            yield page.extract_text() or ""
+            # pypdf caches every object it has parsed; drop them so memory
+            # stays flat on long files (they are re-read if needed again)
+            if number % PDF_CACHE_PAGES == 0 and hasattr(reader, "resolved_objects"):
+                reader.resolved_objects.clear()
+    elif file_type == "docx":
+        document = lazy_import("docx").Document(file)
+        lines = [paragraph.text for paragraph in document.paragraphs]
+        for table in document.tables:
+            for row in table.rows:
+                lines.append(" | ".join(cell.text for cell in row.cells))
+        for start in range(0, len(lines), LINES_PER_DOCX_PAGE):
+            yield "\n".join(lines[start:start + LINES_PER_DOCX_PAGE])
+    elif file_type == "txt":
+        text = io.TextIOWrapper(file, encoding="utf-8", errors="replace") if not isinstance(file, io.TextIOBase) else file
+        page = []
+        for line in text:
+            # Form feed separates pages in text exports
+            while "\f" in line:
+                before, line = line.split("\f", 1)
+                page.append(before)
+                yield "".join(page)
+                page = []
+            page.append(line)
+        if page:
+            yield "".join(page)
+    else:
+        raise ValueError(f"Unsupported file type: {file_name}")
+
+def _to_amount(text):
+    return float(text.replace(",", ""))
+
+def parse_line(line, fields):
+    """Fill in whichever fields this line provides; earlier values win"""
+    for field, pattern in TEXT_FIELDS:
+        if field not in fields:
+            match = pattern.search(line)
+            if match:
+                value = match.group(1).strip()
+                if field == "name":
+                    value = re.split(r",|\s{2,}|\|", value)[0].strip()
+                if value:
+                    fields[field] = value.upper() if field == "pan" else value
+                return
+    for field, pattern in AMOUNT_FIELDS:
+        match = pattern.search(line)
+        if match:
+            if field not in fields:
+                amounts = AMOUNT.findall(line, match.end())
+                if amounts:
+                    fields[field] = _to_amount(amounts[-1])
+            return
+    if "pan" not in fields and "deductor" not in line.lower() and "employee" in line.lower():
+        match = PAN.search(line)
+        if match:
+            fields["pan"] = match.group(1)
+
+def iter_form16_records(file, file_name):
+    """Yield one dict of fields per Form 16 in the file.
+
+    Employer bulk files hold one Form 16 after another; a new record starts
+    at each "FORM NO. 16" heading. Only the current record's fields are kept.
+    """
+    fields = {}
+    for page in iter_pages(file, file_name):
+        for line in page.splitlines():
+            if RECORD_START.match(line) and fields:
+                yield fields
+                fields = {}
+            parse_line(line, fields)
+    if fields:
+        yield fields
+
+def extract_form16(file, file_name):
+    """Fields of the first Form 16 in the file, or an empty dict"""
+    return next(iter_form16_records(file, file_name), {})
@@ -0,0 +1,227 @@
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lazy_imports import lazy_import
+
+# Timing spans around the slow parts of a rerun: database queries, LLM calls,
+# OCR jobs, tax computation and file generation. Every span is counted in a
+# Prometheus histogram, served on METRICS_HOST:METRICS_PORT, and can also be
+# written as one JSON log line. A whole rerun can additionally be captured
+# with cProfile or pyinstrument, one file per session and rerun.
+#
+# Everything is off unless switched on through the environment. Disabled,
+# timed() returns the function it decorates unchanged and span() returns a
+# shared no-op context, so the instrumented code pays a flag check at most.
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "0") == "1"
+METRICS_PORT = int(os.environ.get("METRICS_PORT", 0))
+# Loopback by default; set to 0.0.0.0 for a scraper on another host
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+JSON_LOGS = os.environ.get("JSON_LOGS", "0") == "1"
+# "cprofile" or "pyinstrument"
+PROFILE_RERUNS = os.environ.get("PROFILE_RERUNS", "").strip().lower()
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+
+ENABLED = METRICS_ENABLED or METRICS_PORT > 0 or JSON_LOGS
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+logger = logging.getLogger("tax_assistant")
+
+class Metrics:
+    """Span durations as Prometheus histograms, one series per span and label set"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}
+        self._errors = {}
+
+    def observe(self, name, seconds, labels, error=False):
+        key = (name, tuple(sorted(labels.items())) if labels else ())
+        # Past the last bound lands on the count slot, which +Inf reports
+        bucket = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts, then count and sum
+                series = self._series[key] = [0] * len(self.buckets) + [0, 0.0]
+            if bucket < len(self.buckets):
+                series[bucket] += 1
+            series[-2] += 1
+            series[-1] += seconds
+            if error:
+                self._errors[key] = self._errors.get(key, 0) + 1
+
+    def render(self):
+        """The metrics in the Prometheus text exposition format"""
+        lines = ["# HELP tax_assistant_span_seconds Time spent in instrumented spans",
+                 "# TYPE tax_assistant_span_seconds histogram"]
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+            errors = sorted(self._errors.items())
+        for (name, labels), values in series:
+            label_text = _labels(name, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f'tax_assistant_span_seconds_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f'tax_assistant_span_seconds_bucket{{{label_text},le="+Inf"}} {values[-2]}')
+            lines.append(f"tax_assistant_span_seconds_sum{{{label_text}}} {values[-1]}")
+            lines.append(f"tax_assistant_span_seconds_count{{{label_text}}} {values[-2]}")
+        lines += ["# HELP tax_assistant_span_errors_total Instrumented spans that raised",
+                  "# TYPE tax_assistant_span_errors_total counter"]
+        for (name, labels), count in errors:
+            lines.append(f"tax_assistant_span_errors_total{{{_labels(name, labels)}}} {count}")
+        return "\n".join(lines) + "\n"
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(name, labels):
+    return ",".join([f'span="{_escape(name)}"'] + [f'{key}="{_escape(value)}"' for key, value in labels])
+
+metrics = Metrics()
+
+def record(name, seconds, error=False, **labels):
+    """Record a duration measured elsewhere, e.g. an LLM time to first token"""
+    if not ENABLED:
+        return
+    metrics.observe(name, seconds, labels, error)
+    if JSON_LOGS:
+        logger.info(json.dumps({"ts": time.time(), "span": name, "seconds": round(seconds, 6), "error": error,
+                                **labels}, default=str))
+
+class _Span:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # st.stop() and st.rerun() unwind with BaseExceptions; they are not errors
+        error = exc_type is not None and issubclass(exc_type, Exception)
+        record(self.name, time.perf_counter() - self.start, error, **self.labels)
+        return False
+
+_NO_SPAN = nullcontext()
+
+def span(name, **labels):
+    """Context manager timing the enclosed block as one span"""
+    if not ENABLED:
+        return _NO_SPAN
+    return _Span(name, labels)
+
+def timed(name, **labels):
+    """Decorator timing every call of a function as a span; a no-op when disabled"""
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Span(name, labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def _session_id():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        context = get_script_run_ctx()
+    except ImportError:
+        context = None
+    return context.session_id if context else "no-session"
+
+def _start_profiler():
+    if PROFILE_RERUNS == "pyinstrument":
+        profiler = lazy_import("pyinstrument").Profiler()
+        profiler.start()
+    else:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    return profiler
+
+def _save_profile(profiler, page):
+    directory = os.path.join(PROFILE_DIR, _session_id())
+    stem = os.path.join(directory, f"{page}-{time.strftime('%Y%m%d-%H%M%S')}-{time.perf_counter_ns() % 10**6:06d}")
+    try:
+        os.makedirs(directory, exist_ok=True)
+        if PROFILE_RERUNS == "pyinstrument":
+            profiler.stop()
+            with open(stem + ".html", "w", encoding="utf-8") as file:
+                file.write(profiler.output_html())
+        else:
+            profiler.disable()
+            profiler.dump_stats(stem + ".prof")
+    except OSError as e:
+        logger.warning("Could not save the profile of %s: %s", page, e)
+
+@contextmanager
+def rerun(page):
+    """Time one rerun of a page as a span, and profile it when PROFILE_RERUNS is set"""
+    profiler = _start_profiler() if PROFILE_RERUNS else None
+    try:
+        with span("rerun", page=page):
+            yield
+    finally:
+        if profiler is not None:
+            _save_profile(profiler, page)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+_server_lock = threading.Lock()
+_server = None
+
+def start_metrics_server(port=METRICS_PORT, host=METRICS_HOST):
+    """Serve /metrics on host:port from a daemon thread, once per process"""
+    global _server
+    with _server_lock:
+        if _server is not None or port <= 0:
+            return _server
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            # Another worker process already serves this port
+            logger.warning("Metrics server not started on %s:%s: %s", host, port, e)
+            return None
+        threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        return _server
+
+if JSON_LOGS and not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+if METRICS_PORT > 0:
+    start_metrics_server()
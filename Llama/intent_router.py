@@ -0,0 +1,161 @@
+import re
+import threading
+import time
+
+from slabs import get_schedule, age_band
+
+# FY used by the chat assistant, same as the sidebar estimate in home.py
+ASSISTANT_FY = "2025-26"
+
+_number = r"(\d+(?:,\d+)*(?:\.\d+)?)"
+_unit = r"(crores?|cr|lakhs?|lacs?|lac|l|k|thousand)?"
+AMOUNT = re.compile(r"(?:₹|rs\.?|inr)?\s*" + _number + r"\s*" + _unit + r"\b", re.IGNORECASE)
+UNITS = {
+    "crore": 10**7, "crores": 10**7, "cr": 10**7,
+    "lakh": 10**5, "lakhs": 10**5, "lac": 10**5, "lacs": 10**5, "l": 10**5,
+    "k": 10**3, "thousand": 10**3,
+}
+
+TAX_WORDS = re.compile(r"\b(tax|taxes|liability|payable|owe|calculate|compute)\b", re.IGNORECASE)
+# Questions the slab engine cannot answer on its own
+OPEN_ENDED = re.compile(
+    r"\b(why|explain|difference|how (?:do|can|to)|file|filing|deadline|refund|penalty|section|hra|capital gains?|"
+    r"gst|business|usa?|united states|federal|state|monthly|per month|a month)\b",
+    re.IGNORECASE,
+)
+REGIME = re.compile(r"\b(old|new)\s*(?:tax\s*)?regime\b|\bregime\s*(?:is\s*)?(old|new)\b", re.IGNORECASE)
+AGE = re.compile(r"\b(?:age[d]?\s*(?:is\s*)?(\d{2,3})|(\d{2,3})\s*(?:years?|yrs?)(?:\s*old)?)\b", re.IGNORECASE)
+SUPER_SENIOR = re.compile(r"\bsuper\s*senior\b", re.IGNORECASE)
+SENIOR = re.compile(r"\bsenior(?:\s*citizen)?\b", re.IGNORECASE)
+DEDUCTION = re.compile(
+    r"(?:deductions?|investments?|80c|80d)\s*(?:of|is|are|:)?\s*(?:₹|rs\.?|inr)?\s*" + _number + r"\s*" + _unit + r"\b"
+    r"|(?:₹|rs\.?|inr)?\s*" + _number + r"\s*" + _unit + r"\s*(?:of|in|as)?\s*(?:deductions?|investments?|80c|80d)\b",
+    re.IGNORECASE,
+)
+
+def _to_amount(number, unit):
+    value = float(number.replace(",", ""))
+    return value * UNITS.get((unit or "").lower(), 1)
+
+def parse_tax_query(prompt):
+    """Pull out income, regime, age and deductions from a tax question.
+
+    Returns None when the prompt is not clearly a tax calculation the slab
+    engine can answer, so the caller should fall back to the LLM.
+    """
+    if not TAX_WORDS.search(prompt) or OPEN_ENDED.search(prompt):
+        return None
+
+    deductions = 0.0
+    deduction_spans = []
+    for match in DEDUCTION.finditer(prompt):
+        number, unit = (match.group(1), match.group(2)) if match.group(1) else (match.group(3), match.group(4))
+        deductions += _to_amount(number, unit)
+        deduction_spans.append(match.span())
+
+    age = None
+    age_spans = []
+    for match in AGE.finditer(prompt):
+        age = int(match.group(1) or match.group(2))
+        age_spans.append(match.span())
+    if age is None and SUPER_SENIOR.search(prompt):
+        age = 80
+    elif age is None and SENIOR.search(prompt):
+        age = 60
+
+    incomes = []
+    for match in AMOUNT.finditer(prompt):
+        start, end = match.span(1)
+        if any(s <= start < e for s, e in deduction_spans + age_spans):
+            continue
+        unit = match.group(2)
+        amount = _to_amount(match.group(1), unit)
+        # Bare small numbers ("80C", "FY 2024", "2 kids") are not incomes
+        if unit is None and amount < 10000:
+            continue
+        incomes.append(amount)
+
+    if len(incomes) != 1:
+        return None
+
+    regime_match = REGIME.search(prompt)
+    regime = (regime_match.group(1) or regime_match.group(2)).lower() if regime_match else None
+
+    return {"income": incomes[0], "regime": regime, "age": age, "deductions": deductions}
+
+def compute_answer(query, fy=ASSISTANT_FY):
+    band = age_band(query["age"])
+    results = {}
+    for regime in (["old", "new"] if query["regime"] is None else [query["regime"]]):
+        taxable_income = query["income"] - (query["deductions"] if regime == "old" else 0)
+        taxable_income = max(0, taxable_income)
+        results[regime] = (taxable_income, get_schedule("IN", regime, fy, band).compute(taxable_income))
+    return results
+
+def format_answer(query, results, fy=ASSISTANT_FY):
+    lines = [f"**Tax on an annual income of ₹{query['income']:,.2f} (FY {fy}):**"]
+    if query["age"] is not None:
+        lines.append(f"- Age: {query['age']}")
+    for regime, (taxable_income, tax) in results.items():
+        lines.append(f"- **{regime.title()} Regime**: taxable income ₹{taxable_income:,.2f}, "
+                     f"tax ₹{tax['tax']:,.2f}, rebate u/s 87A ₹{tax['rebate']:,.2f}, "
+                     f"cess ₹{tax['cess']:,.2f}, **total ₹{tax['total_tax']:,.2f}**")
+    if query["deductions"] and "old" in results:
+        lines.append(f"- Deductions of ₹{query['deductions']:,.2f} applied to the Old Regime only")
+    if len(results) == 2:
+        old_total, new_total = results["old"][1]["total_tax"], results["new"][1]["total_tax"]
+        if old_total != new_total:
+            better, saving = ("Old", new_total - old_total) if old_total < new_total else ("New", old_total - new_total)
+            lines.append(f"- The {better} Regime saves you ₹{saving:,.2f}")
+    return "\n".join(lines)
+
+class RouterStats:
+    """Process-wide hit rate of the local fast path and the LLM time it saved"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.local_time = 0.0
+        self.llm_calls = 0
+        self.llm_time = 0.0
+
+    def record_hit(self, seconds):
+        with self._lock:
+            self.hits += 1
+            self.local_time += seconds
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def record_llm(self, seconds):
+        with self._lock:
+            self.llm_calls += 1
+            self.llm_time += seconds
+
+    def summary(self):
+        total = self.hits + self.misses
+        average_llm = self.llm_time / self.llm_calls if self.llm_calls else 0.0
+        average_local = self.local_time / self.hits if self.hits else 0.0
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "average_local_ms": average_local * 1000,
+            "average_llm_ms": average_llm * 1000,
+            "latency_saved_s": self.hits * max(0.0, average_llm - average_local),
+        }
+
+router_stats = RouterStats()
+
+def route_tax_query(prompt):
+    """Answer a tax calculation locally, or return None to send it to the LLM"""
+    start = time.perf_counter()
+    query = parse_tax_query(prompt)
+    if query is None:
+        router_stats.record_miss()
+        return None
+    answer = format_answer(query, compute_answer(query))
+    router_stats.record_hit(time.perf_counter() - start)
+    return answer
@@ -0,0 +1,26 @@
+import importlib
+import sys
+import threading
+import time
+
+# Heavy optional dependencies (OCR, TTS, speech, LLM client, documents) are
+# imported the first time a feature needs them instead of at page import, so
+# the login page does not pay for them. Python keeps the module in
+# sys.modules, so after the first call this is a dict lookup.
+
+_lock = threading.Lock()
+_load_times = {}
+
+def lazy_import(module_name):
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    with _lock:
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        _load_times.setdefault(module_name, time.perf_counter() - start)
+    return module
+
+def load_times():
+    """Seconds spent on each lazily imported module, for profiling"""
+    return dict(_load_times)
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from instrumentation import record
+from lazy_imports import lazy_import
+
+DEFAULT_MODEL = "llama3-8b-8192"
+
+# Keep-alive pool shared by every session in the process
+MAX_CONNECTIONS = int(os.environ.get("LLM_MAX_CONNECTIONS", 20))
+MAX_KEEPALIVE = int(os.environ.get("LLM_MAX_KEEPALIVE", 10))
+KEEPALIVE_EXPIRY = float(os.environ.get("LLM_KEEPALIVE_EXPIRY", 60))
+REQUEST_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", 60))
+
+CACHE_SIZE = int(os.environ.get("LLM_CACHE_SIZE", 1000))
+CACHE_TTL = int(os.environ.get("LLM_CACHE_TTL", 3600))
+
+@lru_cache(maxsize=None)
+def get_client(api_key, base_url=None):
+    """One Groq client per (key, endpoint) per process, reusing TCP/TLS connections.
+
+    base_url (or GROQ_BASE_URL) can point at a local fake completion server.
+    """
+    groq = lazy_import("groq")
+    httpx = lazy_import("httpx")
+    http_client = httpx.Client(
+        timeout=REQUEST_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+    )
+    return groq.Groq(api_key=api_key, base_url=base_url or os.environ.get("GROQ_BASE_URL"), http_client=http_client)
+
+_whitespace = re.compile(r"\s+")
+
+def normalize_text(text):
+    """Case, whitespace and trailing punctuation differences should not miss the cache"""
+    return _whitespace.sub(" ", text).strip().lower().rstrip("?!. ")
+
+def cache_key(messages, model=DEFAULT_MODEL):
+    normalized = [(message["role"], normalize_text(message["content"])) for message in messages]
+    return hashlib.sha256(json.dumps([model, normalized]).encode()).hexdigest()
+
+class ResponseCache:
+    """Exact-match cache of completed responses with TTL and LRU eviction"""
+
+    def __init__(self, max_entries=CACHE_SIZE, ttl=CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, response):
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+response_cache = ResponseCache()
+
+def iter_content(stream):
+    """Yield the text deltas of a streamed chat completion"""
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content is not None:
+            yield chunk.choices[0].delta.content
+
+class ChatStream:
+    """Iterate over the tokens of one chat completion.
+
+    Served from the response cache when possible. Otherwise tokens are yielded
+    as they arrive and the full response is cached once the stream completes.
+    Timings are available after iteration.
+    """
+
+    def __init__(self, client, messages, model=DEFAULT_MODEL, cache=response_cache):
+        self.client = client
+        self.messages = messages
+        self.model = model
+        self.cache = cache
+        self.cached = False
+        self.time_to_first_token = None
+        self.total_time = None
+        self.content = ""
+
+    def __iter__(self):
+        start = time.perf_counter()
+        key = cache_key(self.messages, self.model)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            self.cached = True
+            self.content = cached
+            self.time_to_first_token = self.total_time = time.perf_counter() - start
+            record("llm.total", self.total_time, model=self.model, cached=True)
+            yield cached
+            return
+
+        parts = []
+        stream = self.client.chat.completions.create(model=self.model, messages=self.messages, stream=True)
+        for token in iter_content(stream):
+            if self.time_to_first_token is None:
+                self.time_to_first_token = time.perf_counter() - start
+            parts.append(token)
+            yield token
+        self.total_time = time.perf_counter() - start
+        self.content = "".join(parts)
+        if self.time_to_first_token is not None:
+            record("llm.time_to_first_token", self.time_to_first_token, model=self.model)
+        record("llm.total", self.total_time, model=self.model, cached=False)
+        if self.cache is not None and self.content:
+            self.cache.put(key, self.content)
+
+def stream_chat(api_key, messages, model=DEFAULT_MODEL, base_url=None):
+    return ChatStream(get_client(api_key, base_url), messages, model)
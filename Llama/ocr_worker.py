@@ -0,0 +1,142 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from instrumentation import record
+
+# OCR runs in worker processes so a scan never blocks a Streamlit session, and
+# results are cached by content hash so a file that stays in the upload
+# widget is processed once no matter how many reruns follow.
+OCR_WORKERS = int(os.environ.get("OCR_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+OCR_CACHE_SIZE = int(os.environ.get("OCR_CACHE_SIZE", 256))
+
+_lock = threading.Lock()
+_executor = None
+_jobs = {}
+_results = OrderedDict()
+_errors = OrderedDict()
+
+def _ocr_image_bytes(data):
+    """Runs in a worker process"""
+    from PIL import Image
+    import pytesseract
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            return pytesseract.image_to_string(image)
+    except Exception as e:
+        # Some pytesseract errors cannot be pickled back to the parent
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # spawn, not fork: the parent is a multi-threaded Streamlit server
+        _executor = ProcessPoolExecutor(max_workers=OCR_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+def _submit(data):
+    """Submit to the pool, replacing it once if a dead worker has broken it"""
+    global _executor
+    try:
+        return _get_executor().submit(_ocr_image_bytes, data)
+    except BrokenProcessPool:
+        # An OOM kill or a tesseract crash breaks the whole pool for good
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        return _get_executor().submit(_ocr_image_bytes, data)
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+def _remember(cache, job_id, value):
+    # Oldest first, trimmed to OCR_CACHE_SIZE so neither cache grows with uploads
+    cache[job_id] = value
+    cache.move_to_end(job_id)
+    while len(cache) > OCR_CACHE_SIZE:
+        cache.popitem(last=False)
+
+def _store(job_id, future):
+    # Queue wait plus OCR, as the user experiences it
+    record("ocr.job", time.monotonic() - future.submitted_at,
+           error=not future.cancelled() and future.exception() is not None)
+    with _lock:
+        _jobs.pop(job_id, None)
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            _remember(_errors, job_id, str(future.exception()))
+            return
+        _remember(_results, job_id, future.result())
+
+def submit_ocr(data, retry=False):
+    """Queue an image for OCR and return its job id (the content hash).
+
+    Submitting the same bytes again, while queued or after it finished,
+    does not start another job. A failed job keeps its error, so a page
+    that resubmits on every rerun does not retry a bad image forever;
+    retry=True discards the error and runs the job again.
+    """
+    job_id = content_hash(data)
+    with _lock:
+        if job_id in _results or job_id in _jobs:
+            return job_id
+        if job_id in _errors:
+            if not retry:
+                return job_id
+            del _errors[job_id]
+        try:
+            future = _submit(data)
+        except BrokenProcessPool as e:
+            _remember(_errors, job_id, f"OCR workers unavailable: {e}")
+            return job_id
+        future.submitted_at = time.monotonic()
+        _jobs[job_id] = future
+    future.add_done_callback(lambda done: _store(job_id, done))
+    return job_id
+
+def ocr_status(job_id):
+    """(status, text, seconds waited) where status is "done", "pending", "error" or "unknown" """
+    with _lock:
+        if job_id in _results:
+            _results.move_to_end(job_id)
+            return "done", _results[job_id], 0.0
+        if job_id in _errors:
+            return "error", _errors[job_id], 0.0
+        future = _jobs.get(job_id)
+    if future is None:
+        return "unknown", None, 0.0
+    waited = time.monotonic() - future.submitted_at
+    if not future.done():
+        return "pending", None, waited
+    if future.exception() is not None:
+        return "error", str(future.exception()), waited
+    return "done", future.result(), waited
+
+def pending_jobs():
+    with _lock:
+        return len(_jobs)
+
+def extract_text(data, timeout=None):
+    """Blocking OCR through the pool and cache, for scripts and batch jobs"""
+    job_id = submit_ocr(data, retry=True)
+    with _lock:
+        if job_id in _results:
+            return _results[job_id]
+        future = _jobs.get(job_id)
+        if future is None:
+            raise RuntimeError(_errors.get(job_id, "OCR job failed"))
+    return future.result(timeout)
+
+def shutdown():
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
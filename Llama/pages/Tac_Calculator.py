@@ -2,139 +2,72 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 import io
+import numpy as np
+from amount_words import num_to_words
+from downloads import download_button
+from excel_export import SheetWriter, add_formats, new_workbook
+from salary_schedule import salary_schedule, fiscal_months
+from rules import get_rules
+from tax_compute import CALCULATOR_FY, calculator_tax
 
-def calculate_tax(income, deductions, regime, age):
-    taxable_income = max(0, income - deductions)
-    tax = 0
-    slabs = []
+SALARY_COLUMNS = {
+    "basic": "Pay + GP/AGP + Personal Pay + Special Pay",
+    "da": "Dearness Allowance",
+    "hra": "House Rent Allowance",
+    "cca": "City Compensatory Allowance",
+    "arrears": "Arrears",
+    "gross": "Total Gross",
+    "epf": "EPF Subscription",
+    "income_tax": "Income Tax Deducted",
+    "prof_tax": "Professional Tax",
+    "net": "Net Pay",
+}
+
+def calculate_salary(base_pay, da_percent, hra_percent, cca, epf_percent, income_tax, prof_tax,
+                     fy=CALCULATOR_FY, increments=(), da_revisions=(), arrears=None):
+    schedule = salary_schedule(base_pay, da_percent, hra_percent, cca, epf_percent, income_tax, prof_tax,
+                               increments, da_revisions, arrears, fy)
     
-    if regime == "Old":
-        slabs = [
-            (250000, 0.05),  # 5% on income from 2.5L to 5L
-            (500000, 0.2),   # 20% on income from 5L to 10L
-            (1000000, 0.3)   # 30% on income above 10L
-        ]
-        if age >= 60:
-            slabs[0] = (300000, 0.05)  # Higher exemption for senior citizens
-        if age >= 80:
-            slabs[0] = (500000, 0.05)
-        std_deduction = 50000  # Standard Deduction
-        taxable_income = max(0, taxable_income - std_deduction)
-    else:
-        slabs = [
-            (250000, 0.05),
-            (500000, 0.1),
-            (750000, 0.15),
-            (1000000, 0.2),
-            (1250000, 0.25),
-            (1500000, 0.3)
-        ]
+    columns = {"Month": fiscal_months(fy) + ["Total"]}
+    for component, column in SALARY_COLUMNS.items():
+        # Arrears only get a column when there are any
+        if component == "arrears" and not schedule["arrears"].any():
+            continue
+        values = schedule[component][0]
+        columns[column] = np.append(values, values.sum())
     
-    prev_limit = 0
-    for limit, rate in slabs:
-        if taxable_income > prev_limit:
-            tax += (min(limit, taxable_income) - prev_limit) * rate
-        prev_limit = limit
+    df = pd.DataFrame(columns, index=list(range(12)) + ["Total"])
     
-    return tax, taxable_income
+    return df
 
-def calculate_salary(base_pay, da_percent, hra_percent, cca, epf_percent, income_tax, prof_tax):
-    months = ["March - 2020", "April - 2020", "May - 2020", "June - 2020", "July - 2020", "August - 2020", "September - 2020", "October - 2020", "November - 2020", "December - 2020", "January - 2021", "February - 2021"]
+def create_excel_with_format(salary_df, tax_amount, deduction_month, fy=CALCULATOR_FY):
+    buffer = io.BytesIO()
     
-    data = []
-    for month in months:
-        da = (da_percent / 100) * base_pay
-        hra = (hra_percent / 100) * base_pay
-        epf = (epf_percent / 100) * base_pay
-        gross = base_pay + da + hra + cca
-        deductions = epf + income_tax/12 + prof_tax
-        net_pay = gross - deductions
-        
-        data.append([month, base_pay, da, hra, cca, gross, epf, income_tax/12, prof_tax, net_pay])
+    workbook = new_workbook(buffer)
+    formats = add_formats(workbook)
     
-    df = pd.DataFrame(data, columns=[
-        "Month", "Pay + GP/AGP + Personal Pay + Special Pay", "Dearness Allowance", "House Rent Allowance",
-        "City Compensatory Allowance", "Total Gross", "EPF Subscription", "Income Tax Deducted", "Professional Tax", "Net Pay"
-    ])
+    # Rows are streamed in order, so the title goes in first
+    sheet = SheetWriter(workbook, 'Salary Details', formats, start_row=2)
+    rules = get_rules(fy)
+    title = f"Salary details for the Financial Year {rules.fy.replace('-', ' - ')} (Assessment Year {rules.ay.replace('-', ' - ')})"
+    sheet.worksheet.merge_range('A1:J2', title, formats['title'])
     
-    df.loc['Total'] = df.iloc[:, 1:].sum(numeric_only=True)
-    df.loc['Total', 'Month'] = 'Total'
+    # Header, Month column as text and the amounts as ₹ numbers
+    sheet.write_frame(salary_df)
+    sheet.set_widths()
     
-    return df
-
-def create_excel_with_format(salary_df, tax_amount, deduction_month):
-    buffer = io.BytesIO()
+    # Add the declaration text at the bottom
+    end_row = len(salary_df) + 5
+    tax_in_words = num_to_words(tax_amount)
     
-    with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-        # Write the dataframe
-        salary_df.to_excel(writer, sheet_name='Salary Details', index=False, startrow=2)
-        
-        workbook = writer.book
-        worksheet = writer.sheets['Salary Details']
-        
-        # Add title
-        title_format = workbook.add_format({
-            'bold': True, 
-            'font_size': 14, 
-            'align': 'center',
-            'valign': 'vcenter'
-        })
-        worksheet.merge_range('A1:J2', 'Salary details for the Financial Year 2020 - 21 (Assessment Year 2021 - 22)', title_format)
-        
-        # Format headers
-        header_format = workbook.add_format({
-            'bold': True,
-            'bg_color': '#D9D9D9',
-            'border': 1,
-            'align': 'center',
-            'valign': 'vcenter',
-            'text_wrap': True
-        })
-        
-        # Apply header format
-        for col_num, value in enumerate(salary_df.columns.values):
-            worksheet.write(2, col_num, value, header_format)
-        
-        # Format for numbers
-        number_format = workbook.add_format({
-            'num_format': '₹#,##0.00',
-            'border': 1
-        })
-        
-        # Format for text cells
-        text_format = workbook.add_format({
-            'border': 1,
-            'align': 'left'
-        })
-        
-        # Apply formats to data cells
-        for row_num in range(3, len(salary_df) + 3):
-            worksheet.write(row_num, 0, salary_df.iloc[row_num-3, 0], text_format)  # Month column
-            
-            # Apply number format to numeric columns
-            for col_num in range(1, len(salary_df.columns)):
-                value = salary_df.iloc[row_num-3, col_num]
-                worksheet.write(row_num, col_num, value, number_format)
-        
-        # Auto-adjust columns' width
-        for i, col in enumerate(salary_df.columns):
-            column_width = max(salary_df[col].astype(str).map(len).max(), len(col)) + 2
-            worksheet.set_column(i, i, column_width)
-        
-        # Add the declaration text at the bottom
-        end_row = len(salary_df) + 5
-        tax_in_words = "zero" if tax_amount == 0 else "amount in words"  # Replace with actual conversion if needed
-        
-        declaration = f"Please deduct Rs. {tax_amount} /-        (Rupees {tax_in_words} only)    from  my  salary  from  the  month  of {deduction_month} onwards towards my Income Tax payment."
-        signature_line = "Date:                    Place: Kavaraipettai                Signature of the Staff: _______________"
-        
-        worksheet.write(end_row, 0, declaration)
-        worksheet.write(end_row + 2, 0, signature_line)
-        
-        # Merge cells for declaration and signature
-        worksheet.merge_range(end_row, 0, end_row, len(salary_df.columns) - 1, declaration)
-        worksheet.merge_range(end_row + 2, 0, end_row + 2, len(salary_df.columns) - 1, signature_line)
+    declaration = f"Please deduct Rs. {tax_amount} /-        (Rupees {tax_in_words} only)    from  my  salary  from  the  month  of {deduction_month} onwards towards my Income Tax payment."
+    signature_line = "Date:                    Place: Kavaraipettai                Signature of the Staff: _______________"
+    
+    # Merge cells for declaration and signature
+    sheet.worksheet.merge_range(end_row, 0, end_row, len(salary_df.columns) - 1, declaration)
+    sheet.worksheet.merge_range(end_row + 2, 0, end_row + 2, len(salary_df.columns) - 1, signature_line)
     
+    workbook.close()
     buffer.seek(0)
     return buffer
 
@@ -157,7 +90,7 @@ with tab1:
         deductions = st.number_input("Total Deductions (₹, Only for Old Regime)", min_value=0, value=0, key="tax_deductions")
 
     if st.button("Calculate Tax"):
-        tax, taxable_income = calculate_tax(income, deductions if regime == "Old" else 0, regime, age)
+        tax, taxable_income = calculator_tax(income, deductions if regime == "Old" else 0, regime, age)
         st.success(f"Taxable Income: ₹{taxable_income:,.2f}")
         st.error(f"Total Tax Payable: ₹{tax:,.2f}")
         
@@ -211,17 +144,15 @@ with tab2:
     
     # Add download button
     if 'salary_df' in st.session_state:
-        buffer = create_excel_with_format(
-            st.session_state.salary_df, 
-            st.session_state.tax_amount,
-            st.session_state.deduction_month
-        )
+        salary_args = (st.session_state.salary_df, st.session_state.tax_amount, st.session_state.deduction_month)
         
         file_name = f"Salary_Details_{datetime.now().strftime('%Y%m%d%H%M%S')}.xlsx"
         
-        st.download_button(
-            label="Download Salary Excel",
-            data=buffer,
+        # The workbook is only generated when the button is clicked
+        download_button(
+            "Download Salary Excel",
+            lambda: create_excel_with_format(*salary_args),
+            *salary_args,
             file_name=file_name,
             mime="application/vnd.ms-excel"
         )
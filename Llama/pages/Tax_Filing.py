@@ -1,10 +1,17 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import base64
 from datetime import datetime, date
 from io import BytesIO, StringIO
 import re
+from amount_words import num_to_words
+from downloads import download_button
+from excel_export import export_workbook
+from filing_graph import FilingGraph
+from form16_extract import extract_form16
+from instrumentation import ENABLED as INSTRUMENTED, record, rerun
+from rules import DEFAULT_FY, available_years, get_rules
+from tax_compute import compare_regimes
 
 def calculate_age(born):
     today = date.today()
@@ -16,95 +23,42 @@ def is_senior_citizen(dob):
     age = calculate_age(dob)
     return age >= 60
 
-def to_excel(df):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='Sheet1', index=False)
-    processed_data = output.getvalue()
-    return processed_data
+@st.cache_data(show_spinner="Reading your form...")
+def extract_uploaded_form(data, file_name):
+    """Form 16 fields from an uploaded file, parsed once per distinct upload"""
+    return extract_form16(BytesIO(data), file_name)
 
-def get_table_download_link(df, filename="income_tax_calculation_FY2024-25.xlsx"):
-    """Generates a link allowing the data in a given pandas dataframe to be downloaded"""
-    val = to_excel(df)
-    b64 = base64.b64encode(val)
-    return f'<a href="data:application/octet-stream;base64,{b64.decode()}" download="{filename}">Download Excel File</a>'
+def to_excel(df):
+    return export_workbook({'Sheet1': df}).getvalue()
 
-def calculate_tax_old_regime(taxable_income, is_senior=False):
-    tax = 0
-    tax_exempt_limit = 300000 if is_senior else 250000
-    
-    if taxable_income > tax_exempt_limit:
-        # 5% slab (2.5L-5L)
-        tax_5_percent = min(max(0, taxable_income - tax_exempt_limit), 250000) * 0.05
-        
-        # 20% slab (5L-10L)
-        tax_20_percent = min(max(0, taxable_income - tax_exempt_limit - 250000), 500000) * 0.20
-        
-        # 30% slab (>10L)
-        tax_30_percent = max(0, taxable_income - tax_exempt_limit - 750000) * 0.30
-        
-        tax = tax_5_percent + tax_20_percent + tax_30_percent
-    
-    # Rebate under section 87A
-    rebate = 0
-    if taxable_income <= 500000:
-        rebate = min(tax, 12500)
-    
-    tax_after_rebate = tax - rebate
-    cess = tax_after_rebate * 0.04
-    total_tax = tax_after_rebate + cess
-    
-    return {
-        "tax": tax,
-        "rebate": rebate,
-        "tax_after_rebate": tax_after_rebate,
-        "cess": cess,
-        "total_tax": total_tax
-    }
+def indian_number(amount):
+    """12,34,567 style digit grouping for limits shown in labels"""
+    digits = str(int(amount))
+    if len(digits) <= 3:
+        return digits
+    head, tail = digits[:-3], digits[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    return ",".join([head] + groups + [tail])
 
-def calculate_tax_new_regime(taxable_income, is_senior=False):
-    tax = 0
-    tax_exempt_limit = 300000 # Same for everyone in new regime
-    
-    if taxable_income > tax_exempt_limit:
-        # 5% slab (3L-7L)
-        tax_5_percent = min(max(0, taxable_income - tax_exempt_limit), 400000) * 0.05
-        
-        # 10% slab (7L-10L)
-        tax_10_percent = min(max(0, taxable_income - tax_exempt_limit - 400000), 300000) * 0.10
-        
-        # 15% slab (10L-12L)
-        tax_15_percent = min(max(0, taxable_income - tax_exempt_limit - 700000), 200000) * 0.15
-        
-        # 20% slab (12L-15L)
-        tax_20_percent = min(max(0, taxable_income - tax_exempt_limit - 900000), 300000) * 0.20
-        
-        # 30% slab (>15L)
-        tax_30_percent = max(0, taxable_income - tax_exempt_limit - 1200000) * 0.30
-        
-        tax = tax_5_percent + tax_10_percent + tax_15_percent + tax_20_percent + tax_30_percent
-    
-    # Rebate under section 87A (higher in new regime)
-    rebate = 0
-    if taxable_income <= 700000:
-        rebate = min(tax, 25000)
-    
-    tax_after_rebate = tax - rebate
-    cess = tax_after_rebate * 0.04
-    total_tax = tax_after_rebate + cess
-    
-    return {
-        "tax": tax,
-        "rebate": rebate,
-        "tax_after_rebate": tax_after_rebate,
-        "cess": cess,
-        "total_tax": total_tax
-    }
+def show_download_button(df, filename=f"income_tax_calculation_FY{DEFAULT_FY}.xlsx"):
+    """Download button for the dataframe as Excel; the file is built only when clicked"""
+    download_button("Download Excel File", lambda: to_excel(df), df, file_name=filename,
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
 
 def main():
-    st.set_page_config(page_title="Income Tax Filing - FY 2024-25", layout="wide")
+    # Limits, slabs and titles all come from the selected year's rule set
+    fy = st.session_state.get("filing_fy", DEFAULT_FY)
+    rules = get_rules(fy)
+    limits = rules.limits
+    
+    st.set_page_config(page_title=f"Income Tax Filing - FY {fy}", layout="wide")
     
-    st.title("Income Tax Filing - FY 2024-25 (AY 2025-26)")
+    st.title(f"Income Tax Filing - {rules.title}")
+    years = available_years()
+    st.selectbox("Financial Year", years, index=years.index(fy), key="filing_fy")
     
     # Tax Regime Selection (moved to top based on image)
     col1, col2 = st.columns([3, 1])
@@ -123,18 +77,24 @@ def main():
     department = ""
     dob = None
     is_senior = False
+    prefill = {}
     
     # If file is uploaded, try to extract information
     if uploaded_file:
-        # For simplicity, we'll assume text extraction works
-        # In a real app, you'd need proper docx/pdf parsing
-        st.success("Form uploaded successfully! We've pre-filled some fields based on your form.")
+        try:
+            prefill = extract_uploaded_form(uploaded_file.getvalue(), uploaded_file.name)
+            if prefill:
+                st.success("Form uploaded successfully! We've pre-filled some fields based on your form.")
+            else:
+                st.warning("No Form 16 details were found in the uploaded file.")
+        except Exception as e:
+            print(e)
+            st.error("Could not read the uploaded form. Please fill in the fields manually.")
         
-        # Here, we're simulating extraction from the form
-        name = "M.SHANTHI"
-        pan = "DFTPS6875E"
-        designation = "ASSOCIATE PROFESSOR (Grade-II)"
-        department = "ARTIFICIAL INTELLIGENCE AND DATA SCIENCE"
+        name = prefill.get("name", name)
+        pan = prefill.get("pan", pan)
+        designation = prefill.get("designation", designation)
+        department = prefill.get("department", department)
     
     # Personal Information
     st.header("Personal Information")
@@ -156,6 +116,14 @@ def main():
         if is_senior:
             dob = st.date_input("Date of Birth", value=date(1960, 1, 1), max_value=date.today())
     
+    # Derived amounts are memoized per session; only what depends on a
+    # changed widget is recomputed on this rerun
+    if "filing_graph" not in st.session_state:
+        st.session_state.filing_graph = FilingGraph()
+    graph = st.session_state.filing_graph
+    graph.begin_run()
+    graph.set(fy=fy, tax_regime=tax_regime, is_senior=is_senior)
+    
     # Create tabs for different sections
     tab1, tab2, tab3, tab4 = st.tabs(["Income", "House Property", "Other Income", "Deductions"])
     
@@ -165,23 +133,23 @@ def main():
         
         # Table-like structure for salary components as shown in the image
         # (a) Basic Salary, AGP/GP, DA, HRA, CCA, IR
-        basic_salary = st.number_input("Basic Salary", min_value=0.0, step=1000.0, format="%.2f", value=962835.0 if uploaded_file else 0.0)
+        basic_salary = st.number_input("Basic Salary", min_value=0.0, step=1000.0, format="%.2f", value=prefill.get("basic_salary", 0.0))
         
         # Breakup of the components
         col1, col2 = st.columns(2)
         
         with col1:
-            agp_gp = st.number_input("Academic Grade Pay/Grade Pay (AGP/GP)", min_value=0.0, step=1000.0, format="%.2f")
-            da = st.number_input("Dearness Allowance (DA)", min_value=0.0, step=1000.0, format="%.2f")
-            hra = st.number_input("House Rent Allowance (HRA)", min_value=0.0, step=1000.0, format="%.2f")
+            agp_gp = st.number_input("Academic Grade Pay/Grade Pay (AGP/GP)", min_value=0.0, step=1000.0, format="%.2f", value=prefill.get("agp_gp", 0.0))
+            da = st.number_input("Dearness Allowance (DA)", min_value=0.0, step=1000.0, format="%.2f", value=prefill.get("da", 0.0))
+            hra = st.number_input("House Rent Allowance (HRA)", min_value=0.0, step=1000.0, format="%.2f", value=prefill.get("hra", 0.0))
         
         with col2:
-            cca = st.number_input("City Compensatory Allowance (CCA)", min_value=0.0, step=1000.0, format="%.2f")
+            cca = st.number_input("City Compensatory Allowance (CCA)", min_value=0.0, step=1000.0, format="%.2f", value=prefill.get("cca", 0.0))
             ir = st.number_input("IR (If applicable)", min_value=0.0, step=1000.0, format="%.2f")
             other_allowances = st.number_input("Other Allowances", min_value=0.0, step=1000.0, format="%.2f")
         
         # (b) Taxable Value of Perquisites
-        perquisites = st.number_input("(b) Taxable Value of Perquisites", min_value=0.0, step=1000.0, format="%.2f")
+        perquisites = st.number_input("(b) Taxable Value of Perquisites", min_value=0.0, step=1000.0, format="%.2f", value=prefill.get("perquisites", 0.0))
         
         # (c) Pension
         pension = st.number_input("(c) Pension", min_value=0.0, step=1000.0, format="%.2f")
@@ -194,28 +162,30 @@ def main():
         additional_income = st.number_input("(e) Additional Income (if any)", min_value=0.0, step=1000.0, format="%.2f")
         
         # Calculate total salary
-        salary_total = basic_salary + agp_gp + da + hra + cca + ir + other_allowances + perquisites + pension + others_amount + additional_income
+        graph.set(basic_salary=basic_salary, agp_gp=agp_gp, da=da, hra=hra, cca=cca, ir=ir,
+                  other_allowances=other_allowances, perquisites=perquisites, pension=pension,
+                  others_amount=others_amount, additional_income=additional_income)
+        salary_total = graph["salary_total"]
         st.info(f"Total Salary: ₹ {salary_total:,.2f}")
+        if "gross_salary" in prefill:
+            st.caption(f"Form 16 salary under section 17(1): ₹ {prefill['gross_salary']:,.2f}")
         
-        epf_subscription = st.number_input("EPF Subscription", min_value=0.0, step=1000.0, format="%.2f")
-        professional_tax = st.number_input("Professional Tax", min_value=0.0, step=100.0, format="%.2f")
+        epf_subscription = st.number_input("EPF Subscription", min_value=0.0, step=1000.0, format="%.2f", value=prefill.get("epf_subscription", 0.0))
+        professional_tax = st.number_input("Professional Tax", min_value=0.0, step=100.0, format="%.2f", value=prefill.get("professional_tax", 0.0))
+        graph.set(epf_subscription=epf_subscription, professional_tax=professional_tax)
         
         if tax_regime == "Old Regime":
             st.subheader("HRA Exemption")
             rent_paid = st.number_input("Rent Paid", min_value=0.0, step=1000.0, format="%.2f")
             
             # Calculate HRA exemption
-            basic_for_hra = basic_salary + agp_gp  # Basis for HRA calculation
-            forty_percent_basic = basic_for_hra * 0.4  # 40% of basic (for non-metro)
-            ten_percent_basic = basic_for_hra * 0.1
-            rent_minus_10_percent = max(0, rent_paid - ten_percent_basic)
-            
-            hra_exemption = min(hra, rent_minus_10_percent, forty_percent_basic)
+            graph.set(rent_paid=rent_paid)
+            hra_exemption = graph["hra_exemption"]
             
             st.info(f"HRA Exemption: ₹ {hra_exemption:,.2f}")
             
             # Standard Deduction
-            standard_deduction = min(50000, salary_total)
+            standard_deduction = graph["standard_deduction"]
             st.info(f"Standard Deduction: ₹ {standard_deduction:,.2f}")
         else:
             # New regime doesn't have HRA exemption or standard deduction
@@ -229,21 +199,20 @@ def main():
         st.subheader("Income from House Property")
         
         has_house_property = st.checkbox("Do you have income from House Property?")
+        graph.set(has_house_property=has_house_property)
         
         if has_house_property:
             rent_received = st.number_input("Annual Rent Received", min_value=0.0, step=1000.0, format="%.2f")
             property_tax = st.number_input("House Tax (Property Tax Paid)", min_value=0.0, step=100.0, format="%.2f")
             
-            net_annual_value = rent_received - property_tax
-            
-            # 30% deduction for repairs
-            repairs_deduction = net_annual_value * 0.3
-            
             # Housing loan interest
-            housing_loan_interest = st.number_input("Interest on Housing Loan", min_value=0.0, max_value=200000.0, step=1000.0, format="%.2f", help="Maximum deduction allowed is ₹2,00,000")
+            housing_loan_interest = st.number_input("Interest on Housing Loan", min_value=0.0, max_value=float(limits["24(b)"]), step=1000.0, format="%.2f", help=f"Maximum deduction allowed is ₹{indian_number(limits['24(b)'])}")
             
-            # Calculate net house property income
-            net_house_income = net_annual_value - repairs_deduction - housing_loan_interest
+            # Calculate net house property income, after the 30% deduction for repairs
+            graph.set(rent_received=rent_received, property_tax=property_tax, housing_loan_interest=housing_loan_interest)
+            net_annual_value = graph["net_annual_value"]
+            repairs_deduction = graph["repairs_deduction"]
+            net_house_income = graph["net_house_income"]
             
             st.info(f"Net Income from House Property: ₹ {net_house_income:,.2f}")
         else:
@@ -263,7 +232,8 @@ def main():
         exam_remuneration = st.number_input("Exam Remuneration", min_value=0.0, step=1000.0, format="%.2f")
         other_sources = st.number_input("Other Income Sources", min_value=0.0, step=1000.0, format="%.2f")
         
-        total_other_income = savings_interest + fd_interest + other_sources
+        graph.set(savings_interest=savings_interest, fd_interest=fd_interest, other_sources=other_sources)
+        total_other_income = graph["total_other_income"]
         st.info(f"Total Income from Other Sources: ₹ {total_other_income:,.2f}")
     
     # Initialize deductions dictionary
@@ -273,7 +243,7 @@ def main():
     # Deductions
     with tab4:
         if tax_regime == "Old Regime":
-            st.subheader("Deductions under Section 80C (Max ₹1,50,000)")
+            st.subheader(f"Deductions under Section 80C (Max ₹{indian_number(limits['80C'])})")
             
             col1, col2 = st.columns(2)
             
@@ -289,42 +259,45 @@ def main():
                 deductions["Tax Saver FD"] = st.number_input("Tax Saver Fixed Deposits (5 years)", min_value=0.0, step=1000.0, format="%.2f")
                 deductions["Sukanya Samriddhi"] = st.number_input("Sukanya Samriddhi Account", min_value=0.0, step=1000.0, format="%.2f")
             
-            total_80c = sum(deductions.values()) + epf_subscription
-            capped_80c = min(total_80c, 150000)
+            graph.set(section_80c_items=tuple(deductions.values()))
+            total_80c = graph["total_80c"]
+            capped_80c = graph["capped_80c"]
             
             st.info(f"Total Section 80C Deductions: ₹ {total_80c:,.2f} (Capped at ₹ {capped_80c:,.2f})")
+            if "section_80c" in prefill:
+                # Form 16 shows only the total, EPF included; the page needs the items
+                st.caption(f"Form 16 Section 80C total: ₹ {prefill['section_80c']:,.2f}, including EPF")
             
             st.subheader("Other Deductions")
             
-            additional_nps = st.number_input("Additional NPS Contribution (80CCD(1B)) - Max ₹50,000", min_value=0.0, max_value=50000.0, step=1000.0, format="%.2f")
+            additional_nps = st.number_input(f"Additional NPS Contribution (80CCD(1B)) - Max ₹{indian_number(limits['80CCD(1B)'])}", min_value=0.0, max_value=float(limits["80CCD(1B)"]), step=1000.0, format="%.2f", value=min(prefill.get("additional_nps", 0.0), float(limits["80CCD(1B)"])))
             
-            max_mediclaim = 50000 if is_senior else 25000
-            mediclaim = st.number_input(f"Medical Insurance Premium (80D) - Max ₹{max_mediclaim}", min_value=0.0, max_value=float(max_mediclaim), step=1000.0, format="%.2f")
+            max_mediclaim = rules.mediclaim_limit(is_senior)
+            mediclaim = st.number_input(f"Medical Insurance Premium (80D) - Max ₹{max_mediclaim}", min_value=0.0, max_value=float(max_mediclaim), step=1000.0, format="%.2f", value=min(prefill.get("mediclaim", 0.0), float(max_mediclaim)))
             
-            education_loan_interest = st.number_input("Interest on Education Loan (80E)", min_value=0.0, step=1000.0, format="%.2f")
-            affordable_house_interest = st.number_input("Interest on Affordable Housing Loan (80EEA) - Max ₹1,50,000", min_value=0.0, max_value=150000.0, step=1000.0, format="%.2f")
-            ev_loan_interest = st.number_input("Interest on Electric Vehicle Loan (80EEB)", min_value=0.0, step=1000.0, format="%.2f")
-            donations = st.number_input("Donations (80G)", min_value=0.0, step=1000.0, format="%.2f")
-            rent_paid_deduction = st.number_input("Rent Paid (80GG)", min_value=0.0, step=1000.0, format="%.2f", value=96000.0 if uploaded_file else 0.0)
+            education_loan_interest = st.number_input("Interest on Education Loan (80E)", min_value=0.0, step=1000.0, format="%.2f", value=prefill.get("education_loan_interest", 0.0))
+            affordable_house_interest = st.number_input(f"Interest on Affordable Housing Loan (80EEA) - Max ₹{indian_number(limits['80EEA'])}", min_value=0.0, max_value=float(limits["80EEA"]), step=1000.0, format="%.2f", value=min(prefill.get("affordable_house_interest", 0.0), float(limits["80EEA"])))
+            ev_loan_interest = st.number_input("Interest on Electric Vehicle Loan (80EEB)", min_value=0.0, step=1000.0, format="%.2f", value=prefill.get("ev_loan_interest", 0.0))
+            donations = st.number_input("Donations (80G)", min_value=0.0, step=1000.0, format="%.2f", value=prefill.get("donations", 0.0))
+            rent_paid_deduction = st.number_input("Rent Paid (80GG)", min_value=0.0, step=1000.0, format="%.2f", value=prefill.get("rent_paid_deduction", 0.0))
             
-            savings_interest_deduction = min(savings_interest, 10000)
-            st.info(f"Savings Bank Interest Deduction (80TTA): ₹ {savings_interest_deduction:,.2f} (Max ₹10,000)")
-            
-            # For senior citizens
+            graph.set(additional_nps=additional_nps, mediclaim=mediclaim, education_loan_interest=education_loan_interest,
+                      affordable_house_interest=affordable_house_interest, ev_loan_interest=ev_loan_interest,
+                      donations=donations, rent_paid_deduction=rent_paid_deduction)
+            savings_interest_deduction = graph["savings_interest_deduction"]
+            ttb_deduction = graph["ttb_deduction"]
+            # Senior citizens claim 80TTB instead of 80TTA
             if is_senior:
-                ttb_deduction = min(savings_interest + fd_interest, 50000)
-                st.info(f"Senior Citizen Interest Deduction (80TTB): ₹ {ttb_deduction:,.2f} (Max ₹50,000)")
+                st.info(f"Senior Citizen Interest Deduction (80TTB): ₹ {ttb_deduction:,.2f} (Max ₹{indian_number(limits['80TTB'])})")
             else:
-                ttb_deduction = 0
+                st.info(f"Savings Bank Interest Deduction (80TTA): ₹ {savings_interest_deduction:,.2f} (Max ₹{indian_number(limits['80TTA'])})")
                 
             disabled_person = st.checkbox("Are you a person with disability (80U)?")
-            disability_deduction = 75000 if disabled_person else 0
+            graph.set(disabled_person=disabled_person)
+            disability_deduction = graph["disability_deduction"]
             
             # Calculate total deductions
-            total_deductions = (capped_80c + additional_nps + mediclaim + education_loan_interest + 
-                               affordable_house_interest + ev_loan_interest + donations + 
-                               savings_interest_deduction + ttb_deduction + disability_deduction +
-                               rent_paid_deduction)
+            total_deductions = graph["total_deductions"]
             
             st.info(f"Total Deductions: ₹ {total_deductions:,.2f}")
         else:
@@ -344,25 +317,14 @@ def main():
     # Calculate Taxable Income
     st.header("Tax Calculation")
     
-    # Net salary after exemptions and deductions
-    if tax_regime == "Old Regime":
-        net_salary = salary_total - hra_exemption - standard_deduction - professional_tax
-        gross_total_income = net_salary + net_house_income + total_other_income
-        taxable_income = gross_total_income - total_deductions
-    else:
-        # New regime
-        net_salary = salary_total - professional_tax
-        gross_total_income = net_salary + net_house_income + total_other_income
-        taxable_income = gross_total_income  # No deductions in new regime
-    
-    taxable_income = max(0, taxable_income)
+    # Net salary after exemptions and deductions (none in the new regime)
+    net_salary = graph["net_salary"]
+    gross_total_income = graph["gross_total_income"]
+    taxable_income = graph["taxable_income"]
     st.subheader(f"Taxable Income: ₹ {taxable_income:,.2f}")
     
     # Calculate tax based on selected regime
-    if tax_regime == "Old Regime":
-        tax_results = calculate_tax_old_regime(taxable_income, is_senior)
-    else:
-        tax_results = calculate_tax_new_regime(taxable_income, is_senior)
+    tax_results = graph["tax_results"]
     
     # Display tax calculation results
     col1, col2 = st.columns(2)
@@ -377,17 +339,16 @@ def main():
         st.metric("Total Tax Liability", f"₹ {tax_results['total_tax']:,.2f}")
     
     # TDS details
-    tds_already_deducted = st.number_input("TDS Already Deducted", min_value=0.0, step=1000.0, format="%.2f")
-    remaining_tax = max(0, tax_results['total_tax'] - tds_already_deducted)
+    tds_already_deducted = st.number_input("TDS Already Deducted", min_value=0.0, step=1000.0, format="%.2f", value=prefill.get("tds_already_deducted", 0.0))
+    graph.set(tds_already_deducted=tds_already_deducted)
+    remaining_tax = graph["remaining_tax"]
     
     st.metric("Remaining Tax to be Paid", f"₹ {remaining_tax:,.2f}")
     
     # Calculate for both regimes for comparison
-    old_regime_results = calculate_tax_old_regime(
-        gross_total_income - total_deductions if tax_regime == "Old Regime" else gross_total_income - 0, 
-        is_senior
-    )
-    new_regime_results = calculate_tax_new_regime(gross_total_income, is_senior)
+    comparison = compare_regimes(graph)
+    old_regime_results = graph["old_regime_results"]
+    new_regime_results = graph["new_regime_results"]
     
     # Recommendation based on comparison
     st.subheader("Tax Regime Comparison")
@@ -400,12 +361,25 @@ def main():
     
     st.table(compare_df)
     
-    if old_regime_results['total_tax'] < new_regime_results['total_tax']:
-        st.success(f"Recommendation: Choose Old Regime to save ₹ {new_regime_results['total_tax'] - old_regime_results['total_tax']:,.2f}")
-    elif new_regime_results['total_tax'] < old_regime_results['total_tax']:
-        st.success(f"Recommendation: Choose New Regime to save ₹ {old_regime_results['total_tax'] - new_regime_results['total_tax']:,.2f}")
-    else:
+    if comparison["recommended_regime"] == "Either":
         st.info("Both regimes result in the same tax amount.")
+    else:
+        st.success(f"Recommendation: Choose {comparison['recommended_regime']} to save ₹ {comparison['savings']:,.2f}")
+    
+    # How much more would need to be invested for the Old Regime to win
+    if comparison["additional_investment"] > 0:
+        st.info(f"Hint: The Old Regime breaks even once your deductions reach ₹ {comparison['break_even_deduction']:,.2f}. "
+                f"Invest ₹ {comparison['additional_investment']:,.2f} more in eligible deductions to make it the better option.")
+    
+    # What this rerun cost, node by node
+    with st.expander("Recalculation details"):
+        node_stats = graph.run_stats()
+        recomputed = [row for row in node_stats if row["recomputed"]]
+        st.caption(f"{len(recomputed)} of {len(node_stats)} values recomputed on this rerun "
+                   f"in {sum(row['last_ms'] for row in recomputed):.3f} ms")
+        st.dataframe(pd.DataFrame(node_stats), hide_index=True)
+    if INSTRUMENTED:
+        record("tax.filing_graph", sum(row["last_ms"] for row in recomputed) / 1000)
     
     # Create downloadable form
     if st.button("Generate Downloadable Form"):
@@ -445,8 +419,8 @@ def main():
         
         df = pd.DataFrame(data)
         
-        # Display download link
-        st.markdown(get_table_download_link(df, f"Income_Tax_Calculation_{name}_{date.today()}.xlsx"), unsafe_allow_html=True)
+        # Display download button
+        show_download_button(df, f"Income_Tax_Calculation_{name}_{date.today()}.xlsx")
         
         # Form for monthly deduction
         st.subheader("Monthly Tax Deduction Plan")
@@ -470,74 +444,6 @@ def main():
         Please deduct Rs. **{remaining_tax:,.2f}** (Rupees **{num_to_words(remaining_tax)}** only) from my salary from the month of {date.today().strftime('%B')}.
         """)
 
-def num_to_words(num):
-    """Convert a number to words for Indian currency"""
-    units = ["", "One", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine", "Ten", "Eleven", "Twelve", "Thirteen", "Fourteen", "Fifteen", "Sixteen", "Seventeen", "Eighteen", "Nineteen"]
-    tens = ["", "", "Twenty", "Thirty", "Forty", "Fifty", "Sixty", "Seventy", "Eighty", "Ninety"]
-    
-    if num == 0:
-        return "Zero"
-    
-    # Convert to float and separate whole and decimal parts
-    num_str = str(num)
-    if '.' in num_str:
-        whole_part, decimal_part = num_str.split('.')
-        whole_num = int(whole_part)
-        # Ensure two decimal places
-        decimal_num = int(decimal_part.ljust(2, '0')[:2])
-    else:
-        whole_num = int(num)
-        decimal_num = 0
-    
-    words = ""
-    
-    # Process whole number part
-    crore = int(whole_num / 10000000)
-    whole_num = whole_num % 10000000
-    
-    if crore > 0:
-        words += num_to_words(crore) + " Crore "
-    
-    lakh = int(whole_num / 100000)
-    whole_num = whole_num % 100000
-    
-    if lakh > 0:
-        words += num_to_words(lakh) + " Lakh "
-    
-    thousand = int(whole_num / 1000)
-    whole_num = whole_num % 1000
-    
-    if thousand > 0:
-        words += num_to_words(thousand) + " Thousand "
-    
-    hundred = int(whole_num / 100)
-    whole_num = whole_num % 100
-    
-    if hundred > 0:
-        words += units[hundred] + " Hundred "
-    
-    if whole_num > 0:
-        if words != "" and whole_num < 100:
-            words += "and "
-        
-        if whole_num < 20:
-            words += units[whole_num]
-        else:
-            words += tens[int(whole_num / 10)]
-            if whole_num % 10 > 0:
-                words += " " + units[whole_num % 10]
-    
-    # Handle decimal part
-    if decimal_num > 0:
-        words += " and Paise "
-        if decimal_num < 20:
-            words += units[decimal_num]
-        else:
-            words += tens[int(decimal_num / 10)]
-            if decimal_num % 10 > 0:
-                words += " " + units[decimal_num % 10]
-    
-    return words
-
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with rerun("tax_filing"):
+        main()
\ No newline at end of file
@@ -1,22 +1,25 @@
 import streamlit as st
-import pandas as pd
+import io
 import os
 from dotenv import dotenv_values
-from groq import Groq
-import pdfkit
-from docx import Document
-import speech_recognition as sr
-import pyttsx3
-from PIL import Image
-import pytesseract
 
-engine = pyttsx3.init()
-from db import conn
+from chat_history import HistoryWindow
+from db import run_query
+from deductions import apply_deductions
+from downloads import download_button
+from instrumentation import rerun
+from intent_router import ASSISTANT_FY, route_tax_query, router_stats
+from lazy_imports import lazy_import
+from llm_client import stream_chat
+from ocr_worker import submit_ocr, ocr_status, pending_jobs
+from rules import get_rules
+from tax_compute import estimate_tax
 
 def show_all():
 
    
     def speak(text):
+        pyttsx3 = lazy_import("pyttsx3")
         try:
             engine = pyttsx3.init()
             engine.say(text)
@@ -28,6 +31,7 @@ def show_all():
             engine.stop()
 
     def voice_input():
+        sr = lazy_import("speech_recognition")
         recognizer = sr.Recognizer()
         with sr.Microphone() as source:
             st.sidebar.write("Listening... Please speak your query.")
@@ -44,69 +48,31 @@ def show_all():
                 st.sidebar.write(f"Error: {str(e)}")
         return None
 
-    def parse_groq_stream(stream):
-        response_content = ""
-        for chunk in stream:
-            if chunk.choices and chunk.choices[0].delta.content is not None:
-                response_content += chunk.choices[0].delta.content
-                yield chunk.choices[0].delta.content
-        return response_content
-
-    def extract_text_from_image(image_path):
-        image = Image.open(image_path)
-        text = pytesseract.image_to_string(image)
-        return text
+    @st.fragment(run_every=1)
+    def show_ocr_progress(job_id):
+        # Polls the OCR worker pool without rerunning the whole page
+        status, text, waited = ocr_status(job_id)
+        if status == "pending":
+            st.info(f"Reading your document... ({waited:.0f}s, {pending_jobs()} in queue)")
+        elif status == "done":
+            st.rerun()
+        else:
+            # The page would only show the same error, so it is not rerun
+            st.error(f"Could not read the image: {text}")
 
     def extract_text_from_docx(docx_path):
-        doc = Document(docx_path)
+        doc = lazy_import("docx").Document(docx_path)
         return "\n".join([para.text for para in doc.paragraphs])
 
-    def calculate_tax(income, regime):
-        tax_estimate = 0
-        if regime == "New Regime":
-            if income <= 400000:
-                tax_estimate = 0
-            elif income <= 800000:
-                tax_estimate = (income - 400000) * 0.05
-            elif income <= 1200000:
-                tax_estimate = 20000 + (income - 800000) * 0.10
-            elif income <= 1600000:
-                tax_estimate = 60000 + (income - 1200000) * 0.15
-            elif income <= 2000000:
-                tax_estimate = 120000 + (income - 1600000) * 0.20
-            elif income <= 2400000:
-                tax_estimate = 200000 + (income - 2000000) * 0.25
-            else:
-                tax_estimate = 300000 + (income - 2400000) * 0.30
-        else:
-            if income <= 250000:
-                tax_estimate = 0
-            elif income <= 500000:
-                tax_estimate = (income - 250000) * 0.05
-            elif income <= 1000000:
-                tax_estimate = 12500 + (income - 500000) * 0.20
-            else:
-                tax_estimate = 112500 + (income - 1000000) * 0.30
-        return round(tax_estimate, 2)
-
-    def format_tax_breakdown(income, regime, total_deductions, taxable_income, tax_estimate):
-        breakdown = [
-            f"**Tax Calculation for Annual Income of ₹{income:,.2f} under the {regime}:**",
-            f"- Total Deductions Applied: ₹{total_deductions:,.2f}",
-            f"- Taxable Income after Deductions: ₹{taxable_income:,.2f}",
-            f"- Total Estimated Tax: ₹{tax_estimate:,.2f}"
-        ]
-        return "\n".join(breakdown)
-
-    def export_chat_as_word():
-        doc = Document()
+    def export_chat_as_word(chat_history):
+        doc = lazy_import("docx").Document()
         doc.add_heading("Tax Assistant Chat History", level=1)
-        for message in st.session_state.chat_history:
+        for message in chat_history:
             role = "User" if message["role"] == "user" else "Assistant"
             doc.add_paragraph(f"{role}: {message['content']}")
-        file_path = "Tax_Assistant_Chat_History.docx"
-        doc.save(file_path)
-        return file_path
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        return buffer.getvalue()
     
     # Streamlit page setup
     st.set_page_config(page_title="Tax Assistant 🧑‍💼", page_icon="💰", layout="centered")
@@ -133,10 +99,10 @@ def show_all():
     INITIAL_RESPONSE = secrets.get("INITIAL_RESPONSE", "Hello! I’m here to help with tax finalization.")
     CHAT_CONTEXT = secrets.get("CHAT_CONTEXT", "You are a tax assistant helping users navigate tax finalization.")
 
-    client = Groq(api_key=GROQ_API_KEY)
-
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = [{"role": "assistant", "content": INITIAL_RESPONSE}]
+    if "history_window" not in st.session_state:
+        st.session_state.history_window = HistoryWindow()
 
     # Main UI
     st.title("Welcome to Your Tax Assistant!")
@@ -155,14 +121,28 @@ def show_all():
         with st.chat_message("user", avatar="📄"):
             st.markdown(f"Uploaded: {uploaded_file.name}")
         if uploaded_file.type in ["image/png", "image/jpeg", "image/jpg"]:
-            extracted_text = extract_text_from_image(uploaded_file)
+            # OCR runs in a background process pool, once per distinct file
+            job_id = submit_ocr(uploaded_file.getvalue())
+            status, extracted_text, _ = ocr_status(job_id)
+            if status == "pending":
+                with st.chat_message("assistant", avatar="🧑‍💼"):
+                    show_ocr_progress(job_id)
+            elif status == "error":
+                with st.chat_message("assistant", avatar="🧑‍💼"):
+                    st.error(f"Could not read the image: {extracted_text}")
+                # The error is kept until the upload changes or the user asks again
+                if st.button("Try reading the image again"):
+                    submit_ocr(uploaded_file.getvalue(), retry=True)
+                    st.rerun()
+                extracted_text = None
         elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
             extracted_text = extract_text_from_docx(uploaded_file)
         else:
             extracted_text = "Unsupported file type. Please upload a PNG, JPG, or DOCX file."
 
-        with st.chat_message("assistant", avatar="🧑‍💼"):
-            st.markdown(f"Extracted text: {extracted_text}")
+        if extracted_text is not None:
+            with st.chat_message("assistant", avatar="🧑‍💼"):
+                st.markdown(f"Extracted text: {extracted_text}")
 
     # User text or voice input
     col1, col2 = st.columns([3, 1])
@@ -180,62 +160,77 @@ def show_all():
 
     # Deductions Section
     st.sidebar.subheader("Deductions Checklist")
-    deductions = {
-        "80C (Investments)": st.sidebar.number_input("80C (Investments) - Max ₹1,50,000:", min_value=0, max_value=150000, step=1000),
-        "80D (Health Insurance)": st.sidebar.number_input("80D (Health Insurance) - Max ₹25,000:", min_value=0, max_value=25000, step=1000),
-        "80E (Education Loan Interest)": st.sidebar.number_input("80E (Education Loan Interest):", min_value=0, step=1000),
-        "Home Loan Principal": st.sidebar.number_input("Home Loan Principal - Max ₹2,00,000:", min_value=0, max_value=200000, step=1000)
+    limits = get_rules(ASSISTANT_FY).limits
+    claims = {
+        "other_80c": st.sidebar.number_input(f"80C (Investments) - Max ₹{limits['80C']:,}:", min_value=0, max_value=limits["80C"], step=1000),
+        "mediclaim": st.sidebar.number_input(f"80D (Health Insurance) - Max ₹{limits['80D']:,}:", min_value=0, max_value=limits["80D"], step=1000),
+        "education_loan_interest": st.sidebar.number_input("80E (Education Loan Interest):", min_value=0, step=1000),
+        "home_loan_principal": st.sidebar.number_input(f"Home Loan Principal (within the 80C limit of ₹{limits['80C']:,}):", min_value=0, max_value=limits["80C"], step=1000)
     }
 
-    total_deductions = sum(deductions.values())
+    total_deductions = apply_deductions(claims, fy=ASSISTANT_FY)["total"]
     taxable_income = max(0, income - total_deductions)
 
-    tax_estimate = calculate_tax(taxable_income, tax_regime)
+    tax_estimate = estimate_tax(taxable_income, tax_regime, ASSISTANT_FY)
     st.sidebar.write(f"**Total Deductions Applied:** ₹{total_deductions:,.2f}")
     st.sidebar.write(f"**Taxable Income after Deductions:** ₹{taxable_income:,.2f}")
     st.sidebar.write(f"**Estimated Tax after Deductions:** ₹{tax_estimate:,.2f}")
 
+    routing = router_stats.summary()
+    if routing["hits"] + routing["misses"]:
+        st.sidebar.caption(
+            f"Answered locally: {routing['hit_rate']:.0%} of questions, "
+            f"about {routing['latency_saved_s']:.1f}s of model latency saved"
+        )
+
     st.sidebar.subheader("Tax Resources")
     st.sidebar.write("[Income Tax India](https://www.incometax.gov.in/iec/foportal)")
     st.sidebar.write("[Make Payment](https://eportal.incometax.gov.in/iec/foservices/#/e-pay-tax-prelogin/user-details)")
 
-    if st.sidebar.button("🖨 Download Tax Report as Word"):
-        word_file_path = export_chat_as_word()
-        with open(word_file_path, "rb") as word_file:
-            st.sidebar.download_button(
-                label="Download Tax Report as Word",
-                data=word_file,
-                file_name="Tax_Assistant_Chat_History.docx",
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            )
+    # The report is generated in memory when clicked, not on every rerun
+    chat_history = list(st.session_state.chat_history)
+    download_button(
+        "🖨 Download Tax Report as Word",
+        lambda: export_chat_as_word(chat_history),
+        [(message["role"], message["content"]) for message in chat_history],
+        file_name="Tax_Assistant_Chat_History.docx",
+        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        container=st.sidebar,
+    )
 
     if user_prompt:
         with st.chat_message("user", avatar="🔨"):
             st.markdown(user_prompt)
         st.session_state.chat_history.append({"role": "user", "content": user_prompt})
 
-        messages = [
-            {"role": "system", "content": CHAT_CONTEXT},
-            {"role": "assistant", "content": INITIAL_RESPONSE},
-            *st.session_state.chat_history,
-        ]
+        # Send only as much recent history as fits the prompt token budget
+        messages = st.session_state.history_window.build_messages(
+            [
+                {"role": "system", "content": CHAT_CONTEXT},
+                {"role": "assistant", "content": INITIAL_RESPONSE},
+            ],
+            st.session_state.chat_history,
+        )
+        prompt_metrics = st.session_state.history_window.last_metrics
+        st.sidebar.caption(
+            f"Prompt tokens: {prompt_metrics['prompt_tokens']:,} "
+            f"({prompt_metrics['messages_sent']} messages sent, {prompt_metrics['messages_summarized']} summarized)"
+        )
 
         with st.chat_message("assistant", avatar="🧑‍💼"):
-            if user_prompt.lower().startswith("calculate tax"):
-                try:
-                    user_income = int(user_prompt.split()[-1])
-                    response_content = format_tax_breakdown(user_income, tax_regime, total_deductions, taxable_income, tax_estimate)
-                except ValueError:
-                    response_content = "Please provide a valid income amount for tax calculation."
+            # Tax calculations are answered locally from the slab engine;
+            # anything the parser is unsure about goes to the LLM
+            response_content = route_tax_query(user_prompt)
+            if response_content is not None:
+                st.markdown(response_content)
             else:
-                stream = client.chat.completions.create(
-                    model="llama3-8b-8192",
-                    messages=messages,
-                    stream=True
-                )
-                response_content = "".join(parse_groq_stream(stream))
-
-            st.markdown(response_content)
+                # Render tokens as they arrive; the shared client reuses connections
+                # and repeated questions are answered from the response cache
+                chat_stream = stream_chat(GROQ_API_KEY, messages)
+                response_content = st.write_stream(chat_stream)
+                if not chat_stream.cached:
+                    router_stats.record_llm(chat_stream.total_time)
+
             speak(response_content)
         st.session_state.chat_history.append({"role": "assistant", "content": response_content})
 
@@ -254,9 +249,10 @@ def show_home():
         st.switch_page("pages/login.py")
 
     st.subheader("Database Content")
-    df = conn.query("SELECT * FROM mytable;", ttl=600)
+    df = run_query("SELECT * FROM mytable;")
     st.dataframe(df)
 
 if __name__ == "__main__":
     # show_home()
-    show_all()
\ No newline at end of file
+    with rerun("home"):
+        show_all()
\ No newline at end of file
@@ -1,5 +1,5 @@
 import streamlit as st
-from db import get_user
+from db import authenticate, run_migrations
 
 def show_login():
     st.title("Login")
@@ -8,26 +8,22 @@ def show_login():
     password = st.text_input("Password", type="password")
 
     if st.button("Login"):
-        user = get_user(username)  # Fetch user details from DB
+        user = authenticate(username, password)  # Fetch and verify against the stored hash
         
-        if user is not None:  # Ensure user exists
-            stored_password = user["password"]  # Retrieve the stored password
-
-            if password == stored_password:  
-                print("Authenticated")
-                st.session_state.authenticated = True
-                st.session_state.username = username
-                st.success(f"Welcome, {username}!")
-                st.switch_page("pages/home.py")
-            else:
-                st.error("Invalid username or password.")
+        if user is not None:
+            print("Authenticated")
+            st.session_state.authenticated = True
+            st.session_state.username = username
+            st.success(f"Welcome, {username}!")
+            st.switch_page("pages/home.py")
         else:
-            st.error("User not found.")
+            st.error("Invalid username or password.")
 
     if st.button("Go to Signup"):
         st.switch_page("pages/signup.py")
 
 if __name__ == "__main__":
+    run_migrations()  # no-op after the first call in this process
     if "authenticated" in st.session_state and st.session_state.authenticated:
         st.switch_page("pages/home.py")
     show_login()
\ No newline at end of file
@@ -1,8 +1,8 @@
 import streamlit as st
-from db import add_user, get_user,create_users_table
+from db import add_user, run_migrations
+from passwords import MAX_PASSWORD_BYTES, password_too_long
 
 def show_signup():
-    create_users_table()
     st.title("Sign Up")
 
     username = st.text_input("Choose a Username")
@@ -10,13 +10,15 @@ def show_signup():
     confirm_password = st.text_input("Confirm Password", type="password")
 
     if st.button("Register"):
-        if password == confirm_password:
-            if get_user(username):
-                st.error("Username already exists. Choose another one.")
-            else:
-                add_user(username, password)
+        if password_too_long(password):
+            st.error(f"Password is too long: use at most {MAX_PASSWORD_BYTES} bytes (fewer characters for non-English text).")
+        elif password == confirm_password:
+            created = add_user(username, password)
+            if created:
                 st.success("Account created successfully! Please log in.")
                 st.switch_page("pages/login.py")
+            elif created is False:
+                st.error("Username already exists. Choose another one.")
         else:
             st.error("Passwords do not match!")
 
@@ -24,6 +26,7 @@ def show_signup():
         st.switch_page("pages/login.py")
 
 if __name__ == "__main__":
+    run_migrations()  # no-op after the first call in this process
     if "authenticated" in st.session_state and st.session_state.authenticated:
         st.switch_page("pages/home.py")
     show_signup()
@@ -0,0 +1,68 @@
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+import numpy as np
+
+# Fixed-point money: amounts held as whole paise, Python ints for one filer
+# and int64 arrays for a payroll. Rates are held as whole basis points, so
+# slab tax, rebate and cess are integer multiplies with a single half-up
+# rounding back to the paisa, and two runs over the same inputs always agree
+# to the paisa.
+#
+# Rupee amounts become paise by rounding the amount as written (its shortest
+# decimal form, e.g. 12.345) half up, away from zero. The nearest binary float
+# can fall either side of a half paisa (12.345 is stored as 12.3449999...), so
+# rounding the float itself would disagree. to_paise and to_paise_array both
+# follow this rule.
+
+PAISE_PER_RUPEE = 100
+BASIS_POINTS = 10000
+# Section 288B: tax payable is rounded to the nearest ten rupees
+ROUND_288B_PAISE = 10 * PAISE_PER_RUPEE
+
+def to_paise(amount):
+    """Whole paise of a rupee amount"""
+    if isinstance(amount, (int, np.integer)):
+        return int(amount) * PAISE_PER_RUPEE
+    try:
+        value = Decimal(str(amount)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        value = None
+    if value is None or not value.is_finite():
+        raise ValueError(f"Cannot convert {amount!r} to paise")
+    return int(value * PAISE_PER_RUPEE)
+
+def to_paise_array(amounts):
+    """int64 paise of an array of rupee amounts, rounded as to_paise does"""
+    amounts = np.asarray(amounts)
+    if np.issubdtype(amounts.dtype, np.integer):
+        return amounts.astype(np.int64) * PAISE_PER_RUPEE
+    amounts = amounts.astype(np.float64)
+    if not np.isfinite(amounts).all():
+        raise ValueError(f"Cannot convert {amounts[~np.isfinite(amounts)][0].item()!r} to paise")
+    scaled = amounts * PAISE_PER_RUPEE
+    paise = np.floor(scaled + 0.5)
+    # Within float error of a half paisa the binary value does not say which
+    # side the written amount is on; those few go through Decimal
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) <= np.maximum(np.abs(scaled), 1) * 1e-12
+    for i in np.flatnonzero(near_half):
+        paise.flat[i] = to_paise(float(amounts.flat[i]))
+    return paise.astype(np.int64)
+
+def from_paise(paise):
+    """Rupees as float (or a float array) for display and export"""
+    return paise / PAISE_PER_RUPEE
+
+def basis_points(rate):
+    """A rate such as 0.05 as whole basis points; rates finer than that are refused"""
+    points = round(rate * BASIS_POINTS)
+    if abs(rate * BASIS_POINTS - points) > 1e-6:
+        raise ValueError(f"Rate {rate} is not a whole number of basis points")
+    return points
+
+def divide_half_up(numerator, denominator):
+    """numerator / denominator rounded half up, for non-negative ints or int64 arrays"""
+    return (numerator + denominator // 2) // denominator
+
+def round_288b(paise):
+    """Round tax payable in paise to the nearest ten rupees (Section 288B)"""
+    return divide_half_up(paise, ROUND_288B_PAISE) * ROUND_288B_PAISE
@@ -0,0 +1,101 @@
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+import bcrypt
+
+# bcrypt work factor. Each +1 doubles the CPU cost of a hash/verify, so tune
+# it against benchmarks/bench_password_cost.py for the worker fleet.
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+
+# Successful verifications are remembered for a short while, so a user
+# re-entering the same password (e.g. a double-clicked login) costs one
+# HMAC instead of another bcrypt run.
+VERIFY_CACHE_SIZE = int(os.environ.get("PASSWORD_VERIFY_CACHE_SIZE", 10000))
+VERIFY_CACHE_TTL = int(os.environ.get("PASSWORD_VERIFY_CACHE_TTL", 300))
+
+# bcrypt only uses the first 72 bytes of a password, and bcrypt 5 raises
+# ValueError for anything longer instead of truncating it
+MAX_PASSWORD_BYTES = 72
+
+# Per-process key, so cache entries are useless outside this process
+_cache_key = secrets.token_bytes(32)
+_verify_cache = OrderedDict()
+_verify_cache_lock = threading.Lock()
+
+def is_bcrypt_hash(value):
+    return isinstance(value, str) and value.startswith(("$2a$", "$2b$", "$2y$"))
+
+def hash_rounds(hashed):
+    """Work factor a bcrypt hash was created with, or None for anything else"""
+    if not is_bcrypt_hash(hashed):
+        return None
+    return int(hashed.split("$")[2])
+
+def needs_rehash(hashed, rounds=None):
+    """True for plaintext or bcrypt hashes made with a different work factor"""
+    return hash_rounds(hashed) != (rounds or BCRYPT_ROUNDS)
+
+def password_too_long(password):
+    return len(password.encode()) > MAX_PASSWORD_BYTES
+
+def _hash(password, rounds):
+    if password_too_long(password):
+        raise ValueError(f"Passwords can be at most {MAX_PASSWORD_BYTES} bytes long")
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+
+# bcrypt releases the GIL while it hashes, so concurrent logins on separate
+# Streamlit script threads already run on separate cores. Each login blocks
+# only its own session's script thread, for one bcrypt run.
+def hash_password(password, rounds=None):
+    return _hash(password, rounds or BCRYPT_ROUNDS)
+
+def _cache_token(password, hashed):
+    return hmac.new(_cache_key, hashed.encode() + b"\0" + password.encode(), hashlib.sha256).digest()
+
+def _cached(token):
+    with _verify_cache_lock:
+        expires = _verify_cache.get(token)
+        if expires is None:
+            return False
+        if expires < time.monotonic():
+            del _verify_cache[token]
+            return False
+        _verify_cache.move_to_end(token)
+        return True
+
+def _remember(token):
+    with _verify_cache_lock:
+        _verify_cache[token] = time.monotonic() + VERIFY_CACHE_TTL
+        _verify_cache.move_to_end(token)
+        while len(_verify_cache) > VERIFY_CACHE_SIZE:
+            _verify_cache.popitem(last=False)
+
+def _check(password, hashed):
+    if is_bcrypt_hash(hashed):
+        # No bcrypt hash can match a password it refused to hash
+        if password_too_long(password):
+            return False
+        return bcrypt.checkpw(password.encode(), hashed.encode())
+    # Accounts created before hashing was enabled store the plain password
+    return hmac.compare_digest(password.encode(), hashed.encode())
+
+def verify_password(password, hashed):
+    if not hashed:
+        return False
+    if VERIFY_CACHE_TTL > 0:
+        token = _cache_token(password, hashed)
+        if _cached(token):
+            return True
+    ok = _check(password, hashed)
+    if ok and VERIFY_CACHE_TTL > 0:
+        _remember(token)
+    return ok
+
+def clear_verify_cache():
+    with _verify_cache_lock:
+        _verify_cache.clear()
@@ -0,0 +1,117 @@
+import bisect
+from functools import lru_cache
+
+import numpy as np
+
+from slabs import get_schedule, DEFAULT_FY
+
+
+def _income_for_tax(schedule, tax):
+    """Smallest taxable income on which the slab tax reaches the given amount"""
+    if tax <= 0:
+        return 0.0
+    for i in range(len(schedule.breakpoints) - 1, -1, -1):
+        if schedule.cumulative[i] < tax and schedule.rates[i] > 0:
+            return schedule.breakpoints[i] + (tax - schedule.cumulative[i]) / schedule.rates[i]
+    return 0.0
+
+class RegimeComparison:
+    """Old vs new regime comparison for one FY and age band.
+
+    Total tax (after rebate and cess) is piecewise-linear in taxable income,
+    so the old regime's total tax curve is compiled once into linear segments
+    and inverted in closed form. The break-even deduction for any gross
+    income is then a searchsorted plus one divide, for a whole array of
+    incomes at a time.
+    """
+
+    def __init__(self, old_schedule, new_schedule):
+        self.old_schedule = old_schedule
+        self.new_schedule = new_schedule
+
+        total = lambda x: old_schedule.compute(x)["total_tax"]
+
+        boundaries = set(old_schedule.breakpoints)
+        boundaries.add(float(old_schedule.rebate_limit))
+        # Below the rebate limit the total stays at zero until the slab tax
+        # exceeds the maximum rebate, which adds one more kink.
+        kink = _income_for_tax(old_schedule, old_schedule.rebate_max)
+        if 0 < kink < old_schedule.rebate_limit:
+            boundaries.add(kink)
+        boundaries = sorted(boundaries)
+
+        # Each segment covers (start, end] and is linear inside it, so two
+        # evaluations give its slope and its lowest value.
+        starts, ends, lows, slopes = [], [], [], []
+        for i, start in enumerate(boundaries):
+            if i + 1 < len(boundaries):
+                end = boundaries[i + 1]
+                middle = (start + end) / 2
+                slope = (total(end) - total(middle)) / (end - middle)
+                low = total(end) - slope * (end - start)
+            else:
+                end = np.inf
+                slope = total(start + 2.0) - total(start + 1.0)
+                low = total(start + 1.0) - slope
+            starts.append(start)
+            ends.append(end)
+            lows.append(low)
+            slopes.append(slope)
+
+        self._starts = np.array(starts)
+        self._ends = np.array(ends)
+        self._lows = np.round(np.array(lows), 6)
+        self._slopes = np.array(slopes)
+        self._low_values = self._lows.tolist()
+        self._segments = list(zip(starts, ends, self._low_values, slopes))
+
+    def max_old_taxable_income(self, target_tax):
+        """Largest old-regime taxable income whose total tax does not exceed target_tax"""
+        target = np.asarray(target_tax, dtype=np.float64)
+        j = np.searchsorted(self._lows, target, side="right") - 1
+        j = np.clip(j, 0, len(self._lows) - 1)
+        slope = self._slopes[j]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = np.where(slope > 0, self._starts[j] + (target - self._lows[j]) / slope, self._ends[j])
+        return np.minimum(x, self._ends[j])
+
+    def break_even_deduction(self, gross_income):
+        """Deductions needed for the old regime to cost no more than the new one.
+
+        Works for a single gross income or an array of them; returns 0 where the
+        old regime is already no worse without any deductions.
+        """
+        if np.ndim(gross_income) == 0:
+            # Plain bisect for a single income, to skip NumPy's per-call overhead
+            target = self.new_schedule.compute(gross_income)["total_tax"]
+            j = max(0, bisect.bisect_right(self._low_values, target) - 1)
+            start, end, low, slope = self._segments[j]
+            max_taxable = min(start + (target - low) / slope, end) if slope > 0 else end
+            return max(0.0, gross_income - max_taxable)
+
+        gross = np.asarray(gross_income, dtype=np.float64)
+        new_total = self.new_schedule.compute_array(gross)["total_tax"]
+        return np.maximum(0, gross - self.max_old_taxable_income(new_total))
+
+    def savings_curve(self, gross_income, deductions=0):
+        """Old and new regime totals over a range of gross incomes.
+
+        "savings" is what the old regime saves over the new one (negative when
+        the new regime is cheaper).
+        """
+        gross = np.asarray(gross_income, dtype=np.float64)
+        old_total = self.old_schedule.compute_array(np.maximum(0, gross - deductions))["total_tax"]
+        new_total = self.new_schedule.compute_array(gross)["total_tax"]
+        return {
+            "gross_income": gross,
+            "old_total": old_total,
+            "new_total": new_total,
+            "savings": new_total - old_total,
+            "break_even_deduction": np.maximum(0, gross - self.max_old_taxable_income(new_total)),
+        }
+
+@lru_cache(maxsize=None)
+def get_regime_comparison(is_senior=False, fy=DEFAULT_FY):
+    old_schedule = get_schedule("IN", "old", fy, "60_to_80" if is_senior else "below_60")
+    new_schedule = get_schedule("IN", "new", fy, "all")
+    return RegimeComparison(old_schedule, new_schedule)
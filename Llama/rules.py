@@ -0,0 +1,86 @@
+import json
+import os
+from functools import lru_cache
+from types import MappingProxyType
+
+# Tax rules per (country, financial year), one declarative JSON file each
+# under rules/<country>/<fy>.json. Every file is read and compiled once when
+# this module is imported into read-only lookup structures, so calculators
+# for any year, current or past, only pay a dict lookup.
+RULES_DIR = os.environ.get("TAX_RULES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules"))
+
+DEFAULT_COUNTRY = "IN"
+DEFAULT_FY = "2024-25"
+
+def _freeze(value):
+    """Read-only copy of parsed JSON: dicts become mappingproxies, lists become tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+class RuleSet:
+    """Compiled rules for one country and financial year"""
+
+    __slots__ = ("country", "fy", "ay", "first_salary_month", "cess_rate", "regimes", "limits", "deductions",
+                 "shared_caps", "hra", "house_property")
+
+    def __init__(self, rules):
+        for name in self.__slots__:
+            object.__setattr__(self, name, _freeze(rules[name]))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RuleSet is read-only")
+
+    def __repr__(self):
+        return f"RuleSet({self.country!r}, {self.fy!r})"
+
+    @property
+    def title(self):
+        return f"FY {self.fy} (AY {self.ay})"
+
+    def limit(self, section):
+        return self.limits[section]
+
+    def slabs(self, regime, band):
+        bands = self.regimes[regime]["slabs"]
+        return bands.get(band, bands.get("all"))
+
+    def rebate(self, regime):
+        """(taxable income limit, maximum rebate) under section 87A"""
+        rebate = self.regimes[regime]["rebate_87a"]
+        return rebate["income_limit"], rebate["max_rebate"]
+
+    def standard_deduction(self, regime):
+        return self.regimes[regime]["standard_deduction"]
+
+    def mediclaim_limit(self, is_senior=False):
+        return self.limits["80D_senior" if is_senior else "80D"]
+
+def load_rules(directory=RULES_DIR):
+    """Read every rules/<country>/<fy>.json into {(country, fy): RuleSet}"""
+    registry = {}
+    for country in sorted(os.listdir(directory)):
+        country_dir = os.path.join(directory, country)
+        if not os.path.isdir(country_dir):
+            continue
+        for file_name in sorted(os.listdir(country_dir)):
+            if not file_name.endswith(".json"):
+                continue
+            with open(os.path.join(country_dir, file_name), encoding="utf-8") as file:
+                rule_set = RuleSet(json.load(file))
+            registry[(rule_set.country, rule_set.fy)] = rule_set
+    return MappingProxyType(registry)
+
+RULES = load_rules()
+
+@lru_cache(maxsize=None)
+def get_rules(fy=DEFAULT_FY, country=DEFAULT_COUNTRY):
+    try:
+        return RULES[(country, fy)]
+    except KeyError:
+        raise KeyError(f"No tax rules defined for {country} FY {fy}") from None
+
+def available_years(country=DEFAULT_COUNTRY):
+    return sorted(fy for rule_country, fy in RULES if rule_country == country)
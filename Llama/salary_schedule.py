@@ -0,0 +1,97 @@
+import calendar
+
+import numpy as np
+
+from rules import get_rules
+
+# Monthly salary schedules for one employee or a whole organization.
+#
+# Every component is an (employees, 12) array, one column per salary month,
+# built with broadcasting instead of a loop per month. Pay increments, DA
+# revisions and arrears are applied as masks over the month axis, so a
+# 50k employee projection is a handful of array operations.
+
+# Salary months run from the rules' first_salary_month, March for India:
+# March salary is paid in April, the first month of the financial year
+MONTHS = 12
+
+COMPONENTS = ["basic", "da", "hra", "cca", "arrears", "gross", "epf", "income_tax", "prof_tax", "net"]
+
+def fiscal_months(fy="2020-21", first_month=None):
+    """Month labels of a financial year, e.g. ["March - 2020", ..., "February - 2021"]"""
+    first_month = first_month or get_rules(fy).first_salary_month
+    start_year = int(fy.split("-")[0])
+    labels = []
+    for offset in range(MONTHS):
+        month = (first_month - 1 + offset) % 12 + 1
+        year = start_year + (first_month - 1 + offset) // 12
+        labels.append(f"{calendar.month_name[month]} - {year}")
+    return labels
+
+def month_index(label, fy="2020-21", first_month=None):
+    """Position of a month ("April", "April - 2020" or a 0-11 index) in the salary year"""
+    if isinstance(label, (int, np.integer)):
+        return int(label)
+    first_month = first_month or get_rules(fy).first_salary_month
+    name = label.split("-")[0].strip().title()
+    month = list(calendar.month_name).index(name)
+    return (month - first_month) % 12
+
+def _column(values, employees):
+    """Per-employee values as an (employees, 1) column for broadcasting over months"""
+    return np.broadcast_to(np.asarray(values, dtype=np.float64), (employees,)).reshape(employees, 1)
+
+def salary_schedule(base_pay, da_percent, hra_percent, cca, epf_percent, income_tax, prof_tax,
+                    increments=(), da_revisions=(), arrears=None, fy="2020-21"):
+    """Month-by-employee salary matrices for a financial year.
+
+    base_pay, cca, income_tax (annual), prof_tax (monthly) and the percents
+    may be scalars or one value per employee.
+    increments: (month, percent) pairs; basic pay rises by percent from that
+        month on. month and percent may each be per-employee arrays.
+    da_revisions: (effective month, new DA percent[, paid month]) triples
+        applied to everyone. When the revision is paid later than it takes
+        effect, the missed difference is paid as arrears in the paid month.
+    arrears: extra amounts per month, shape (12,) or (employees, 12).
+
+    Returns a dict of (employees, 12) arrays keyed by COMPONENTS.
+    """
+    base_pay = np.atleast_1d(np.asarray(base_pay, dtype=np.float64))
+    employees = len(base_pay)
+    first_month = get_rules(fy).first_salary_month
+    months = np.arange(MONTHS)
+
+    basic = np.repeat(base_pay.reshape(employees, 1), MONTHS, axis=1)
+    for month, percent in increments:
+        month = np.atleast_1d(np.vectorize(lambda m: month_index(m, fy, first_month))(month)).reshape(-1, 1)
+        factor = 1 + _column(percent, employees) / 100
+        basic *= np.where(months >= month, factor, 1.0)
+
+    da_rate = np.repeat(_column(da_percent, employees) / 100, MONTHS, axis=1)
+    revision_arrears = np.zeros((employees, MONTHS))
+    for revision in sorted(da_revisions, key=lambda revision: month_index(revision[0], fy, first_month)):
+        effective, percent = month_index(revision[0], fy, first_month), revision[1] / 100
+        paid = month_index(revision[2], fy, first_month) if len(revision) > 2 else effective
+        # Difference owed for the months before the revision reached the payslip
+        back_months = slice(effective, max(effective, paid))
+        revision_arrears[:, paid] += ((percent - da_rate[:, back_months]) * basic[:, back_months]).sum(axis=1)
+        da_rate[:, max(effective, paid):] = percent
+
+    schedule = {"basic": basic, "da": da_rate * basic}
+    schedule["hra"] = _column(hra_percent, employees) / 100 * basic
+    schedule["cca"] = np.repeat(_column(cca, employees), MONTHS, axis=1)
+    schedule["arrears"] = revision_arrears + (0 if arrears is None else np.broadcast_to(arrears, (employees, MONTHS)))
+    schedule["gross"] = schedule["basic"] + schedule["da"] + schedule["hra"] + schedule["cca"] + schedule["arrears"]
+    schedule["epf"] = _column(epf_percent, employees) / 100 * basic
+    schedule["income_tax"] = np.repeat(_column(income_tax, employees) / MONTHS, MONTHS, axis=1)
+    schedule["prof_tax"] = np.repeat(_column(prof_tax, employees), MONTHS, axis=1)
+    schedule["net"] = schedule["gross"] - schedule["epf"] - schedule["income_tax"] - schedule["prof_tax"]
+    return schedule
+
+def org_totals(schedule):
+    """Organization-wide total of each component per month, shape (12,)"""
+    return {component: values.sum(axis=0) for component, values in schedule.items()}
+
+def annual_totals(schedule):
+    """Each employee's yearly total of each component, shape (employees,)"""
+    return {component: values.sum(axis=1) for component, values in schedule.items()}
@@ -0,0 +1,215 @@
+import bisect
+from functools import lru_cache
+
+import numpy as np
+
+from paise import PAISE_PER_RUPEE, BASIS_POINTS, ROUND_288B_PAISE, basis_points, divide_half_up, round_288b
+from rules import RULES, DEFAULT_FY, get_rules
+
+# Slab rates as (lower bound of slab, marginal rate) pairs, per
+# (country, regime, financial year) and age band. Every calculator in the
+# app reads its slabs from here, so a rate change is made in one place:
+# the FY's file under rules/.
+SLAB_TABLE = {
+    (country, regime, fy): rule_set.regimes[regime]["slabs"]
+    for (country, fy), rule_set in RULES.items()
+    for regime in rule_set.regimes
+}
+
+# Rebate under section 87A as (taxable income limit, maximum rebate)
+REBATE_TABLE = {
+    (country, regime, fy): rule_set.rebate(regime)
+    for (country, fy), rule_set in RULES.items()
+    for regime in rule_set.regimes
+}
+
+CESS_RATE = get_rules(DEFAULT_FY).cess_rate
+
+# The scalar fixed-point path inlines divide_half_up and round_288b
+HALF_BASIS_POINTS = BASIS_POINTS // 2
+HALF_288B_PAISE = ROUND_288B_PAISE // 2
+
+def regime_key(regime):
+    """Normalize the regime labels used by the pages ("Old", "New Regime", ...) to "old"/"new" """
+    return "old" if str(regime).strip().lower().startswith("old") else "new"
+
+def age_band(age=None, is_senior=False):
+    if age is None:
+        return "60_to_80" if is_senior else "below_60"
+    if age >= 80:
+        return "80_plus"
+    if age >= 60:
+        return "60_to_80"
+    return "below_60"
+
+class SlabSchedule:
+    """A compiled slab schedule.
+
+    The tax due at every breakpoint is precomputed, so the tax on any income
+    is one bisect to find the slab plus one multiply for the part above it.
+    """
+
+    def __init__(self, slabs, rebate_limit=0, rebate_max=0, cess_rate=CESS_RATE):
+        self.breakpoints = tuple(float(lower) for lower, _ in slabs)
+        self.rates = tuple(float(rate) for _, rate in slabs)
+        cumulative = [0.0]
+        for i in range(1, len(slabs)):
+            cumulative.append(cumulative[-1] + (self.breakpoints[i] - self.breakpoints[i - 1]) * self.rates[i - 1])
+        self.cumulative = tuple(cumulative)
+        self.rebate_limit = rebate_limit
+        self.rebate_max = rebate_max
+        self.cess_rate = cess_rate
+
+        self._breakpoints = np.array(self.breakpoints)
+        self._rates = np.array(self.rates)
+        self._cumulative = np.array(self.cumulative)
+
+        # Fixed-point copies: breakpoints in paise, rates in basis points and
+        # the tax below each breakpoint in paise x basis points, so slab tax
+        # is exact until its single rounding to the paisa
+        self.breakpoints_paise = tuple(int(lower) * PAISE_PER_RUPEE for lower, _ in slabs)
+        self.rates_bp = tuple(basis_points(rate) for _, rate in slabs)
+        cumulative = [0]
+        for i in range(1, len(slabs)):
+            cumulative.append(cumulative[-1] + (self.breakpoints_paise[i] - self.breakpoints_paise[i - 1]) * self.rates_bp[i - 1])
+        self.cumulative_exact = tuple(cumulative)
+        self.rebate_limit_paise = int(rebate_limit) * PAISE_PER_RUPEE
+        self.rebate_max_paise = int(rebate_max) * PAISE_PER_RUPEE
+        self.cess_bp = basis_points(cess_rate)
+        self._slabs_paise = tuple(zip(self.breakpoints_paise, self.rates_bp, self.cumulative_exact))
+
+        self._rate_steps_bp = tuple(
+            (lower, rate - previous)
+            for lower, rate, previous in zip(self.breakpoints_paise, self.rates_bp, (0,) + self.rates_bp[:-1])
+            if rate != previous
+        )
+
+    def tax(self, income):
+        """Slab tax on a single taxable income"""
+        if income <= 0:
+            return 0.0
+        i = bisect.bisect_right(self.breakpoints, income) - 1
+        return self.cumulative[i] + (income - self.breakpoints[i]) * self.rates[i]
+
+    def tax_array(self, incomes):
+        """Slab tax on an array of taxable incomes"""
+        incomes = np.maximum(np.asarray(incomes, dtype=np.float64), 0)
+        i = np.searchsorted(self._breakpoints, incomes, side="right") - 1
+        return self._cumulative[i] + (incomes - self._breakpoints[i]) * self._rates[i]
+
+    def compute(self, taxable_income):
+        """Tax, 87A rebate, cess and total for a single taxable income"""
+        tax = self.tax(taxable_income)
+
+        rebate = 0
+        if taxable_income <= self.rebate_limit:
+            rebate = min(tax, self.rebate_max)
+
+        tax_after_rebate = tax - rebate
+        cess = tax_after_rebate * self.cess_rate
+        total_tax = tax_after_rebate + cess
+
+        return {
+            "tax": tax,
+            "rebate": rebate,
+            "tax_after_rebate": tax_after_rebate,
+            "cess": cess,
+            "total_tax": total_tax
+        }
+
+    def compute_array(self, taxable_income):
+        """Same as compute, for an array of taxable incomes"""
+        income = np.asarray(taxable_income, dtype=np.float64)
+        tax = self.tax_array(income)
+        rebate = np.where(income <= self.rebate_limit, np.minimum(tax, self.rebate_max), 0.0)
+
+        tax_after_rebate = tax - rebate
+        cess = tax_after_rebate * self.cess_rate
+        total_tax = tax_after_rebate + cess
+
+        return {
+            "tax": tax,
+            "rebate": rebate,
+            "tax_after_rebate": tax_after_rebate,
+            "cess": cess,
+            "total_tax": total_tax
+        }
+
+    def tax_paise(self, income):
+        """Slab tax in paise on a taxable income in paise"""
+        if income <= 0:
+            return 0
+        lower, rate, below = self._slabs_paise[bisect.bisect_right(self.breakpoints_paise, income) - 1]
+        return (below + (income - lower) * rate + HALF_BASIS_POINTS) // BASIS_POINTS
+
+    def tax_paise_array(self, incomes):
+        """Slab tax in paise on an int64 array of taxable incomes in paise"""
+        incomes = np.maximum(np.asarray(incomes, dtype=np.int64), 0)
+        # Sum of each rate increase times the income above its breakpoint,
+        # accumulated in place: cheaper than looking up every row's slab
+        tax = np.full(incomes.shape, HALF_BASIS_POINTS, dtype=np.int64)
+        above = np.empty_like(incomes)
+        for lower, step in self._rate_steps_bp:
+            np.subtract(incomes, lower, out=above)
+            np.maximum(above, 0, out=above)
+            above *= step
+            tax += above
+        tax //= BASIS_POINTS
+        return tax
+
+    def compute_paise(self, taxable_income, tds=0):
+        """compute in whole paise, with the total rounded under Section 288B.
+
+        taxable_income and tds are ints in paise; so is every result. The
+        remaining tax after TDS is included.
+        """
+        tax = self.tax_paise(taxable_income)
+
+        rebate = 0
+        if taxable_income <= self.rebate_limit_paise:
+            rebate = min(tax, self.rebate_max_paise)
+
+        tax_after_rebate = tax - rebate
+        cess = (tax_after_rebate * self.cess_bp + HALF_BASIS_POINTS) // BASIS_POINTS
+        total_tax = (tax_after_rebate + cess + HALF_288B_PAISE) // ROUND_288B_PAISE * ROUND_288B_PAISE
+
+        return {
+            "tax": tax,
+            "rebate": rebate,
+            "tax_after_rebate": tax_after_rebate,
+            "cess": cess,
+            "total_tax": total_tax,
+            "remaining_tax": total_tax - tds if total_tax > tds else 0
+        }
+
+    def compute_paise_array(self, taxable_income, tds=0):
+        """Same as compute_paise, for int64 arrays in paise"""
+        income = np.asarray(taxable_income, dtype=np.int64)
+        tax = self.tax_paise_array(income)
+        rebate = np.where(income <= self.rebate_limit_paise, np.minimum(tax, self.rebate_max_paise), 0)
+
+        tax_after_rebate = tax - rebate
+        cess = divide_half_up(tax_after_rebate * self.cess_bp, BASIS_POINTS)
+        total_tax = round_288b(tax_after_rebate + cess)
+
+        return {
+            "tax": tax,
+            "rebate": rebate,
+            "tax_after_rebate": tax_after_rebate,
+            "cess": cess,
+            "total_tax": total_tax,
+            "remaining_tax": np.maximum(0, total_tax - np.asarray(tds, dtype=np.int64))
+        }
+
+@lru_cache(maxsize=None)
+def get_schedule(country="IN", regime="old", fy=DEFAULT_FY, band="below_60"):
+    """Return the compiled schedule for (country, regime, FY, age band), compiling it once per process"""
+    key = (country, regime_key(regime), fy)
+    if key not in SLAB_TABLE:
+        raise KeyError(f"No tax slabs defined for {key}")
+    rule_set = get_rules(fy, country)
+    slabs = rule_set.slabs(key[1], band)
+    if slabs is None:
+        raise KeyError(f"No tax slabs defined for {key} and age band {band!r}")
+    rebate_limit, rebate_max = rule_set.rebate(key[1])
+    return SlabSchedule(slabs, rebate_limit, rebate_max, rule_set.cess_rate)
@@ -0,0 +1,139 @@
+import json
+import os
+
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from bulk_filing import SUMMARY_COLUMNS
+from lazy_imports import lazy_import
+from rules import DEFAULT_FY
+from tax_compute import compare_filing, compute_batch, compute_filing
+
+# HTTP API over tax_compute.py, for systems such as payroll that need the tax
+# figures without the Streamlit UI. Taxpayers use the bulk roster format
+# (see bulk_filing.py), with "fy" optional:
+#
+#   POST /tax/compute   {"basic_salary": 900000, "ppf": 150000, ...}
+#                       -> the Tax Filing figures in the chosen regime
+#   POST /tax/compare   same body -> Old vs New Regime and the recommendation
+#   POST /tax/batch     {"fy": "2024-25", "exact": false, "rows": [{...}, ...]}
+#                       or an Arrow IPC stream (Content-Type
+#                       application/vnd.apache.arrow.stream, ?fy=&exact=)
+#                       -> one summary row per taxpayer, as Arrow when sent
+#                       or accepted as Arrow, otherwise JSON
+#   GET  /health
+#
+# A single taxpayer takes well under a millisecond, less than handing it to
+# a thread would cost, so it is computed on the event loop. Batches run on
+# the threadpool so a large roster does not hold up other requests. The
+# service scales across API_WORKERS uvicorn worker processes, each with its
+# own compiled schedules.
+#
+#   python tax_api.py        (or: uvicorn tax_api:app --workers 4)
+
+API_HOST = os.environ.get("API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("API_PORT", 8000))
+API_WORKERS = int(os.environ.get("API_WORKERS", os.cpu_count() or 1))
+# Larger rosters should go through bulk_filing.py
+API_MAX_BATCH_ROWS = int(os.environ.get("API_MAX_BATCH_ROWS", 100000))
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+BATCH_COLUMNS = SUMMARY_COLUMNS[:-1] + ["old_remaining_tax", "new_remaining_tax", "remaining_tax_in_words"]
+
+async def _json_body(request):
+    try:
+        return json.loads(await request.body())
+    except ValueError as e:
+        raise HTTPException(400, f"Body is not valid JSON: {e}")
+
+async def _taxpayer(request):
+    taxpayer = await _json_body(request)
+    if not isinstance(taxpayer, dict):
+        raise HTTPException(400, "Body must be a JSON object of taxpayer fields")
+    return taxpayer
+
+async def tax_compute(request):
+    return JSONResponse(compute_filing(await _taxpayer(request)))
+
+async def tax_compare(request):
+    return JSONResponse(compare_filing(await _taxpayer(request)))
+
+def _is_true(value):
+    return value is True or str(value).lower() in ("1", "true", "yes")
+
+def _read_arrow(body):
+    pa = lazy_import("pyarrow")
+    try:
+        return lazy_import("pyarrow.ipc").open_stream(pa.py_buffer(body)).read_pandas()
+    except pa.ArrowInvalid as e:
+        raise HTTPException(400, f"Body is not an Arrow IPC stream: {e}")
+
+def _write_arrow(df):
+    pa = lazy_import("pyarrow")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with lazy_import("pyarrow.ipc").new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+async def tax_batch(request):
+    arrow = request.headers.get("content-type", "").startswith(ARROW_STREAM)
+    if arrow:
+        options = request.query_params
+        roster = await run_in_threadpool(_read_arrow, await request.body())
+    else:
+        options = await _json_body(request)
+        if not isinstance(options, dict) or not isinstance(options.get("rows"), list):
+            raise HTTPException(400, 'Body must be a JSON object with a "rows" list')
+        for row, taxpayer in enumerate(options["rows"]):
+            if not isinstance(taxpayer, dict):
+                raise HTTPException(400, f"Row {row}: must be a JSON object of taxpayer fields, not {taxpayer!r}")
+        # Not DataFrame.from_records, which drops rows that set no fields
+        roster = await run_in_threadpool(pd.DataFrame, options["rows"])
+    # Not roster.empty, which is also true of rows that are all defaults
+    if len(roster) == 0:
+        raise HTTPException(400, "The roster has no rows")
+    if len(roster) > API_MAX_BATCH_ROWS:
+        raise HTTPException(413, f"{len(roster)} rows is more than the {API_MAX_BATCH_ROWS} allowed per request")
+
+    result = await run_in_threadpool(compute_batch, roster, options.get("fy", DEFAULT_FY),
+                                     _is_true(options.get("exact", False)))
+    result = result[BATCH_COLUMNS]
+    if arrow or ARROW_STREAM in request.headers.get("accept", ""):
+        return Response(await run_in_threadpool(_write_arrow, result), media_type=ARROW_STREAM)
+    # pandas' own JSON writer is several times quicker than json.dumps over row dicts
+    rows = await run_in_threadpool(result.to_json, orient="records", double_precision=15)
+    return Response('{"rows":' + rows + "}", media_type="application/json")
+
+async def health(request):
+    return JSONResponse({"status": "ok"})
+
+async def _http_error(request, exc):
+    return JSONResponse({"error": exc.detail}, exc.status_code)
+
+async def _invalid_input(request, exc):
+    # tax_compute refuses unknown fields, bad amounts and unknown years
+    return JSONResponse({"error": str(exc)}, 400)
+
+app = Starlette(
+    routes=[
+        Route("/tax/compute", tax_compute, methods=["POST"]),
+        Route("/tax/compare", tax_compare, methods=["POST"]),
+        Route("/tax/batch", tax_batch, methods=["POST"]),
+        Route("/health", health),
+    ],
+    exception_handlers={HTTPException: _http_error, ValueError: _invalid_input},
+)
+
+def main():
+    import uvicorn
+
+    # Worker processes import the app by name
+    uvicorn.run("tax_api:app", host=API_HOST, port=API_PORT, workers=API_WORKERS, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import numpy as np
+
+from amount_words import num_to_words
+from bulk_filing import AMOUNT_COLUMNS, FLAG_COLUMNS, TEXT_COLUMNS, compute_roster, normalize_roster
+from deductions import SECTION_80C_CLAIMS
+from filing_graph import FILING_INPUTS, FilingGraph
+from rules import DEFAULT_FY, available_years, get_rules
+from slabs import age_band, get_schedule
+
+# The tax computations behind the pages, callable without Streamlit: the Tax
+# Calculator and the assistant's sidebar estimate, one Tax Filing taxpayer,
+# the regime comparison and a whole roster. The pages and tax_api.py both
+# call these, so the API and the UI cannot drift apart.
+#
+# A taxpayer is a dict in the bulk roster format (see bulk_filing.py): the
+# Tax Filing widgets by name, with the 80C items as separate claims, plus an
+# optional "fy".
+
+# The calculator and salary statement use the 2020-21 rules
+CALCULATOR_FY = "2020-21"
+
+TAX_RESULT_KEYS = ["tax", "rebate", "tax_after_rebate", "cess", "total_tax"]
+HOUSE_PROPERTY_COLUMNS = ["rent_received", "property_tax", "housing_loan_interest"]
+
+def calculator_tax(income, deductions, regime, age, fy=CALCULATOR_FY):
+    """Tax Calculator page: (slab tax, taxable income) for "Old" or "New" regime"""
+    taxable_income = max(0, income - deductions)
+
+    if regime == "Old":
+        std_deduction = get_rules(fy).standard_deduction("old")  # Standard Deduction
+        taxable_income = max(0, taxable_income - std_deduction)
+        schedule = get_schedule("IN", "old", fy, age_band(age))
+    else:
+        schedule = get_schedule("IN", "new", fy, "all")
+
+    tax = schedule.tax(taxable_income)
+    return tax, taxable_income
+
+def estimate_tax(income, regime, fy=DEFAULT_FY):
+    """Assistant sidebar estimate: slab tax on an income, before rebate and cess"""
+    tax_estimate = get_schedule("IN", regime, fy).tax(income)
+    return round(tax_estimate, 2)
+
+def filing_inputs(taxpayer):
+    """FilingGraph inputs for one taxpayer, refusing unknown fields and bad amounts"""
+    unknown = set(taxpayer) - set(AMOUNT_COLUMNS) - set(TEXT_COLUMNS) - set(FLAG_COLUMNS) - {"fy", "has_house_property"}
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    fy = taxpayer.get("fy", DEFAULT_FY)
+    if fy not in available_years():
+        raise ValueError(f"No rules for FY {fy!r}; available: {', '.join(available_years())}")
+    tax_regime = taxpayer.get("tax_regime", "Old Regime")
+    if tax_regime not in ("Old Regime", "New Regime"):
+        raise ValueError(f"tax_regime must be 'Old Regime' or 'New Regime', not {tax_regime!r}")
+
+    amounts = {}
+    for column in AMOUNT_COLUMNS:
+        value = taxpayer.get(column, 0.0)
+        # bool is an int, but never a sensible amount
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{column} must be a non-negative number, not {value!r}")
+        try:
+            amount = float(value)
+        except OverflowError:
+            # An int too large for a float
+            amount = float("inf")
+        if not 0 <= amount < float("inf"):
+            raise ValueError(f"{column} must be a non-negative number, not {value!r}")
+        amounts[column] = amount
+    for column in TEXT_COLUMNS:
+        value = taxpayer.get(column)
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"{column} must be text, not {value!r}")
+    flags = {}
+    for column in list(FLAG_COLUMNS) + ["has_house_property"]:
+        value = taxpayer.get(column, False)
+        if not isinstance(value, bool):
+            raise ValueError(f"{column} must be true or false, not {value!r}")
+        flags[column] = value
+
+    inputs = {name: amounts[name] for name in FILING_INPUTS if name in amounts}
+    inputs.update(fy=fy, tax_regime=tax_regime, is_senior=flags["is_senior"], disabled_person=flags["disabled_person"],
+                  section_80c_items=tuple(amounts[name] for name in SECTION_80C_CLAIMS))
+    # Same widget limit as the Tax Filing page
+    inputs["housing_loan_interest"] = min(amounts["housing_loan_interest"], get_rules(fy).limits["24(b)"])
+    # Without the checkbox, any house property amount implies it
+    if "has_house_property" in taxpayer:
+        inputs["has_house_property"] = flags["has_house_property"]
+    else:
+        inputs["has_house_property"] = any(amounts[name] for name in HOUSE_PROPERTY_COLUMNS)
+    return inputs
+
+def filing_graph(taxpayer):
+    graph = FilingGraph()
+    graph.set(**filing_inputs(taxpayer))
+    return graph
+
+def compute_filing(taxpayer):
+    """Tax Filing page figures for one taxpayer in their chosen regime"""
+    graph = filing_graph(taxpayer)
+    remaining_tax = graph["remaining_tax"]
+    return {
+        "fy": graph["fy"],
+        "tax_regime": graph["tax_regime"],
+        "salary_total": graph["salary_total"],
+        "hra_exemption": graph["hra_exemption"],
+        "standard_deduction": graph["standard_deduction"],
+        "net_salary": graph["net_salary"],
+        "net_house_income": graph["net_house_income"],
+        "total_other_income": graph["total_other_income"],
+        "gross_total_income": graph["gross_total_income"],
+        # Section by section, as allowed after caps; empty in the New Regime
+        "deductions": {line: amount for line, amount in graph["allowed_deductions"].items() if line != "total"},
+        "total_deductions": graph["total_deductions"],
+        "taxable_income": graph["taxable_income"],
+        **{key: graph["tax_results"][key] for key in TAX_RESULT_KEYS},
+        "tds_already_deducted": graph["tds_already_deducted"],
+        "remaining_tax": remaining_tax,
+        "remaining_tax_in_words": num_to_words(remaining_tax),
+    }
+
+def compare_regimes(graph):
+    """Old vs New Regime for a FilingGraph: both taxes, the cheaper one and the break-even deduction"""
+    old, new = graph["old_regime_results"], graph["new_regime_results"]
+    if old["total_tax"] < new["total_tax"]:
+        recommended = "Old Regime"
+    elif new["total_tax"] < old["total_tax"]:
+        recommended = "New Regime"
+    else:
+        recommended = "Either"
+    break_even = graph["break_even_deduction"]
+    claimed = graph["total_deductions"] if graph["tax_regime"] == "Old Regime" else 0
+    return {
+        "old_regime": {key: old[key] for key in TAX_RESULT_KEYS},
+        "new_regime": {key: new[key] for key in TAX_RESULT_KEYS},
+        "recommended_regime": recommended,
+        "savings": abs(old["total_tax"] - new["total_tax"]),
+        "break_even_deduction": break_even,
+        # More Old Regime deductions needed before it beats the New Regime
+        "additional_investment": max(0, break_even - claimed) if recommended == "New Regime" else 0,
+    }
+
+def compare_filing(taxpayer):
+    return compare_regimes(filing_graph(taxpayer))
+
+def _refuse_rows(roster, column, bad, message):
+    """ValueError naming the first row of roster[column] where bad is set"""
+    if bad.any():
+        row = int(np.flatnonzero(bad)[0])
+        value = roster[column].iloc[row]
+        raise ValueError(f"Row {row}: {column} {message}, not {value.item() if isinstance(value, np.generic) else value!r}")
+
+def _is_number(value):
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_))
+
+def validate_roster(roster):
+    """Check a roster column by column with the rules of filing_inputs.
+
+    Unlike normalize_roster, which is lenient for hand-made CSVs, nothing is
+    coerced: a missing value takes its default, anything else that is not a
+    valid regime, flag or non-negative amount raises ValueError naming the
+    row. A has_house_property of false drops that row's house property
+    amounts, as the page does, and the column is removed.
+    """
+    unknown = set(roster.columns) - set(AMOUNT_COLUMNS) - set(TEXT_COLUMNS) - set(FLAG_COLUMNS) - {"has_house_property"}
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+    roster = roster.reset_index(drop=True)
+
+    for column in roster.columns:
+        values = roster[column]
+        missing = values.isna().to_numpy()
+        if column in AMOUNT_COLUMNS:
+            if values.dtype == object:
+                _refuse_rows(roster, column, ~(missing | values.map(_is_number).to_numpy()),
+                             "must be a non-negative number")
+            elif values.dtype == bool:
+                _refuse_rows(roster, column, ~missing, "must be a non-negative number")
+            amounts = values.to_numpy(dtype=np.float64, na_value=0.0)
+            _refuse_rows(roster, column, ~missing & ~((amounts >= 0) & np.isfinite(amounts)),
+                         "must be a non-negative number")
+        elif column in FLAG_COLUMNS or column == "has_house_property":
+            if values.dtype != bool:
+                is_flag = values.map(lambda value: isinstance(value, (bool, np.bool_))).to_numpy()
+                _refuse_rows(roster, column, ~(missing | is_flag), "must be true or false")
+        elif column == "tax_regime":
+            _refuse_rows(roster, column, ~(missing | values.isin(["Old Regime", "New Regime"]).to_numpy()),
+                         "must be 'Old Regime' or 'New Regime'")
+        else:
+            _refuse_rows(roster, column, ~(missing | values.map(lambda value: isinstance(value, str)).to_numpy()),
+                         "must be text")
+
+    if "has_house_property" in roster:
+        # Missing means implied by the amounts, as in filing_inputs
+        no_house = roster["has_house_property"].eq(False).to_numpy()
+        roster = roster.drop(columns="has_house_property")
+        for column in HOUSE_PROPERTY_COLUMNS:
+            if column in roster:
+                roster.loc[no_house, column] = 0.0
+    return roster
+
+def compute_batch(roster, fy=DEFAULT_FY, exact=False):
+    """compute_roster on a DataFrame in the bulk roster format, validated first"""
+    if fy not in available_years():
+        raise ValueError(f"No rules for FY {fy!r}; available: {', '.join(available_years())}")
+    return compute_roster(normalize_roster(validate_roster(roster)), fy, exact)
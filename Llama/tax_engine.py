@@ -0,0 +1,68 @@
+import numpy as np
+
+from instrumentation import timed
+from slabs import get_schedule, DEFAULT_FY
+
+
+def calculate_tax_old_regime(taxable_income, is_senior=False, fy=DEFAULT_FY):
+    band = "60_to_80" if is_senior else "below_60"
+    return get_schedule("IN", "old", fy, band).compute(taxable_income)
+
+def calculate_tax_new_regime(taxable_income, is_senior=False, fy=DEFAULT_FY):
+    # Same slabs for everyone in new regime
+    return get_schedule("IN", "new", fy, "all").compute(taxable_income)
+
+@timed("tax.batch")
+def calculate_tax_batch(taxable_income, is_senior=False, regime="Old Regime", fy=DEFAULT_FY):
+    """Vectorized version of calculate_tax_old_regime / calculate_tax_new_regime.
+
+    Takes an array (or DataFrame column) of taxable incomes and senior flags
+    and returns a dict of arrays with the same keys as the scalar functions.
+    """
+    income = np.asarray(taxable_income, dtype=np.float64)
+    senior = np.broadcast_to(np.asarray(is_senior, dtype=bool), income.shape)
+
+    if regime == "Old Regime":
+        results = get_schedule("IN", "old", fy, "below_60").compute_array(income)
+        if senior.any():
+            senior_results = get_schedule("IN", "old", fy, "60_to_80").compute_array(income[senior])
+            for key in results:
+                results[key][senior] = senior_results[key]
+        return results
+
+    return get_schedule("IN", "new", fy, "all").compute_array(income)
+
+def _schedule(is_senior, regime, fy):
+    if regime == "Old Regime":
+        return get_schedule("IN", "old", fy, "60_to_80" if is_senior else "below_60")
+    return get_schedule("IN", "new", fy, "all")
+
+def calculate_tax_paise(taxable_income, is_senior=False, regime="Old Regime", fy=DEFAULT_FY, tds=0):
+    """Fixed-point version of the scalar functions: ints in paise in and out.
+
+    total_tax is rounded to the nearest ten rupees (Section 288B) and
+    remaining_tax is what is left of it after tds.
+    """
+    return _schedule(is_senior, regime, fy).compute_paise(taxable_income, tds)
+
+@timed("tax.batch", money="paise")
+def calculate_tax_batch_paise(taxable_income, is_senior=False, regime="Old Regime", fy=DEFAULT_FY, tds=0):
+    """Fixed-point version of calculate_tax_batch over int64 arrays in paise"""
+    income = np.asarray(taxable_income, dtype=np.int64)
+    senior = np.broadcast_to(np.asarray(is_senior, dtype=bool), income.shape)
+    tds = np.broadcast_to(np.asarray(tds, dtype=np.int64), income.shape)
+
+    results = _schedule(False, regime, fy).compute_paise_array(income, tds)
+    if regime == "Old Regime" and senior.any():
+        senior_results = _schedule(True, regime, fy).compute_paise_array(income[senior], tds[senior])
+        for key in results:
+            results[key][senior] = senior_results[key]
+    return results
+
+def calculate_tax_frame(df, income_col="taxable_income", senior_col=None, regime="Old Regime", fy=DEFAULT_FY):
+    """Run calculate_tax_batch over a DataFrame and return the results as columns"""
+    import pandas as pd
+
+    is_senior = df[senior_col].to_numpy(dtype=bool) if senior_col else False
+    results = calculate_tax_batch(df[income_col].to_numpy(), is_senior, regime, fy)
+    return pd.DataFrame(results, index=df.index)